@@ -0,0 +1,104 @@
+import os
+import queue
+import threading
+from datetime import datetime
+
+
+class ActivityLog:
+    """Journal d'activité à écriture différée.
+
+    Les activités sont placées dans une file bornée puis insérées par lots
+    (un seul INSERT multi-lignes et un seul commit) par un thread de fond,
+    dès que `flush_rows` lignes attendent ou au plus tard toutes les
+    `flush_interval_ms` millisecondes. `write_batch(rows)` reçoit une liste
+    de dicts prêts pour un insert SQLAlchemy Core.
+    """
+
+    def __init__(self, write_batch, max_queue=10000, flush_rows=100, flush_interval_ms=500):
+        self.write_batch = write_batch
+        self.max_queue = max_queue
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval_ms / 1000.0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._write_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self._pid = os.getpid()
+
+    def record(self, user, action, details=None):
+        """Met une activité en file ; ne touche jamais la base dans l'appelant,
+        sauf si la file est pleine (le lot est alors écrit sur place)"""
+        self._ensure_worker()
+        row = {'user': user, 'action': action, 'details': details, 'date': datetime.utcnow()}
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.flush()
+            self._queue.put_nowait(row)
+        if self._queue.qsize() >= self.flush_rows:
+            self._wakeup.set()
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def flush(self):
+        """Écrit immédiatement tout ce qui attend ; retourne le nombre de lignes"""
+        written = 0
+        with self._write_lock:
+            while True:
+                rows = self._drain(self.max_queue)
+                if not rows:
+                    return written
+                self._write(rows)
+                written += len(rows)
+
+    def close(self):
+        """Arrête le thread et vide la file (appelé à l'arrêt du worker)"""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            self._thread.join(timeout=5)
+        self.flush()
+
+    def _drain(self, limit):
+        rows = []
+        while len(rows) < limit:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return rows
+
+    def _write(self, rows):
+        try:
+            self.write_batch(rows)
+        except Exception as e:
+            print(f"Erreur lors de l'écriture de {len(rows)} activités: {e}")
+
+    def _ensure_worker(self):
+        if self._pid != os.getpid():
+            # Après un fork (workers gunicorn), le thread et les verrous du parent
+            # ne sont plus valables dans l'enfant
+            self._pid = os.getpid()
+            self._queue = queue.Queue(maxsize=self.max_queue)
+            self._wakeup = threading.Event()
+            self._stopping = threading.Event()
+            self._write_lock = threading.Lock()
+            self._start_lock = threading.Lock()
+            self._thread = None
+        if self._thread is None or not self._thread.is_alive():
+            with self._start_lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name='activity-log', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            with self._write_lock:
+                rows = self._drain(self.max_queue)
+                if rows:
+                    self._write(rows)
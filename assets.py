@@ -0,0 +1,233 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import shutil
+import threading
+
+from werkzeug.wsgi import get_path_info
+
+from compression import accepted_encodings
+
+# Sous-dossier de static/ où sont écrits les fichiers construits
+DIST_DIR = 'dist'
+MANIFEST = 'manifest.json'
+
+# Fichiers construits : minifiés (CSS), empreinte dans le nom, précompressés
+BUILD_EXTENSIONS = {'.css', '.js', '.svg', '.json', '.txt'}
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.svg', '.json', '.txt'}
+SKIP_DIRS = {DIST_DIR, 'uploads'}
+
+# Un nom à empreinte ne change jamais de contenu : mise en cache pour un an
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+_STRINGS = re.compile(r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')''')
+_COMMENTS = re.compile(r'/\*.*?\*/', re.S)
+
+
+def minify_css(css):
+    """Minification prudente : commentaires, blancs et derniers « ; »
+    (le contenu des chaînes est laissé intact)"""
+    css = _COMMENTS.sub('', css)
+    parts = _STRINGS.split(css)
+    for i in range(0, len(parts), 2):
+        code = re.sub(r'\s+', ' ', parts[i])
+        code = re.sub(r'\s*([{};,>])\s*', r'\1', code)
+        parts[i] = code.replace(';}', '}')
+    return ''.join(parts).strip()
+
+
+def brotli_compress(data):
+    """Compression brotli (nécessite le paquet Brotli, sinon None)"""
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli.compress(data, quality=11)
+
+
+def build(static_dir, log=print):
+    """Construit static/dist/ : retourne le manifeste {nom source: nom à empreinte}"""
+    dist = os.path.join(static_dir, DIST_DIR)
+    if os.path.isdir(dist):
+        shutil.rmtree(dist)
+    os.makedirs(dist)
+
+    manifest = {}
+    for root, dirs, files in os.walk(static_dir):
+        dirs[:] = [d for d in dirs if not (root == static_dir and d in SKIP_DIRS)]
+        for filename in sorted(files):
+            ext = os.path.splitext(filename)[1]
+            if ext.lower() not in BUILD_EXTENSIONS:
+                continue
+            source = os.path.join(root, filename)
+            name = os.path.relpath(source, static_dir).replace(os.sep, '/')
+            with open(source, 'rb') as f:
+                data = f.read()
+            if ext.lower() == '.css':
+                data = minify_css(data.decode('utf-8')).encode('utf-8')
+
+            digest = hashlib.sha256(data).hexdigest()[:12]
+            hashed = f'{os.path.splitext(name)[0]}.{digest}{ext}'
+            target = os.path.join(dist, hashed)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, 'wb') as f:
+                f.write(data)
+
+            sizes = [f'{len(data)} o']
+            if ext.lower() in COMPRESSIBLE_EXTENSIONS:
+                with open(target + '.gz', 'wb') as f:
+                    # mtime=0 : mêmes octets d'un build à l'autre
+                    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+                    f.write(compressed)
+                sizes.append(f'gzip {len(compressed)} o')
+                compressed = brotli_compress(data)
+                if compressed is not None:
+                    with open(target + '.br', 'wb') as f:
+                        f.write(compressed)
+                    sizes.append(f'brotli {len(compressed)} o')
+            manifest[name] = hashed
+            log(f"  {name} -> {DIST_DIR}/{hashed} ({', '.join(sizes)})")
+
+    with open(os.path.join(dist, MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+class AssetManifest:
+    """Noms à empreinte des fichiers construits, pour le helper asset_url.
+
+    Sans build (développement), le manifeste est vide et les fichiers sont
+    servis tels quels par la route /static de Flask.
+    """
+
+    def __init__(self, static_dir, url_path='/static'):
+        self.path = os.path.join(static_dir, DIST_DIR, MANIFEST)
+        self.url_path = url_path.rstrip('/')
+        self._mtime = None
+        self._names = {}
+        self._lock = threading.Lock()
+
+    def names(self):
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            mtime = None
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime is None:
+                    self._names = {}
+                else:
+                    with open(self.path, encoding='utf-8') as f:
+                        self._names = json.load(f)
+                self._mtime = mtime
+        return self._names
+
+    def url(self, filename):
+        hashed = self.names().get(filename)
+        if hashed is None:
+            return f'{self.url_path}/{filename}'
+        return f'{self.url_path}/{DIST_DIR}/{hashed}'
+
+
+class StaticMiddleware:
+    """Sert les fichiers construits avant l'application Flask (sans ses
+    before_request), dans la meilleure variante précompressée acceptée par
+    le client, avec `Cache-Control: immutable`.
+
+    Seuls les noms du manifeste sont servis : tout autre chemin passe à
+    l'application sans rien mémoriser (des chemins inventés ne font pas
+    grossir le cache). Les fichiers du manifeste (et l'absence d'une
+    variante précompressée) sont lus une fois puis gardés en mémoire : un
+    nom à empreinte ne change jamais de contenu.
+    """
+
+    ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+    def __init__(self, app, directory, prefix, manifest):
+        self.app = app
+        self.directory = os.path.abspath(directory)
+        self.prefix = prefix.rstrip('/') + '/'
+        self.manifest = manifest
+        self._names = None   # manifeste dont `_built` est tiré
+        self._built = frozenset()
+        self._files = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        path = get_path_info(environ)
+        if not path.startswith(self.prefix) or environ['REQUEST_METHOD'] not in ('GET', 'HEAD'):
+            return self.app(environ, start_response)
+
+        name = path[len(self.prefix):]
+        if name not in self._built_names():
+            return self.app(environ, start_response)
+        accepted = accepted_encodings(environ.get('HTTP_ACCEPT_ENCODING', ''))
+        found = None
+        for encoding, suffix in self.ENCODINGS:
+            if encoding in accepted:
+                found = self._load(name + suffix, encoding)
+                if found:
+                    break
+        found = found or self._load(name, None)
+        if found is None:
+            return self.app(environ, start_response)
+
+        body, etag, encoding = found
+        headers = [
+            ('Content-Type', self._content_type(name)),
+            ('Cache-Control', IMMUTABLE),
+            ('ETag', etag),
+            ('Vary', 'Accept-Encoding'),
+        ]
+        if encoding:
+            headers.append(('Content-Encoding', encoding))
+        if etag in environ.get('HTTP_IF_NONE_MATCH', ''):
+            start_response('304 Not Modified', headers)
+            return [b'']
+        headers.append(('Content-Length', str(len(body))))
+        start_response('200 OK', headers)
+        return [b''] if environ['REQUEST_METHOD'] == 'HEAD' else [body]
+
+    @staticmethod
+    def _content_type(name):
+        mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        if mimetype.startswith('text/') or mimetype in ('application/javascript', 'image/svg+xml', 'application/json'):
+            mimetype += '; charset=utf-8'
+        return mimetype
+
+    def _built_names(self):
+        """Noms à empreinte du manifeste courant ; un nouveau build vide le cache"""
+        names = self.manifest.names()
+        if names is not self._names:
+            with self._lock:
+                self._built = frozenset(names.values())
+                self._files = {}
+                self._names = names
+        return self._built
+
+    def _load(self, name, encoding):
+        """(octets, ETag, encodage) d'un fichier du manifeste, ou None"""
+        if name in self._files:
+            return self._files[name]
+        path = os.path.normpath(os.path.join(self.directory, name))
+        if not path.startswith(self.directory + os.sep):
+            return None
+        entry = None
+        if os.path.isfile(path):
+            with open(path, 'rb') as f:
+                body = f.read()
+            entry = (body, f'"{hashlib.sha256(body).hexdigest()[:16]}"', encoding)
+        with self._lock:
+            self._files[name] = entry
+        return entry
+
+
+def init_app(app):
+    """Helper asset_url() dans les templates et service des fichiers construits"""
+    manifest = AssetManifest(app.static_folder, app.static_url_path)
+    app.add_template_global(manifest.url, 'asset_url')
+    app.wsgi_app = StaticMiddleware(app.wsgi_app, os.path.join(app.static_folder, DIST_DIR),
+                                    f'{app.static_url_path}/{DIST_DIR}', manifest)
@@ -0,0 +1,359 @@
+"""Benchmark des routes : latence et nombre de requêtes SQL par page.
+
+Chaque échelle (1k, 100k, 1m messages et activités) a sa propre base
+SQLite, générée une fois puis réutilisée, dans --workdir. Cloudinary est
+remplacé par l'hébergeur local. Le script échoue si une route dépasse son
+budget de requêtes SQL, ou si sa latence médiane régresse de plus de
+--threshold par rapport à la référence enregistrée avec --save-baseline.
+
+    python benchmark.py --scale 1k --scale 100k
+    python benchmark.py --scale 1k --save-baseline
+"""
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SCALES = {'1k': 1_000, '100k': 100_000, '1m': 1_000_000}
+DEFAULT_BASELINE = os.path.join(ROOT, 'benchmark_baseline.json')
+
+# Ignorer les écarts de latence inférieurs à ce seuil (bruit de mesure)
+NOISE_FLOOR_MS = 2.0
+
+# (nom, méthode, chemin, données, statut attendu, budget de requêtes SQL)
+# Les budgets comptent la lecture de la session côté serveur (et son écriture si elle change).
+# Les chemins peuvent utiliser {phrase_id}, {photo_id}, {letter_id}, {calendar_token}, et
+# {new.phrase}, {new.photo}, {new.challenge} : une ligne créée avant chaque passage (hors mesure)
+# pour les routes qui la consomment. Les données peuvent être une fonction de `new`, une
+# chaîne (corps JSON) ou un dict (formulaire, fichiers compris).
+# Les routes suffixées _304 renvoient l'ETag de la page déjà reçue (revalidation).
+ROUTES = [
+    ('index', 'GET', '/', None, 200, 4),
+    ('index_304', 'GET', '/', None, 304, 2),
+    ('index_page_deep', 'GET', '/?page=50', None, 200, 5),
+    ('index_post', 'POST', '/', {'texte': 'Bonjour mon amour', 'couleur': '#ffdde1', 'tags': 'amour'}, 302, 8),
+    ('like_phrase', 'GET', '/like_phrase/{phrase_id}', None, 200, 3),
+    ('toggle_favori', 'GET', '/toggle_favori/{phrase_id}', None, 302, 5),
+    ('supprimer_phrase', 'GET', '/supprimer_phrase/{new.phrase}', None, 302, 7),
+    ('galerie', 'GET', '/galerie', None, 200, 3),
+    ('galerie_304', 'GET', '/galerie', None, 304, 2),
+    ('upload', 'POST', '/upload', lambda new: {'file': (io.BytesIO(PHOTO_BYTES), 'benchmark.gif'),
+                                               'legende': 'Benchmark'}, 302, 9),
+    ('photo_status', 'GET', '/photo_status/{photo_id}', None, 200, 2),
+    ('like_photo', 'GET', '/like_photo/{photo_id}', None, 200, 3),
+    ('supprimer_photo', 'GET', '/supprimer_photo/{new.photo}', None, 302, 6),
+    ('supprimer_photos', 'POST', '/supprimer_photos',
+     lambda new: {'photo_ids': [new.photo, new.photo, new.photo]}, 302, 8),
+    # Recherche : l'index plein texte, puis un chargement par type de résultat
+    ('search', 'GET', '/search?q=lune+belle', None, 200, 5),
+    ('tags', 'GET', '/tags', None, 200, 2),
+    ('tag_page', 'GET', '/tags/amour', None, 200, 2),
+    ('letters', 'GET', '/letters', None, 200, 4),
+    ('letters_304', 'GET', '/letters', None, 304, 2),
+    ('read_letter', 'GET', '/read_letter/{letter_id}', None, 200, 3),
+    ('write_letter', 'GET', '/write_letter', None, 200, 1),
+    ('write_letter_post', 'POST', '/write_letter',
+     {'title': 'Pour toi', 'content': 'La lune est belle ce soir'}, 302, 6),
+    ('memories', 'GET', '/memories', None, 200, 4),
+    ('memories_304', 'GET', '/memories', None, 304, 2),
+    ('add_memory', 'GET', '/add_memory', None, 200, 1),
+    ('add_memory_post', 'POST', '/add_memory',
+     {'title': 'Notre rencontre', 'description': 'Un beau jour', 'date_memory': '2024-02-14'}, 302, 6),
+    ('love_calendar', 'GET', '/love_calendar?year=2025&month=9', None, 200, 2),
+    ('add_calendar_event', 'POST', '/add_calendar_event',
+     {'title': 'Dîner', 'event_date': '2025-09-27', 'event_type': 'rdv', 'description': ''}, 302, 4),
+    # Flux .ics : la clé de l'utilisateur est relue à chaque appel (révocation immédiate)
+    ('calendar_feed', 'GET', '/calendar.ics?token={calendar_token}', None, 200, 3),
+    ('love_challenges', 'GET', '/love_challenges', None, 200, 4),
+    ('complete_challenge', 'GET', '/complete_challenge/{new.challenge}', None, 302, 4),
+    ('mood', 'GET', '/mood', None, 200, 1),
+    ('mood_result', 'GET', '/mood_result/heureuse', None, 200, 1),
+    ('personalize', 'GET', '/personalize', None, 200, 1),
+    ('personalize_post', 'POST', '/personalize', {'favorite_color': '#e1f5fe'}, 302, 5),
+    ('stats', 'GET', '/stats', None, 200, 3),
+    # Exports complets (NDJSON, puis ZIP avec les photos) et import d'un lot de 100 messages
+    # (un seul INSERT multi-lignes : le budget ne dépend pas de la taille du lot)
+    ('export', 'GET', '/export', None, 200, 8),
+    ('export_since', 'GET', '/export?since=2999-01-01', None, 200, 8),
+    ('export_zip', 'GET', '/export?format=zip', None, 200, 9),
+    ('import', 'POST', '/import', lambda new: {'file': (io.BytesIO(new.import_batch), 'lot.ndjson')}, 200, 7),
+    ('birthday_surprise', 'GET', '/birthday_surprise', None, 302, 2),
+    ('countdown', 'GET', '/countdown', None, 200, 1),
+    ('locked', 'GET', '/locked', None, 200, 1),
+    ('special_access', 'GET', '/special_access', None, 302, 1),
+    ('special_access_post', 'POST', '/special_access', {'name': 'fanta', 'password': '0000'}, 302, 1),
+    ('unlock_special', 'POST', '/unlock_special', json.dumps({'name': 'fanta', 'password': '0000'}), 200, 1),
+    ('login_page', 'GET', '/login', None, 200, 1),
+    ('health', 'GET', '/health', None, 200, 1),
+    ('metrics', 'GET', '/metrics', None, 200, 1),
+    # En dernier : la session est reconnectée avant chaque passage, mais pas après
+    ('logout', 'GET', '/logout{new.session}', None, 302, 2),
+]
+
+# GIF 1x1 envoyé par la route upload
+PHOTO_BYTES = bytes.fromhex('47494638396101000100800000ffffff00000021f90401000000002c00000000010001000002024401003b')
+
+# Octets d'une photo exportée : les photos générées pointent vers un hébergeur externe
+EXPORTED_PHOTO = os.urandom(32 * 1024)
+
+IMPORT_BATCH_SIZE = 100
+
+
+class Fresh:
+    """Lignes créées avant chaque passage d'une route qui les consomme
+    (suppressions, défi à terminer), hors de la mesure"""
+
+    def __init__(self, app, client, db):
+        self.app = app
+        self.client = client
+        self.db = db
+
+    def _add(self, obj):
+        with self.app.app_context():
+            self.db.session.add(obj)
+            self.db.session.commit()
+            return obj.id
+
+    @property
+    def phrase(self):
+        from models import Phrase
+        return self._add(Phrase(texte='À supprimer', auteur='panda bg'))
+
+    @property
+    def photo(self):
+        from models import Photo
+        return self._add(Photo(filename='benchmark.gif', auteur='panda bg', status='ready'))
+
+    @property
+    def challenge(self):
+        from models import Challenge
+        return self._add(Challenge(title='Défi', description='Benchmark', challenge_type='message', points=5))
+
+    @property
+    def session(self):
+        """Reconnecte l'utilisateur (avant logout) ; ne produit aucun texte"""
+        with self.app.app_context():
+            login(self.client)
+        return ''
+
+    @property
+    def import_batch(self):
+        """Lot NDJSON de messages jamais importés, même dans une base réutilisée
+        (sinon l'import les écarte comme doublons) : datés de l'instant présent,
+        pour que la recherche des doublons par date ne grossisse pas d'un passage à l'autre"""
+        start = datetime.utcnow()
+        records = [
+            {'type': 'phrase', 'texte': f'Import {i}', 'auteur': 'panda bg',
+             'date': (start + timedelta(microseconds=i)).isoformat()}
+            for i in range(IMPORT_BATCH_SIZE)
+        ]
+        return ''.join(json.dumps(record) + '\n' for record in records).encode()
+
+
+def login(client):
+    with client.session_transaction(base_url='https://localhost') as session:
+        session['user'] = 'panda bg'
+        session['special_access'] = True
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def seed_counts(size):
+    """Volumes générés pour une échelle : messages et activités en proportion"""
+    return {'phrases': size, 'activities': size, 'letters': max(1, size // 10),
+            'photos': max(1, size // 10), 'memories': max(1, size // 100), 'events': max(1, size // 100)}
+
+
+class QueryCounter:
+    """Compte les requêtes SQL exécutées par le thread courant"""
+
+    def __init__(self):
+        self.count = 0
+        self._thread = threading.get_ident()
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if threading.get_ident() == self._thread:
+            self.count += 1
+
+
+def run_scale(scale, iterations, workdir, only=None):
+    """Mesure toutes les routes à une échelle ; retourne {route: mesures}"""
+    directory = os.path.join(workdir, scale)
+    os.makedirs(os.path.join(directory, 'instance'), exist_ok=True)
+    fresh = not os.path.exists(os.path.join(directory, 'instance', 'database.db'))
+    # La base et les uploads sont relatifs au répertoire courant (voir config.py)
+    os.chdir(directory)
+    os.environ['PHOTO_UPLOADER'] = 'local'
+    sys.path.insert(0, ROOT)
+
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    import services
+    from app import create_app
+    from database import init_db, seed_database
+    from models import Letter, Photo, Phrase, User, db
+    app = create_app()
+    # Mesurer le traitement des routes, pas les refus du limiteur de débit
+    # (like_phrase et like_photo puisent dans le même seau)
+    services.rate_limiter.limits.clear()
+
+    with app.app_context():
+        init_db()
+        if fresh:
+            started = time.monotonic()
+            seed_database(seed_counts(SCALES[scale]), batch_size=10_000, seed=SCALES[scale])
+            print(f'  [{scale}] données générées en {time.monotonic() - started:.1f}s', file=sys.stderr)
+        ids = {
+            'phrase_id': db.session.query(db.func.max(Phrase.id)).scalar(),
+            'photo_id': db.session.query(db.func.max(Photo.id)).scalar(),
+            'letter_id': db.session.query(db.func.max(Letter.id)).scalar(),
+            'calendar_token': services.calendar_feed_token(User.query.filter_by(username='panda bg').one()),
+        }
+
+    # Export ZIP : octets fixes à la place de l'hébergeur, sans réseau
+    import blueprints.data
+    blueprints.data.fetch_photo = lambda record: iter([EXPORTED_PHOTO])
+
+    client = app.test_client()
+    login(client)
+    new = Fresh(app, client, db)
+
+    counter = QueryCounter()
+    event.listen(Engine, 'after_cursor_execute', counter)
+    results = {}
+    try:
+        for name, method, path, data, expected, budget in ROUTES:
+            if only and name not in only:
+                continue
+            headers = {}
+            if name.endswith('_304'):
+                etag = client.open(path.format(**ids), method=method, base_url='https://localhost').headers.get('ETag')
+                headers['If-None-Match'] = etag or ''
+            timings, queries, statuses = [], [], []
+            for i in range(iterations + 2):
+                # Lignes à consommer et données du passage, préparées hors mesure
+                url = path.format(new=new, **ids)
+                body = data(new) if callable(data) else data
+                content_type = 'application/json' if isinstance(body, str) else None
+                counter.count = 0
+                started = time.perf_counter()
+                response = client.open(url, method=method, data=body, headers=headers,
+                                       content_type=content_type, base_url='https://localhost')
+                response.get_data()
+                elapsed = (time.perf_counter() - started) * 1000
+                statuses.append(response.status_code)
+                # Deux passages d'échauffement (caches, compilation des templates)
+                if i >= 2:
+                    timings.append(elapsed)
+                    queries.append(counter.count)
+            # Le premier statut inattendu, s'il y en a un
+            status = next((s for s in statuses if s != expected), expected)
+            results[name] = {
+                'status': status,
+                'expected': expected,
+                'p50_ms': round(percentile(timings, 0.50), 2),
+                'p95_ms': round(percentile(timings, 0.95), 2),
+                'p99_ms': round(percentile(timings, 0.99), 2),
+                'queries': max(queries),
+                'budget': budget,
+            }
+    finally:
+        event.remove(Engine, 'after_cursor_execute', counter)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Liste des échecs : statuts inattendus, budgets de requêtes dépassés et régressions"""
+    failures = []
+    for scale, routes in results.items():
+        for name, measure in routes.items():
+            expected = measure.get('expected', measure['status'])
+            if measure['status'] != expected:
+                failures.append(f'{scale} {name}: statut {measure["status"]} (attendu {expected})')
+            if measure['queries'] > measure['budget']:
+                failures.append(f'{scale} {name}: {measure["queries"]} requêtes SQL (budget {measure["budget"]})')
+            reference = baseline.get(scale, {}).get(name)
+            if reference:
+                limit = reference['p50_ms'] * (1 + threshold)
+                if measure['p50_ms'] > limit and measure['p50_ms'] - reference['p50_ms'] > NOISE_FLOOR_MS:
+                    failures.append(f'{scale} {name}: p50 {measure["p50_ms"]}ms '
+                                    f'(référence {reference["p50_ms"]}ms, +{threshold:.0%} max)')
+    return failures
+
+
+def print_table(scale, routes):
+    print(f'\n=== {scale} ===')
+    print(f'{"route":<20} {"statut":>6} {"p50":>9} {"p95":>9} {"p99":>9} {"SQL":>5} {"budget":>6}')
+    for name, m in routes.items():
+        flag = '' if m['queries'] <= m['budget'] else '  ❌'
+        print(f'{name:<20} {m["status"]:>6} {m["p50_ms"]:>7.2f}ms {m["p95_ms"]:>7.2f}ms '
+              f'{m["p99_ms"]:>7.2f}ms {m["queries"]:>5} {m["budget"]:>6}{flag}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', action='append', choices=SCALES, help='échelle(s) à mesurer (défaut : 1k)')
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--route', action='append', help='ne mesurer que ces routes')
+    parser.add_argument('--workdir', default=os.path.join(tempfile.gettempdir(), 'cisse-fanta-bench'),
+                        help='répertoire des bases générées (réutilisées d\'une exécution à l\'autre)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help='enregistrer ces mesures comme référence')
+    parser.add_argument('--threshold', type=float, default=0.25, help='régression tolérée sur le p50 (0.25 = +25%%)')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        # Une échelle par processus : l'application est importée avec sa propre base
+        results = run_scale(args.child, args.iterations, args.workdir, args.route)
+        print(json.dumps(results))
+        return
+
+    results = {}
+    for scale in args.scale or ['1k']:
+        command = [sys.executable, os.path.abspath(__file__), '--child', scale,
+                   '--iterations', str(args.iterations), '--workdir', args.workdir]
+        for route in args.route or []:
+            command += ['--route', route]
+        output = subprocess.run(command, check=True, stdout=subprocess.PIPE, text=True).stdout
+        results[scale] = json.loads(output.strip().splitlines()[-1])
+        print_table(scale, results[scale])
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f'\n✅ Référence enregistrée dans {args.baseline}')
+        return
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    failures = compare(results, baseline, args.threshold)
+    if failures:
+        print('\n❌ Échecs :')
+        for failure in failures:
+            print(f'  {failure}')
+        sys.exit(1)
+    print('\n✅ Toutes les routes répondent le statut attendu et respectent leur budget')
+
+
+if __name__ == '__main__':
+    main()
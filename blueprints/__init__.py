@@ -0,0 +1,4 @@
+from blueprints import auth, data, letters, love_calendar, main, memories, ops, photos
+
+# Dans l'ordre d'enregistrement : auth d'abord, pour ses before_app_request
+BLUEPRINTS = [auth.bp, main.bp, photos.bp, letters.bp, memories.bp, love_calendar.bp, data.bp, ops.bp]
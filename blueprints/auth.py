@@ -0,0 +1,197 @@
+from datetime import datetime, timezone
+
+from flask import Blueprint, flash, g, jsonify, redirect, render_template, request, session, url_for
+from werkzeug.security import check_password_hash
+
+import services
+from models import User, db
+from services import UNLOCK_DATE, is_site_unlocked, limit_exceeded, log_activity, take_tokens
+
+bp = Blueprint('auth', __name__)
+
+# Pages accessibles sans être connecté
+PUBLIC_ENDPOINTS = ['auth.login', 'auth.locked_page', 'static', 'auth.unlock_special',
+                    'calendar.calendar_feed', 'ops.metrics_endpoint']
+
+@bp.before_app_request
+def check_access():
+    """Vérifie l'accès au site selon la date de déverrouillage"""
+    # Pages autorisées même quand le site est verrouillé
+    allowed_paths = ['/login', '/static', '/locked', '/logout', '/unlock_special', '/special_access', '/calendar.ics', '/metrics']
+    
+    # Vérifier si le site est toujours verrouillé
+    if not is_site_unlocked():
+        # Si l'utilisateur a déjà accès spécial, le laisser passer
+        if session.get('special_access'):
+            return
+        
+        # Vérifier si l'utilisateur essaie d'accéder à une page non autorisée
+        if not any(request.path.startswith(path) for path in allowed_paths):
+            return redirect(url_for('auth.locked_page'))
+        
+@bp.before_app_request
+def require_login():
+    """Vérifie que l'utilisateur est connecté pour toutes les routes sauf login et locked"""
+    if (request.endpoint and 
+        request.endpoint not in PUBLIC_ENDPOINTS and 
+        'user' not in session):
+        return redirect(url_for('auth.login'))
+
+@bp.before_app_request
+def load_current_user():
+    """Utilisateur connecté, résolu une fois par requête depuis le cache"""
+    g.current_user = None
+    if request.endpoint != 'static' and 'user' in session:
+        g.current_user = services.user_cache.get(session['user'])
+
+@bp.route('/locked')
+def locked_page():
+    """Page de verrouillage avec compte à rebours"""
+    # Calculer le temps restant jusqu'au déverrouillage
+    now = datetime.now()
+    time_remaining = UNLOCK_DATE - now
+    
+    # Formater le temps restant
+    days = time_remaining.days
+    hours, remainder = divmod(time_remaining.seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    
+    return render_template('locked.html', 
+                         unlock_date=UNLOCK_DATE,
+                         days=days,
+                         hours=hours,
+                         minutes=minutes,
+                         seconds=seconds)
+
+@bp.route('/unlock_special', methods=['POST'])
+def unlock_special():
+    """API pour déverrouiller l'accès spécial (utilisée par la porte mystérieuse)"""
+    if is_site_unlocked():
+        return jsonify({'success': True, 'message': 'Le site est déjà déverrouillé'})
+    
+    retry_after = limit_exceeded(('unlock', request.remote_addr))
+    if retry_after:
+        return jsonify({
+            'success': False,
+            'message': 'Trop d\'essais. Merci de patienter.'
+        }), 429, {'Retry-After': retry_after}
+    
+    data = request.get_json()
+    name = data.get('name', '').strip().lower()
+    password = data.get('password', '').strip()
+    
+    if name == 'saïd':
+        session['special_access'] = True
+        return jsonify({
+            'success': True,
+            'message': 'Accès spécial accordé ! Bienvenue Saïd.'
+        })
+    elif password == '2708':
+        return jsonify({
+            'success': False,
+            'message': 'Ohhhh bien tenté Fanta ! Je t\'ai reconnu, tu as cru que ça serait si facile que ça ? Tu vas patienter.'
+        })
+    else:
+        return jsonify({
+            'success': False,
+            'message': 'Accès refusé. Merci de patienter.'
+        })
+
+@bp.route('/login', methods=['GET', 'POST'])
+def login():
+    if request.method == 'POST':
+        username = request.form['username'].lower().strip()
+        password = request.form['password']
+        
+        # Limiter les essais avant toute vérification (coûteuse) du mot de passe
+        retry_after, (_, by_user) = take_tokens(('login_ip', request.remote_addr), ('login_user', username))
+        if retry_after:
+            flash(f'Trop de tentatives, réessaie dans {retry_after} secondes 🕐', 'error')
+            return render_template('login.html'), 429, {'Retry-After': retry_after}
+        
+        user = User.query.filter_by(username=username).first()
+        
+        if user and check_password_hash(user.password_hash, password):
+            # Nouvel identifiant de session à la connexion (fixation de session)
+            if hasattr(session, 'rotate'):
+                session.rotate()
+            session['user'] = username
+            
+            # Mettre à jour les statistiques de connexion
+            user.visit_count += 1
+            user.last_login = datetime.now(timezone.utc)
+            db.session.commit()
+            services.user_cache.invalidate(username)
+            
+            log_activity(username, 'login')
+            flash('Connexion réussie ! Bienvenue dans ton jardin secret 💖', 'success')
+            
+            # Rediriger vers la page appropriée selon l'état de déverrouillage
+            if is_site_unlocked() or session.get('special_access'):
+                return redirect(url_for('main.index'))
+            else:
+                return redirect(url_for('auth.locked_page'))
+        else:
+            # Indices selon les essais récents pour ce nom (seau login_user)
+            count = services.rate_limiter.used('login_user', by_user) or 1
+            
+            if count == 1:
+                if username == 'maninka mousso':
+                    flash('Hmm... Pense à ce que je te dit toujours sur ta beauté 💫', 'error')
+                elif username == 'panda bg':
+                    flash('Rappelle-toi cette phrase romantique qui est une déclaration à nous 🌙', 'error')
+                else:
+                    flash('Nom d\'utilisateur ou mot de passe incorrect', 'error')
+            elif count == 2:
+                if username == 'maninka mousso':
+                    flash('Indice : "Elle a toujours été..." - tu sais la suite ! ✨', 'error')
+                elif username == 'panda bg':
+                    flash('Indice : "La lune est..." - continue la phrase romantique 🌙', 'error')
+                else:
+                    flash('Nom d\'utilisateur ou mot de passe incorrect', 'error')
+            elif count >= 3:
+                if username == 'maninka mousso':
+                    flash('Ton mot de passe est : "Elle a toujours été belle" 💖', 'info')
+                elif username == 'panda bg':
+                    flash('Ton mot de passe est : "La lune est belle ce soir" 🌙', 'info')
+                else:
+                    flash('Trop de tentatives. Contacte l\'administrateur.', 'error')
+            else:
+                flash('Nom d\'utilisateur ou mot de passe incorrect', 'error')
+    
+    return render_template('login.html')
+
+@bp.route('/special_access', methods=['GET', 'POST'])
+def special_access():
+    """Page d'accès spécial avec l'œil qui observe"""
+    if is_site_unlocked():
+        return redirect(url_for('main.index'))
+    
+    if request.method == 'POST':
+        name = request.form['name'].strip().lower()
+        password = request.form['password'].strip()
+        
+        if limit_exceeded(('unlock', request.remote_addr)):
+            flash('Trop d\'essais. Merci de patienter.', 'error')
+            return render_template('special_access.html'), 429
+        
+        if name == 'saïd':
+            session['special_access'] = True
+            flash('Accès spécial accordé ! Bienvenue Saïd.', 'success')
+            return redirect(url_for('main.index'))
+        elif password == '2708':
+            flash('Ohhhh bien tenté Fanta ! Je t\'ai reconnu, tu as cru que ça serait si facile que ça ? Tu vas patienter.', 'error')
+        else:
+            flash('Accès refusé. Merci de patienter.', 'error')
+    
+    return render_template('special_access.html')
+
+@bp.route('/logout')
+def logout():
+    user = session.get('user')
+    if user:
+        log_activity(user, 'logout')
+    session.pop('user', None)
+    session.pop('special_access', None)
+    flash('Déconnexion réussie. À bientôt ! 👋', 'info')
+    return redirect(url_for('auth.login'))
@@ -0,0 +1,50 @@
+import io
+from datetime import datetime
+
+from flask import Blueprint, Response, abort, jsonify, redirect, request, session, stream_with_context, url_for
+
+from models import db
+from services import exporter, fetch_photo, is_site_unlocked, log_activity, parse_since, run_import
+
+bp = Blueprint('data', __name__)
+
+@bp.route('/export')
+def export():
+    """Export de toutes nos données en NDJSON, ou en ZIP avec les photos"""
+    # Vérifier si le site est déverrouillé
+    if not is_site_unlocked() and not session.get('special_access'):
+        return redirect(url_for('auth.locked_page'))
+    
+    try:
+        since = parse_since(request.args.get('since'))
+    except ValueError:
+        abort(400)
+    
+    stamp = datetime.utcnow().strftime('%Y%m%d-%H%M%S')
+    if request.args.get('format') == 'zip':
+        body, mimetype, filename = exporter.iter_zip(db.session, since, fetch=fetch_photo), 'application/zip', f'cisse-fanta-{stamp}.zip'
+    else:
+        body, mimetype, filename = exporter.iter_ndjson(db.session, since), 'application/x-ndjson', f'cisse-fanta-{stamp}.ndjson'
+    
+    log_activity(session['user'], 'export', filename)
+    return Response(stream_with_context(body), mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename="{filename}"'})
+
+@bp.route('/import', methods=['POST'])
+def import_data():
+    """Import en masse de messages, souvenirs et événements (NDJSON ou CSV)"""
+    # Vérifier si le site est déverrouillé
+    if not is_site_unlocked() and not session.get('special_access'):
+        return redirect(url_for('auth.locked_page'))
+    
+    upload = request.files.get('file')
+    source = upload.stream if upload else request.stream
+    filename = upload.filename if upload else ''
+    fmt = request.args.get('format') or ('csv' if filename.lower().endswith('.csv') or request.mimetype == 'text/csv' else 'ndjson')
+    
+    report = run_import(io.TextIOWrapper(source, encoding='utf-8-sig', newline=''), fmt, request.args.get('type'))
+    
+    total = sum(report.inserted.values())
+    if total:
+        log_activity(session['user'], 'import', f'{total} éléments importés')
+    return jsonify(report.as_dict()), 200 if not report.errors else 422
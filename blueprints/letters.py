@@ -0,0 +1,84 @@
+from flask import Blueprint, flash, g, redirect, render_template, request, session, url_for
+
+from models import Letter, db
+from services import is_site_unlocked, log_activity, page_validator
+
+bp = Blueprint('letters', __name__)
+
+@bp.route('/letters')
+def letters():
+    # Vérifier si le site est déverrouillé
+    if not is_site_unlocked() and not session.get('special_access'):
+        return redirect(url_for('auth.locked_page'))
+    
+    user = session['user']
+    
+    # Rien à recharger si le navigateur a déjà cette version de la page
+    validator = page_validator(('letters',))
+    if validator.is_current():
+        return validator.not_modified()
+    
+    # Lettres reçues
+    received_letters = Letter.query.filter_by(recipient=user).order_by(Letter.created_at.desc()).all()
+    
+    # Lettres envoyées
+    sent_letters = Letter.query.filter_by(sender=user).order_by(Letter.created_at.desc()).all()
+    
+    return validator.apply(render_template('letters.html', 
+                         received_letters=received_letters,
+                         sent_letters=sent_letters,
+                         user=user))
+
+@bp.route('/write_letter', methods=['GET', 'POST'])
+def write_letter():
+    # Vérifier si le site est déverrouillé
+    if not is_site_unlocked() and not session.get('special_access'):
+        return redirect(url_for('auth.locked_page'))
+    
+    user = session['user']
+    recipient = g.current_user.partner if g.current_user else None
+    if not recipient:
+        flash('Aucun destinataire pour tes lettres 💔', 'error')
+        return redirect(url_for('letters.letters'))
+    
+    if request.method == 'POST':
+        title = request.form['title'].strip()
+        content = request.form['content'].strip()
+        
+        if title and content:
+            letter = Letter(
+                title=title,
+                content=content,
+                sender=user,
+                recipient=recipient
+            )
+            db.session.add(letter)
+            db.session.commit()
+            
+            log_activity(user, 'letter_sent', f'To: {recipient}, Title: {title}')
+            flash('Lettre envoyée avec amour ! 💌', 'success')
+            return redirect(url_for('letters.letters'))
+    
+    return render_template('write_letter.html', user=user, recipient=recipient)
+
+@bp.route('/read_letter/<int:letter_id>')
+def read_letter(letter_id):
+    # Vérifier si le site est déverrouillé
+    if not is_site_unlocked() and not session.get('special_access'):
+        return redirect(url_for('auth.locked_page'))
+    
+    user = session['user']
+    letter = Letter.query.get_or_404(letter_id)
+    
+    # Vérifier que l'utilisateur peut lire cette lettre
+    if letter.sender != user and letter.recipient != user:
+        flash('Vous n\'avez pas accès à cette lettre', 'error')
+        return redirect(url_for('letters.letters'))
+    
+    # Marquer comme lue si c'est le destinataire
+    if letter.recipient == user and not letter.is_read:
+        letter.is_read = True
+        db.session.commit()
+        log_activity(user, 'letter_read', f'Letter ID: {letter_id}')
+    
+    return render_template('read_letter.html', letter=letter, user=user)
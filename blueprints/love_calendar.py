@@ -0,0 +1,132 @@
+import calendar
+from datetime import datetime
+
+from flask import Blueprint, Response, abort, flash, g, redirect, render_template, request, session, stream_with_context, url_for
+
+import services
+from ical import event_lines, iter_calendar
+from models import CalendarEvent, User, counters, db, new_calendar_key
+from month_grid import MonthGridCache, month_bounds
+from services import is_site_unlocked
+
+bp = Blueprint('calendar', __name__)
+
+# Dates spéciales du calendrier, chaque année : {(mois, jour): ...}
+SPECIAL_DATES = {
+    (9, 27): {'title': 'Anniversaire de Maninka Mousso', 'type': 'anniversary'},
+}
+
+def load_month_events(year, month):
+    """Événements d'un mois, regroupés par jour (données simples, pour le cache)"""
+    start, end = month_bounds(year, month)
+    events = db.session.query(CalendarEvent.event_date, CalendarEvent.title, CalendarEvent.event_type).filter(
+        CalendarEvent.event_date >= start,
+        CalendarEvent.event_date < end
+    ).order_by(CalendarEvent.event_date, CalendarEvent.id)
+    
+    events_by_day = {}
+    for event_date, title, event_type in events:
+        events_by_day.setdefault(event_date.day, []).append({'title': title, 'event_type': event_type})
+    return events_by_day
+
+month_grids = MonthGridCache(load_month_events)
+
+@bp.route('/love_calendar')
+def love_calendar():
+    # Vérifier si le site est déverrouillé
+    if not is_site_unlocked() and not session.get('special_access'):
+        return redirect(url_for('auth.locked_page'))
+    
+    year = request.args.get('year', datetime.now().year, type=int)
+    month = request.args.get('month', datetime.now().month, type=int)
+    if not (1 <= month <= 12 and 1 <= year <= 9998):
+        return redirect(url_for('calendar.love_calendar'))
+    
+    # Grille et événements du mois, recalculés seulement après un ajout
+    version = counters.version(db.session.connection(), 'calendar')
+    grid = month_grids.get(year, month, version)
+    month_name = calendar.month_name[month]
+    
+    special_dates = {day: info for (m, day), info in SPECIAL_DATES.items() if m == month}
+    
+    return render_template('love_calendar.html',
+                         calendar_data=grid.weeks,
+                         current_month=month,
+                         current_year=year,
+                         month_name=month_name,
+                         events_by_day=grid.events_by_day,
+                         special_dates=special_dates,
+                         today=datetime.now().date(),
+                         feed_url=url_for('calendar.calendar_feed', token=services.calendar_feed_token(g.current_user),
+                                          _external=True) if g.current_user else None)
+
+@bp.route('/add_calendar_event', methods=['POST'])
+def add_calendar_event():
+    # Vérifier si le site est déverrouillé
+    if not is_site_unlocked() and not session.get('special_access'):
+        return redirect(url_for('auth.locked_page'))
+    
+    title = request.form['title'].strip()
+    event_date = request.form['event_date']
+    event_type = request.form['event_type']
+    description = request.form.get('description', '').strip()
+    
+    if title and event_date:
+        event = CalendarEvent(
+            title=title,
+            event_date=datetime.strptime(event_date, '%Y-%m-%d').date(),
+            event_type=event_type,
+            description=description,
+            created_by=session['user']
+        )
+        db.session.add(event)
+        # Invalider les grilles en cache, dans la même transaction que l'ajout
+        counters.bump(db.session.connection(), 'calendar')
+        db.session.commit()
+        
+        flash('Événement ajouté au calendrier ! 📅', 'success')
+    
+    return redirect(url_for('calendar.love_calendar'))
+
+@bp.route('/reset_calendar_feed', methods=['POST'])
+def reset_calendar_feed():
+    """Nouvelle clé d'abonnement : les liens .ics déjà donnés ne fonctionnent plus"""
+    # Vérifier si le site est déverrouillé
+    if not is_site_unlocked() and not session.get('special_access'):
+        return redirect(url_for('auth.locked_page'))
+    
+    user = session['user']
+    User.query.filter_by(username=user).update({'calendar_key': new_calendar_key()})
+    counters.touch(db.session.connection(), User)
+    db.session.commit()
+    services.user_cache.invalidate(user)
+    
+    flash('Nouveau lien d\'abonnement créé, l\'ancien ne fonctionne plus 🔒', 'success')
+    return redirect(url_for('calendar.love_calendar'))
+
+@bp.route('/calendar.ics')
+def calendar_feed():
+    """Flux iCalendar des événements, pour s'abonner depuis un agenda"""
+    if services.calendar_feed_user(request.args.get('token', '')) is None:
+        abort(403)
+    
+    def events():
+        for (month, day), info in SPECIAL_DATES.items():
+            yield event_lines(f'special-{month:02d}{day:02d}@cisse-fanta',
+                              datetime(2000, month, day).date(), info['title'], datetime(2000, 1, 1),
+                              category=info['type'], rrule='FREQ=YEARLY')
+        # Parcours par lots : le flux n'est jamais chargé en entier en mémoire
+        rows = db.session.execute(
+            db.select(CalendarEvent.id, CalendarEvent.event_date, CalendarEvent.title,
+                      CalendarEvent.description, CalendarEvent.event_type, CalendarEvent.created_at)
+            .order_by(CalendarEvent.event_date, CalendarEvent.id)
+            .execution_options(yield_per=200)
+        )
+        for row in rows:
+            yield event_lines(f'event-{row.id}@cisse-fanta', row.event_date, row.title,
+                              row.created_at or datetime.utcnow(),
+                              description=row.description, category=row.event_type)
+    
+    return Response(stream_with_context(iter_calendar('Notre Calendrier', events())),
+                    mimetype='text/calendar',
+                    headers={'Content-Disposition': 'inline; filename="calendrier.ics"'})
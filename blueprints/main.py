@@ -0,0 +1,390 @@
+from datetime import datetime
+
+from flask import Blueprint, abort, current_app, flash, g, jsonify, redirect, render_template, request, session, url_for
+
+import services
+from models import Activity, Challenge, Phrase, Tag, User, counters, db, normalize_tag, phrase_tags, search_index, set_phrase_tags
+from search import KIND_CODES, SearchPage
+from services import (add_like, counts_by_author, get_love_quotes, is_site_unlocked, load_search_results, log_activity,
+                      limit_exceeded, page_validator, paginate_feed)
+
+bp = Blueprint('main', __name__)
+
+@bp.route('/', methods=['GET', 'POST'])
+def index():
+    # Vérifier si le site est déverrouillé
+    if not is_site_unlocked() and not session.get('special_access'):
+        return redirect(url_for('auth.locked_page'))
+    
+    user = session['user']
+    
+    if request.method == 'POST':
+        texte = request.form['texte'].strip()
+        couleur = request.form.get('couleur', '#ffdde1')
+        tags = request.form.get('tags', '').strip()
+        
+        if texte:
+            phrase = Phrase(
+                texte=texte,
+                auteur=user,
+                couleur=couleur,
+                tags=tags
+            )
+            set_phrase_tags(phrase, tags)
+            db.session.add(phrase)
+            db.session.commit()
+            
+            log_activity(user, 'message_added', f'Message: {texte[:50]}...')
+            flash('Message ajouté avec succès ! 💖', 'success')
+        
+        return redirect(url_for('main.index'))
+    
+    # Informations utilisateur (depuis le cache, sans requête)
+    user_info = g.current_user
+    
+    # Rien à recharger si le navigateur a déjà cette version de la page
+    validator = page_validator(('phrases', 'photos', 'letters'), datetime.now().date())
+    if validator.is_current():
+        return validator.not_modified()
+    
+    # Récupérer les messages : par curseur, ou par numéro de page en secours
+    phrases, pagination = paginate_feed(Phrase, 10)
+    
+    # Statistiques : tous les compteurs de la page en une seule requête
+    values = counters.read(db.session.connection(),
+                           ('phrases', 'photos', 'favoris', f'unread:{user}'))
+    stats = {
+        'total_messages': values['phrases'],
+        'total_photos': values['photos'],
+        'favoris_count': values['favoris']
+    }
+    
+    # Lettres non lues
+    unread_letters = values[f'unread:{user}']
+    
+    # Salutation personnalisée
+    greetings = {
+        'maninka mousso': "Salut ma maninka mousso préférée( seule d'ailleurs 😂 )",
+        'panda bg': "Salut mon panda préféré"
+    }
+    
+    return validator.apply(render_template('index.html',
+                         phrases=phrases,
+                         user=user,
+                         pagination=pagination,
+                         stats=stats,
+                         unread_letters=unread_letters,
+                         visit_count=user_info.visit_count if user_info else 0,
+                         current_user={'favorite_color': user_info.favorite_color if user_info else '#ffdde1'},
+                         personal_greeting=greetings.get(user, f"Salut {user.title()}"),
+                         love_quote=get_love_quotes(),
+                         now=datetime.now()))
+
+@bp.route('/toggle_favori/<int:phrase_id>')
+def toggle_favori(phrase_id):
+    # Vérifier si le site est déverrouillé
+    if not is_site_unlocked() and not session.get('special_access'):
+        return redirect(url_for('auth.locked_page'))
+    
+    phrase = Phrase.query.get_or_404(phrase_id)
+    phrase.est_favori = not phrase.est_favori
+    db.session.commit()
+    
+    action = 'favori_added' if phrase.est_favori else 'favori_removed'
+    log_activity(session['user'], action, f'Phrase ID: {phrase_id}')
+    
+    return redirect(url_for('main.index'))
+
+@bp.route('/like_phrase/<int:phrase_id>')
+def like_phrase(phrase_id):
+    # Vérifier si le site est déverrouillé
+    if not is_site_unlocked() and not session.get('special_access'):
+        return jsonify({'error': 'Site verrouillé'}), 403
+    
+    retry_after = limit_exceeded(('like', session['user']))
+    if retry_after:
+        return jsonify({'error': 'Doucement, trop de likes 💕'}), 429, {'Retry-After': retry_after}
+    
+    likes = add_like(Phrase, phrase_id)
+    if likes is None:
+        abort(404)
+    
+    log_activity(session['user'], 'phrase_liked', f'Phrase ID: {phrase_id}')
+    
+    return jsonify({'likes': likes})
+
+@bp.route('/supprimer_phrase/<int:phrase_id>')
+def supprimer_phrase(phrase_id):
+    # Vérifier si le site est déverrouillé
+    if not is_site_unlocked() and not session.get('special_access'):
+        return redirect(url_for('auth.locked_page'))
+    
+    user = session['user']
+    phrase = Phrase.query.get_or_404(phrase_id)
+    
+    # Vérifier que l'utilisateur est l'auteur
+    if phrase.auteur == user:
+        db.session.delete(phrase)
+        db.session.commit()
+        log_activity(user, 'phrase_deleted', f'Phrase ID: {phrase_id}')
+        flash('Message supprimé avec succès', 'success')
+    else:
+        flash('Vous ne pouvez supprimer que vos propres messages', 'error')
+    
+    return redirect(url_for('main.index'))
+
+@bp.route('/mood', methods=['GET', 'POST'])
+def mood():
+    # Vérifier si le site est déverrouillé
+    if not is_site_unlocked() and not session.get('special_access'):
+        return redirect(url_for('auth.locked_page'))
+    
+    if request.method == 'POST':
+        selected_mood = request.form['mood']
+        log_activity(session['user'], 'mood_checked', f'Mood: {selected_mood}')
+        return redirect(url_for('main.mood_result', mood=selected_mood))
+    
+    return render_template('mood.html', user=session['user'])
+
+@bp.route('/mood_result/<mood>')
+def mood_result(mood):
+    # Vérifier si le site est déverrouillé
+    if not is_site_unlocked() and not session.get('special_access'):
+        return redirect(url_for('auth.locked_page'))
+    
+    # Rotation sans répétition pour chaque utilisateur
+    verse = services.verse_store.next_verse(session['user'], mood)
+    
+    return render_template('mood_result.html', mood=mood, verse=verse, user=session['user'])
+
+@bp.route('/search')
+def search():
+    # Vérifier si le site est déverrouillé
+    if not is_site_unlocked() and not session.get('special_access'):
+        return redirect(url_for('auth.locked_page'))
+    
+    query = request.args.get('q', '').strip()
+    page = request.args.get('page', 1, type=int)
+    kind = request.args.get('type', '')
+    if kind not in KIND_CODES:
+        kind = ''
+    results = []
+    pagination = None
+    
+    if query:
+        pagination = search_index.search(
+            db.session.connection(), query, session['user'],
+            kinds=[kind] if kind else None,
+            page=page, per_page=20
+        )
+        results = load_search_results(pagination.hits)
+        
+        log_activity(session['user'], 'search', f'Query: {query}')
+    
+    return render_template('search_results.html',
+                         results=results,
+                         pagination=pagination,
+                         query=query,
+                         search_type=kind,
+                         user=session['user'])
+
+@bp.route('/tags')
+def tag_facets():
+    """Nombre de messages par tag, via l'index de la table d'association"""
+    if not is_site_unlocked() and not session.get('special_access'):
+        return jsonify({'error': 'Site verrouillé'}), 403
+    
+    facets = db.session.query(
+        Tag.name,
+        db.func.count(phrase_tags.c.phrase_id).label('count')
+    ).join(phrase_tags, phrase_tags.c.tag_id == Tag.id).group_by(Tag.id, Tag.name).order_by(
+        db.func.count(phrase_tags.c.phrase_id).desc(), Tag.name
+    ).all()
+    
+    return jsonify({'tags': [{'name': name, 'count': count} for name, count in facets]})
+
+@bp.route('/tags/<path:name>')
+def phrases_by_tag(name):
+    # Vérifier si le site est déverrouillé
+    if not is_site_unlocked() and not session.get('special_access'):
+        return redirect(url_for('auth.locked_page'))
+    
+    tag_name = normalize_tag(name)
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = 20
+    
+    # Recherche exacte par l'index : « ami » ne ramène pas « amitié »
+    phrases = Phrase.query.join(phrase_tags, phrase_tags.c.phrase_id == Phrase.id).join(
+        Tag, Tag.id == phrase_tags.c.tag_id
+    ).filter(Tag.name == tag_name).order_by(Phrase.date.desc()).limit(per_page + 1).offset(
+        (page - 1) * per_page
+    ).all()
+    
+    pagination = SearchPage([], page, per_page, len(phrases) > per_page)
+    
+    return render_template('search_results.html',
+                         results=[('phrase', phrase) for phrase in phrases[:per_page]],
+                         pagination=pagination,
+                         query='',
+                         tag=tag_name,
+                         search_type='phrase',
+                         user=session['user'])
+
+@bp.route('/love_challenges')
+def love_challenges():
+    # Vérifier si le site est déverrouillé
+    if not is_site_unlocked() and not session.get('special_access'):
+        return redirect(url_for('auth.locked_page'))
+    
+    # Défis actifs
+    active_challenges = Challenge.query.filter_by(is_active=True, completed_by=None).order_by(Challenge.points.desc()).all()
+    
+    # Défis terminés
+    completed_challenges = Challenge.query.filter(Challenge.completed_by.isnot(None)).order_by(Challenge.completed_date.desc()).all()
+    
+    # Points totaux de l'utilisateur
+    total_points = db.session.query(db.func.sum(Challenge.points)).filter(Challenge.completed_by == session['user']).scalar() or 0
+    
+    return render_template('love_challenges.html',
+                         active_challenges=active_challenges,
+                         completed_challenges=completed_challenges,
+                         total_points=total_points,
+                         user=session['user'])
+
+@bp.route('/complete_challenge/<int:challenge_id>')
+def complete_challenge(challenge_id):
+    # Vérifier si le site est déverrouillé
+    if not is_site_unlocked() and not session.get('special_access'):
+        return redirect(url_for('auth.locked_page'))
+    
+    challenge = Challenge.query.get_or_404(challenge_id)
+    
+    # Marquer le défi comme terminé
+    if not challenge.completed_by:
+        challenge.completed_by = session['user']
+        challenge.completed_date = datetime.utcnow()
+        db.session.commit()
+        
+        flash('Défi terminé ! Bravo ! 🎉', 'success')
+    
+    return redirect(url_for('main.love_challenges'))
+
+@bp.route('/personalize', methods=['GET', 'POST'])
+def personalize():
+    # Vérifier si le site est déverrouillé
+    if not is_site_unlocked() and not session.get('special_access'):
+        return redirect(url_for('auth.locked_page'))
+    
+    user = session['user']
+    user_info = g.current_user
+    
+    if request.method == 'POST':
+        favorite_color = request.form['favorite_color']
+        
+        User.query.filter_by(username=user).update({'favorite_color': favorite_color})
+        counters.touch(db.session.connection(), User)
+        db.session.commit()
+        services.user_cache.invalidate(user)
+        
+        flash('Préférences sauvegardées ! 🎨', 'success')
+        return redirect(url_for('main.personalize'))
+    
+    return render_template('personalize.html', 
+                         user=user,
+                         current_user=user_info,
+                         current_color=user_info.favorite_color if user_info else '#ffdde1')
+
+@bp.route('/stats')
+def stats():
+    # Vérifier si le site est déverrouillé
+    if not is_site_unlocked() and not session.get('special_access'):
+        return redirect(url_for('auth.locked_page'))
+    
+    # Statistiques générales, lues dans la table des compteurs
+    values = counters.read_all(db.session.connection())
+    total_messages = values.get('phrases', 0)
+    total_photos = values.get('photos', 0)
+    favoris_count = values.get('favoris', 0)
+    total_letters = values.get('letters', 0)
+    total_memories = values.get('memories', 0)
+    
+    # Messages et photos par utilisateur
+    messages_by_user = counts_by_author(values, 'phrases_by:')
+    photos_by_user = counts_by_author(values, 'photos_by:')
+    
+    # Activité récente (en incluant celle encore en file d'attente)
+    if current_app.config['ACTIVITY_LOG_ASYNC']:
+        services.activity_log.flush()
+    recent_activity = Activity.query.order_by(Activity.date.desc()).limit(20).all()
+    
+    return render_template('stats.html',
+                         total_messages=total_messages,
+                         total_photos=total_photos,
+                         favoris_count=favoris_count,
+                         total_letters=total_letters,
+                         total_memories=total_memories,
+                         messages_by_user=messages_by_user,
+                         photos_by_user=photos_by_user,
+                         recent_activity=recent_activity,
+                         user=session['user'])
+
+
+@bp.route('/birthday_surprise')
+def birthday_surprise():
+    # Vérifier si le site est déverrouillé
+    if not is_site_unlocked() and not session.get('special_access'):
+        return redirect(url_for('auth.locked_page'))
+    
+    # Vérifier que c'est Maninka Mousso et que c'est son anniversaire
+    if session['user'] != 'maninka mousso':
+        flash('Cette page est réservée à Maninka Mousso ! 😊', 'info')
+        return redirect(url_for('main.index'))
+    
+    today = datetime.now().date()
+    if today.month != 9 or today.day < 27:
+        flash('La surprise n\'est pas encore prête ! 🎁', 'info')
+        return redirect(url_for('main.countdown'))
+    
+    # Lettre de surprise d'anniversaire
+    surprise = {
+        'title': 'Joyeux Anniversaire ma Maninka Mousso ! 🎂',
+        'content': '''Ma très chère Maninka Mousso,
+
+Aujourd'hui est un jour très spécial car c'est TON jour ! 🎉
+
+J'ai créé ce site entier comme une déclaration d'amour pour toi. Chaque ligne de code, chaque couleur, chaque fonctionnalité a été pensée avec amour pour te faire sourire.
+
+Tu es ma maninka mousso, la plus gentille, la plus belle, celle qui sait me faire rire. Ton sourire, ta voix, ton amour tout est un trésor.
+
+Pour ton anniversaire, j'ai voulu t'offrir quelque chose d'unique : notre propre jardin secret numérique où nous pouvons cultiver notre amour, partager nos souvenirs et écrire notre histoire.
+
+Que cette nouvelle année de ta vie soit remplie de bonheur, de réussites, de rires et surtout... de nous ! 💕
+
+Je t'aime plus que les mots ne peuvent l'exprimer, plus que les étoiles dans le ciel, plus que tu ne le sais toi-même.
+
+Joyeux anniversaire la plus belle et gentille ! 👑
+
+Ton panda qui trouve la lune si  belle chaque soir 🌙,
+Ton plus grand fan 💖
+
+P.S. : Explore toutes les nouvelles fonctionnalités que j'ai ajoutées spécialement pour ton anniversaire ! 🎁'''
+    }
+    
+    return render_template('birthday_surprise.html', surprise=surprise, user=session['user'])
+
+@bp.route('/countdown')
+def countdown():
+    # Calculer les jours jusqu'au 27 septembre
+    today = datetime.now().date()
+    target_date = datetime(today.year, 9, 27).date()
+    
+    # Si on est déjà passé le 27 septembre cette année, viser l'année prochaine
+    if today > target_date:
+        target_date = datetime(today.year + 1, 9, 27).date()
+    
+    days_left = (target_date - today).days
+    
+    return render_template('countdown.html', 
+                         days_left=days_left,
+                         target_date=target_date,
+                         user=session['user'])
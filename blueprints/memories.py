@@ -0,0 +1,59 @@
+from datetime import datetime
+
+from flask import Blueprint, flash, redirect, render_template, request, session, url_for
+
+from models import Memory, db
+from services import is_site_unlocked, log_activity, page_validator
+
+bp = Blueprint('memories', __name__)
+
+@bp.route('/memories')
+def memories():
+    # Vérifier si le site est déverrouillé
+    if not is_site_unlocked() and not session.get('special_access'):
+        return redirect(url_for('auth.locked_page'))
+    
+    # Rien à recharger si le navigateur a déjà cette version de la page
+    validator = page_validator(('memories',))
+    if validator.is_current():
+        return validator.not_modified()
+    
+    # Souvenirs anniversaires
+    anniversaries = Memory.query.filter_by(is_anniversary=True).order_by(Memory.date_memory.desc()).all()
+    
+    # Souvenirs réguliers
+    regular_memories = Memory.query.filter_by(is_anniversary=False).order_by(Memory.date_memory.desc()).all()
+    
+    return validator.apply(render_template('memories.html', 
+                         anniversaries=anniversaries,
+                         regular_memories=regular_memories,
+                         user=session['user']))
+
+@bp.route('/add_memory', methods=['GET', 'POST'])
+def add_memory():
+    # Vérifier si le site est déverrouillé
+    if not is_site_unlocked() and not session.get('special_access'):
+        return redirect(url_for('auth.locked_page'))
+    
+    if request.method == 'POST':
+        title = request.form['title'].strip()
+        description = request.form['description'].strip()
+        date_memory = request.form['date_memory']
+        is_anniversary = 'is_anniversary' in request.form
+        
+        if title and description and date_memory:
+            memory = Memory(
+                title=title,
+                description=description,
+                date_memory=datetime.strptime(date_memory, '%Y-%m-%d').date(),
+                author=session['user'],
+                is_anniversary=is_anniversary
+            )
+            db.session.add(memory)
+            db.session.commit()
+            
+            log_activity(session['user'], 'memory_added', f'Memory: {title}')
+            flash('Souvenir ajouté avec succès ! ✨', 'success')
+            return redirect(url_for('memories.memories'))
+    
+    return render_template('add_memory.html', user=session['user'])
@@ -0,0 +1,54 @@
+import secrets
+import threading
+import time
+from datetime import datetime
+
+from flask import Blueprint, Response, abort, current_app, request
+
+import services
+
+bp = Blueprint('ops', __name__)
+
+# Route de santé pour les services de monitoring
+@bp.route('/health')
+def health_check():
+    return {'status': 'healthy', 'timestamp': datetime.now().isoformat()}
+
+# Mesures au format Prometheus (jeton facultatif : METRICS_TOKEN)
+@bp.route('/metrics')
+def metrics_endpoint():
+    token = current_app.config['METRICS_TOKEN']
+    if token and not secrets.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        abort(401)
+    return Response(services.metrics.render(), mimetype='text/plain; version=0.0.4')
+
+# Route pour s'auto-pinger (optionnel)
+@bp.route('/self-ping')
+def self_ping():
+    import requests
+
+    try:
+        # Remplace par l'URL de ton site Render
+        response = requests.get('https://ton-site.onrender.com/health')
+        return {'self_ping': 'success', 'status_code': response.status_code}
+    except Exception as e:
+        return {'self_ping': 'failed', 'error': str(e)}
+
+# Fonction pour auto-pinger périodiquement
+def start_auto_ping():
+    import requests
+
+    def ping_loop():
+        while True:
+            try:
+                # Ping toutes les 8 minutes (Render s'endort après 15 min d'inactivité)
+                requests.get('https://ton-site.onrender.com/self-ping', timeout=10)
+                print(f"Auto-ping à {datetime.now()}")
+            except Exception as e:
+                print(f"Erreur auto-ping: {e}")
+            time.sleep(480)  # 8 minutes
+    
+    # Démarrer le thread d'auto-ping
+    thread = threading.Thread(target=ping_loop)
+    thread.daemon = True
+    thread.start()
@@ -0,0 +1,155 @@
+import os
+
+from flask import Blueprint, abort, flash, jsonify, redirect, render_template, request, session, url_for
+
+import services
+from models import Photo, PhotoUpload, db
+from services import (add_like, allowed_file, delete_photos, is_site_unlocked, limit_exceeded, log_activity, page_validator,
+                      paginate_feed)
+
+bp = Blueprint('photos', __name__)
+
+@bp.route('/galerie')
+def galerie():
+    # Vérifier si le site est déverrouillé
+    if not is_site_unlocked() and not session.get('special_access'):
+        return redirect(url_for('auth.locked_page'))
+    
+    # Reprendre les envois et suppressions en attente (par exemple après un redémarrage)
+    services.upload_worker.notify()
+    services.deletion_worker.notify()
+    
+    # Rien à recharger si le navigateur a déjà cette version de la page
+    validator = page_validator(('photos',))
+    if validator.is_current():
+        return validator.not_modified()
+    
+    photos, pagination = paginate_feed(Photo, 12)
+    
+    return validator.apply(render_template('galerie.html', photos=photos, user=session['user'], pagination=pagination))
+
+@bp.route('/upload', methods=['POST'])
+def upload_file():
+    # Vérifier si le site est déverrouillé
+    if not is_site_unlocked() and not session.get('special_access'):
+        return redirect(url_for('auth.locked_page'))
+    
+    if 'file' not in request.files:
+        flash('Aucun fichier sélectionné', 'error')
+        return redirect(url_for('photos.galerie'))
+    
+    file = request.files['file']
+    legende = request.form.get('legende', '').strip()
+    
+    if file.filename == '':
+        flash('Aucun fichier sélectionné', 'error')
+        return redirect(url_for('photos.galerie'))
+    
+    if file and allowed_file(file.filename):
+        try:
+            # Enregistrer la photo en attente, puis déposer le fichier sur le disque
+            photo = Photo(
+                filename=file.filename,
+                legende=legende,
+                auteur=session['user'],
+                status='pending'
+            )
+            db.session.add(photo)
+            db.session.flush()
+            
+            path = services.photo_pipeline.stage(photo.id, file)
+            photo.file_size = os.path.getsize(path)
+            db.session.add(PhotoUpload(photo_id=photo.id, filename=file.filename))
+            db.session.commit()
+            
+            # L'envoi vers l'hébergeur se fait en arrière-plan, depuis l'outbox
+            services.upload_worker.notify()
+            
+            log_activity(session['user'], 'photo_uploaded', f'Photo: {file.filename}')
+            flash('Photo reçue ! Elle apparaîtra dans un instant 📸', 'success')
+            
+        except Exception as e:
+            db.session.rollback()
+            flash(f'Erreur lors de l\'upload: {str(e)}', 'error')
+    else:
+        flash('Type de fichier non autorisé', 'error')
+    
+    return redirect(url_for('photos.galerie'))
+
+@bp.route('/photo_status/<int:photo_id>')
+def photo_status(photo_id):
+    """État d'une photo en cours d'envoi, interrogé par la galerie"""
+    photo = Photo.query.get_or_404(photo_id)
+    return jsonify({
+        'id': photo.id,
+        'status': photo.status,
+        'url': photo.cloudinary_url if photo.status == 'ready' else None
+    })
+
+@bp.route('/like_photo/<int:photo_id>')
+def like_photo(photo_id):
+    # Vérifier si le site est déverrouillé
+    if not is_site_unlocked() and not session.get('special_access'):
+        return jsonify({'error': 'Site verrouillé'}), 403
+    
+    retry_after = limit_exceeded(('like', session['user']))
+    if retry_after:
+        return jsonify({'error': 'Doucement, trop de likes 💕'}), 429, {'Retry-After': retry_after}
+    
+    likes = add_like(Photo, photo_id)
+    if likes is None:
+        abort(404)
+    
+    log_activity(session['user'], 'photo_liked', f'Photo ID: {photo_id}')
+    
+    return jsonify({'likes': likes})
+
+@bp.route('/supprimer_photo/<int:photo_id>')
+def supprimer_photo(photo_id):
+    # Vérifier si le site est déverrouillé
+    if not is_site_unlocked() and not session.get('special_access'):
+        return redirect(url_for('auth.locked_page'))
+    
+    user = session['user']
+    photo = Photo.query.get_or_404(photo_id)
+    
+    # Vérifier que l'utilisateur est l'auteur
+    if photo.auteur == user:
+        # Supprimer de la base ; la copie hébergée est supprimée en arrière-plan
+        delete_photos([photo])
+        db.session.commit()
+        services.deletion_worker.notify()
+        
+        log_activity(user, 'photo_deleted', f'Photo ID: {photo_id}')
+        flash('Photo supprimée avec succès', 'success')
+    else:
+        flash('Vous ne pouvez supprimer que vos propres photos', 'error')
+    
+    return redirect(url_for('photos.galerie'))
+
+@bp.route('/supprimer_photos', methods=['POST'])
+def supprimer_photos():
+    """Suppression groupée des photos sélectionnées dans la galerie"""
+    # Vérifier si le site est déverrouillé
+    if not is_site_unlocked() and not session.get('special_access'):
+        return redirect(url_for('auth.locked_page'))
+    
+    user = session['user']
+    photo_ids = request.form.getlist('photo_ids', type=int)
+    if not photo_ids:
+        flash('Aucune photo sélectionnée', 'error')
+        return redirect(url_for('photos.galerie'))
+    
+    # Seules les photos de l'utilisateur sont supprimées
+    photos = Photo.query.filter(Photo.id.in_(photo_ids), Photo.auteur == user).all()
+    delete_photos(photos)
+    db.session.commit()
+    services.deletion_worker.notify()
+    
+    if photos:
+        log_activity(user, 'photos_deleted', f'Photo IDs: {", ".join(str(p.id) for p in photos)}')
+        flash(f'{len(photos)} photo(s) supprimée(s) avec succès', 'success')
+    if len(photos) < len(photo_ids):
+        flash('Vous ne pouvez supprimer que vos propres photos', 'error')
+    
+    return redirect(url_for('photos.galerie'))
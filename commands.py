@@ -0,0 +1,237 @@
+"""Commandes `flask` de gestion de la base et des données"""
+import json
+import os
+import sys
+import time
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+import assets
+import services
+from counters import Counters
+from database import QUERY_PLAN_CHECKS, init_db, migrator, reset_database, seed_database
+from migrations import explain, uses_index
+from models import Photo, PhotoUpload, counters, db, search_index
+from services import IMPORT_TARGETS, exporter, fetch_photo, parse_since, run_import
+
+@click.command('init-db')
+@with_appcontext
+def init_db_command():
+    """Crée le schéma, applique les migrations et crée les comptes (une fois par déploiement)"""
+    os.makedirs(current_app.config['UPLOAD_FOLDER'], exist_ok=True)
+    init_db()
+    print("✅ Base de données prête")
+
+@click.command('warmup')
+@with_appcontext
+def warmup_command():
+    """Exécute le préchauffage d'un worker et affiche la durée de chaque étape"""
+    results = services.warm_up(current_app._get_current_object(), log=print)
+    failed = [result.name for result in results if result.error]
+    print(f"{'❌' if failed else '✅'} Préchauffage en {sum(r.seconds for r in results) * 1000:.1f} ms")
+    if failed:
+        raise SystemExit(1)
+
+@click.command('build-assets')
+@with_appcontext
+def build_assets_command():
+    """Minifie, renomme par empreinte et précompresse les fichiers statiques"""
+    manifest = assets.build(current_app.static_folder)
+    if assets.brotli_compress(b'') is None:
+        print("⚠️  Paquet Brotli absent : variantes gzip seulement")
+    print(f"✅ {len(manifest)} fichier(s) construit(s) dans static/{assets.DIST_DIR}/")
+
+@click.command('reset')
+@click.option('--yes', is_flag=True, help='Ne pas demander de confirmation')
+@with_appcontext
+def reset_command(yes):
+    """Supprime toutes les données et repart d'une base vide"""
+    if not yes:
+        click.confirm(f"Supprimer toutes les données de {db.engine.url.render_as_string()} ?", abort=True)
+    reset_database()
+    print("✅ Base de données réinitialisée")
+
+@click.command('seed')
+@click.option('--phrases', default=10_000, show_default=True)
+@click.option('--photos', default=1_000, show_default=True)
+@click.option('--letters', default=1_000, show_default=True)
+@click.option('--memories', default=200, show_default=True)
+@click.option('--events', default=200, show_default=True)
+@click.option('--activities', default=10_000, show_default=True)
+@click.option('--scale', type=float, default=1.0, show_default=True, help='Multiplie tous les volumes')
+@click.option('--batch-size', default=5000, show_default=True)
+@click.option('--seed', 'seed_value', type=int, default=None, help='Graine, pour des données reproductibles')
+@with_appcontext
+def seed_command(phrases, photos, letters, memories, events, activities, scale, batch_size, seed_value):
+    """Génère des données synthétiques (messages, photos, lettres...) en masse"""
+    init_db()
+    counts = {name: int(count * scale) for name, count in (
+        ('phrases', phrases), ('photos', photos), ('letters', letters),
+        ('memories', memories), ('events', events), ('activities', activities),
+    )}
+    started = time.monotonic()
+    inserted = seed_database(counts, batch_size, seed_value)
+    for name, count in inserted.items():
+        print(f"  {name}: {count}")
+    print(f"✅ {sum(inserted.values())} lignes générées en {time.monotonic() - started:.1f}s")
+
+@click.command('reindex')
+@with_appcontext
+def reindex_command():
+    """Reconstruit l'index de recherche plein texte"""
+    started = time.monotonic()
+    total = search_index.rebuild(db.session)
+    db.session.commit()
+    print(f"✅ {total} documents indexés en {time.monotonic() - started:.1f}s")
+
+@click.command('reconcile')
+@with_appcontext
+def reconcile_command():
+    """Recalcule la table des compteurs depuis les tables sources"""
+    before = counters.read_all(db.session.connection())
+    after = counters.reconcile(db.session)
+    db.session.commit()
+    
+    drift = {name: after.get(name, 0) - before.get(name, 0)
+             for name in set(before) | set(after)
+             if not name.startswith(Counters.VERSION_PREFIX)
+             if after.get(name, 0) != before.get(name, 0)}
+    if drift:
+        for name, delta in sorted(drift.items()):
+            print(f"  {name}: {before.get(name, 0)} -> {after.get(name, 0)} ({delta:+d})")
+    print(f"✅ {len(after)} compteurs recalculés, {len(drift)} corrigés")
+
+@click.command('export')
+@click.option('--format', 'fmt', type=click.Choice(['ndjson', 'zip']), default='ndjson')
+@click.option('--since', default=None, help='Date ISO 8601 : seulement ce qui a changé depuis')
+@click.option('--output', '-o', type=click.Path(dir_okay=False), default=None,
+              help='Fichier de sortie (par défaut la sortie standard pour NDJSON)')
+@with_appcontext
+def export_command(fmt, since, output):
+    """Exporte toutes les données (NDJSON, ou ZIP avec les photos)"""
+    since = parse_since(since)
+    if fmt == 'zip':
+        if not output:
+            raise click.UsageError("--output est obligatoire pour une archive ZIP")
+        with open(output, 'wb') as f:
+            for chunk in exporter.iter_zip(db.session, since, fetch=fetch_photo):
+                f.write(chunk)
+    elif output:
+        with open(output, 'w', encoding='utf-8') as f:
+            f.writelines(exporter.iter_ndjson(db.session, since))
+    else:
+        for line in exporter.iter_ndjson(db.session, since):
+            click.echo(line, nl=False)
+    db.session.rollback()
+
+@click.command('import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False, allow_dash=True))
+@click.option('--format', 'fmt', type=click.Choice(['ndjson', 'csv']), default=None,
+              help="Format du fichier (par défaut d'après son extension)")
+@click.option('--type', 'kind', type=click.Choice([target.kind for target in IMPORT_TARGETS]), default=None,
+              help='Type des lignes d\'un CSV sans colonne type')
+@with_appcontext
+def import_command(path, fmt, kind):
+    """Importe des messages, souvenirs et événements depuis un NDJSON ou un CSV"""
+    fmt = fmt or ('csv' if path.lower().endswith('.csv') else 'ndjson')
+    started = time.monotonic()
+    
+    def progress(read, inserted, duplicates, errors):
+        print(f"  {read} lus, {inserted} insérés, {duplicates} déjà présents, {errors} erreurs", file=sys.stderr)
+    
+    with click.open_file(path, encoding='utf-8-sig') as f:
+        report = run_import(f, fmt, kind, on_progress=progress)
+    for line, error in report.errors:
+        print(f"  ligne {line} : {error}")
+    print(f"✅ {sum(report.inserted.values())} éléments importés {report.inserted} "
+          f"en {time.monotonic() - started:.1f}s ({report.duplicates} déjà présents, {len(report.errors)} erreurs)")
+    if report.errors:
+        raise SystemExit(1)
+
+@click.command('retry-uploads')
+@with_appcontext
+def retry_uploads_command():
+    """Remet dans l'outbox les photos en attente ou en échec dont le fichier
+    est encore déposé, les envoie, puis supprime les fichiers déposés orphelins.
+
+    Les fichiers des photos en échec définitif sont déjà supprimés par
+    l'outbox : seules celles d'avant l'outbox peuvent être reprises.
+    """
+    pipeline = services.photo_pipeline
+    queued = {photo_id for (photo_id,) in db.session.query(PhotoUpload.photo_id)}
+    photos = Photo.query.filter(Photo.status.in_(['pending', 'failed']), Photo.id.notin_(queued)).all()
+    for photo in photos:
+        if not os.path.exists(pipeline.staging_path(photo.id, photo.filename)):
+            print(f"  Photo {photo.id}: fichier déposé introuvable")
+            photo.status = 'failed'
+            continue
+        photo.status = 'pending'
+        db.session.add(PhotoUpload(photo_id=photo.id, filename=photo.filename))
+    db.session.commit()
+    
+    processed = 0
+    while count := services.process_photo_uploads():
+        processed += count
+    
+    # Fichiers déposés sans envoi en attente (photo supprimée, ancien échec)
+    kept = {pipeline.staging_path(photo_id, filename)
+            for photo_id, filename in db.session.query(PhotoUpload.photo_id, PhotoUpload.filename)}
+    removed = 0
+    if os.path.isdir(pipeline.staging_dir):
+        for name in os.listdir(pipeline.staging_dir):
+            path = os.path.join(pipeline.staging_dir, name)
+            if path not in kept:
+                os.remove(path)
+                removed += 1
+    remaining = PhotoUpload.query.count()
+    print(f"✅ {processed} envoi(s) traité(s), {remaining} en attente d'une nouvelle tentative, "
+          f"{removed} fichier(s) orphelin(s) supprimé(s)")
+
+@click.command('backfill-variants')
+@with_appcontext
+def backfill_variants_command():
+    """Calcule les déclinaisons des photos hébergées qui n'en ont pas encore"""
+    photos = Photo.query.filter(Photo.variants.is_(None), Photo.cloudinary_public_id.isnot(None)).all()
+    updated = 0
+    for photo in photos:
+        variants = services.photo_pipeline.uploader.variants_for(photo.cloudinary_public_id)
+        if variants:
+            photo.variants = json.dumps(variants)
+            updated += 1
+    db.session.commit()
+    print(f"✅ {updated}/{len(photos)} photos mises à jour")
+
+@click.command('migrate')
+@with_appcontext
+def migrate_command():
+    """Applique les migrations de schéma en attente"""
+    applied = migrator.upgrade(db.session)
+    print(f"✅ {len(applied)} migration(s) appliquée(s)")
+
+@click.command('check-query-plans')
+@with_appcontext
+def check_query_plans_command():
+    """Vérifie que les requêtes de chaque page utilisent leurs index"""
+    failures = 0
+    for route, label, build, index_name in QUERY_PLAN_CHECKS:
+        plan = explain(db.session, build())
+        ok = uses_index(plan, index_name)
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {route:<16} {label:<28} {index_name}")
+        if not ok:
+            print('    ' + plan.replace('\n', '\n    '))
+        db.session.rollback()
+    if failures:
+        raise SystemExit(1)
+
+COMMANDS = [
+    init_db_command, warmup_command, build_assets_command, reset_command, seed_command, reindex_command, reconcile_command,
+    export_command, import_command, retry_uploads_command, backfill_variants_command,
+    migrate_command, check_query_plans_command,
+]
+
+def init_app(app):
+    for command in COMMANDS:
+        app.cli.add_command(command)
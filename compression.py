@@ -0,0 +1,196 @@
+import itertools
+import zlib
+
+from werkzeug.datastructures import Headers
+
+# Types compressés à la volée (les images et vidéos le sont déjà)
+COMPRESSIBLE_TYPES = {
+    'text/html', 'text/css', 'text/plain', 'text/calendar', 'text/csv', 'text/javascript',
+    'application/javascript', 'application/json', 'application/x-ndjson', 'application/xml',
+    'image/svg+xml',
+}
+
+NOT_COMPRESSED_STATUSES = {204, 206, 304}
+
+
+def accepted_encodings(header):
+    """Encodages d'un en-tête Accept-Encoding, sans ceux refusés par q=0"""
+    accepted = set()
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        if params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class _Gzip:
+    def __init__(self, level):
+        # wbits 31 : en-tête et somme de contrôle gzip autour du flux deflate
+        self._z = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data, sync):
+        out = self._z.compress(data)
+        return out + self._z.flush(zlib.Z_SYNC_FLUSH) if sync else out
+
+    def finish(self):
+        return self._z.flush()
+
+
+class _Brotli:
+    def __init__(self, module, level):
+        self._c = module.Compressor(quality=level)
+
+    def compress(self, data, sync):
+        out = self._c.process(data)
+        return out + self._c.flush() if sync else out
+
+    def finish(self):
+        return self._c.finish()
+
+
+class CompressionMiddleware:
+    """Compression gzip ou brotli des réponses dynamiques, morceau par morceau.
+
+    L'encodage est négocié avec Accept-Encoding (brotli d'abord s'il est
+    installé). Les réponses de longueur connue sous `min_size` partent
+    telles quelles ; celles diffusées en flux (export, calendrier) sont
+    mises en attente jusqu'au seuil, puis compressées au fil de l'eau, en
+    vidant le compresseur à chaque morceau pour ne pas retarder le client.
+    Les réponses déjà encodées (fichiers précompressés de StaticMiddleware),
+    partielles ou marquées `no-transform` ne sont pas touchées.
+
+    `on_compress(encoding, octets d'origine, octets envoyés)` est appelé à
+    la fin de chaque réponse compressée.
+    """
+
+    def __init__(self, app, level=6, brotli_level=4, min_size=500, types=COMPRESSIBLE_TYPES,
+                 on_compress=None):
+        self.app = app
+        self.level = level
+        self.brotli_level = brotli_level
+        self.min_size = min_size
+        self.types = frozenset(types)
+        self.on_compress = on_compress
+        try:
+            import brotli
+        except ImportError:
+            brotli = None
+        self._brotli = brotli
+        self.encodings = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+    def __call__(self, environ, start_response):
+        accepted = accepted_encodings(environ.get('HTTP_ACCEPT_ENCODING', ''))
+        encoding = None
+        if environ['REQUEST_METHOD'] != 'HEAD':
+            encoding = next((e for e in self.encodings if e in accepted), None)
+
+        state = {}
+
+        def capture(status, headers, exc_info=None):
+            if exc_info and state.get('started'):
+                raise exc_info[1].with_traceback(exc_info[2])
+            state['response'] = (status, headers, exc_info)
+            return self._write_unsupported
+
+        body = self.app(environ, capture)
+        return self._respond(body, state, start_response, encoding)
+
+    @staticmethod
+    def _write_unsupported(data):
+        raise RuntimeError("write() n'est pas pris en charge : retourner un itérable")
+
+    def _compressor(self, encoding):
+        if encoding == 'br':
+            return _Brotli(self._brotli, self.brotli_level)
+        return _Gzip(self.level)
+
+    def _compressible(self, status, headers):
+        if int(status.split(' ', 1)[0]) in NOT_COMPRESSED_STATUSES:
+            return False
+        if 'Content-Encoding' in headers or 'Content-Range' in headers:
+            return False
+        if 'no-transform' in headers.get('Cache-Control', ''):
+            return False
+        mimetype = headers.get('Content-Type', '').split(';', 1)[0].strip().lower()
+        return mimetype in self.types
+
+    def _respond(self, body, state, start_response, encoding):
+        chunks = iter(body)
+        pending = []
+        try:
+            # start_response peut n'être appelé qu'au premier morceau
+            if 'response' not in state:
+                pending.append(next(chunks, b''))
+            status, headers, exc_info = state['response']
+            headers = Headers(headers)
+
+            compressible = self._compressible(status, headers)
+            if compressible:
+                vary = headers.get('Vary', '')
+                if 'accept-encoding' not in vary.lower():
+                    headers['Vary'] = f'{vary}, Accept-Encoding' if vary else 'Accept-Encoding'
+
+            length = headers.get('Content-Length', type=int)
+            streamed = length is None
+            if compressible and encoding and streamed:
+                # Longueur inconnue : lire jusqu'au seuil avant de décider
+                size = sum(len(chunk) for chunk in pending)
+                while size < self.min_size:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        break
+                    pending.append(chunk)
+                    size += len(chunk)
+                length = size if size < self.min_size else None
+
+            if not compressible or not encoding or (length is not None and length < self.min_size):
+                state['started'] = True
+                start_response(status, headers.to_wsgi_list(), exc_info)
+                yield from pending
+                yield from chunks
+                return
+
+            headers.remove('Content-Length')
+            headers.remove('Accept-Ranges')
+            headers['Content-Encoding'] = encoding
+            # Les octets changent : un ETag fort ne vaut plus que comme ETag faible
+            etag = headers.get('ETag')
+            if etag and not etag.startswith('W/'):
+                headers['ETag'] = 'W/' + etag
+            state['started'] = True
+            start_response(status, headers.to_wsgi_list(), exc_info)
+
+            compressor = self._compressor(encoding)
+            original = sent = 0
+            for chunk in itertools.chain(pending, chunks):
+                if not chunk:
+                    continue
+                original += len(chunk)
+                data = compressor.compress(chunk, sync=streamed)
+                if data:
+                    sent += len(data)
+                    yield data
+            data = compressor.finish()
+            sent += len(data)
+            yield data
+            if self.on_compress is not None:
+                self.on_compress(encoding, original, sent)
+        finally:
+            close = getattr(body, 'close', None)
+            if close is not None:
+                close()
+
+
+def init_app(app):
+    """Compression des réponses, en dernier middleware (le plus extérieur)"""
+    level = app.config['COMPRESS_LEVEL']
+    if not level:
+        return
+    import services
+    app.wsgi_app = CompressionMiddleware(
+        app.wsgi_app,
+        level=level,
+        brotli_level=app.config['COMPRESS_BROTLI_LEVEL'],
+        min_size=app.config['COMPRESS_MIN_SIZE'],
+        on_compress=services.metrics.record_compression
+    )
@@ -0,0 +1,71 @@
+import hashlib
+import os
+from datetime import timezone
+
+from flask import make_response, request
+
+
+class PageValidator:
+    """Validateurs HTTP (ETag faible et Last-Modified) d'une page, calculés
+    avant ses requêtes principales.
+
+    Si le client possède déjà la version courante, la vue répond `304 Not
+    Modified` sans rien charger ni rendre. Un validateur sans ETag est
+    inactif : jamais de 304, réponse laissée telle quelle.
+    """
+
+    def __init__(self, etag=None, last_modified=None):
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @classmethod
+    def build(cls, parts, timestamps=()):
+        """ETag depuis tout ce qui change le rendu ; Last-Modified depuis la
+        plus récente des dates connues (naïves, en UTC)"""
+        etag = hashlib.sha1(repr(tuple(parts)).encode('utf-8')).hexdigest()[:20]
+        dates = [t.replace(tzinfo=timezone.utc, microsecond=0) for t in timestamps if t is not None]
+        return cls(etag, max(dates) if dates else None)
+
+    def is_current(self):
+        if self.etag is None or request.method not in ('GET', 'HEAD'):
+            return False
+        # If-None-Match, quand il est présent, l'emporte sur If-Modified-Since
+        if request.if_none_match:
+            return request.if_none_match.contains_weak(self.etag)
+        since = request.if_modified_since
+        return bool(since and self.last_modified and self.last_modified <= since)
+
+    def not_modified(self):
+        response = make_response('', 304)
+        return self.apply(response)
+
+    def apply(self, response):
+        """Ajoute les validateurs à la réponse (ou au HTML rendu)"""
+        response = make_response(response)
+        if self.etag is None:
+            return response
+        response.set_etag(self.etag, weak=True)
+        if self.last_modified:
+            response.last_modified = self.last_modified
+        # Revalidation à chaque affichage, jamais dans un cache partagé
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        return response
+
+
+def release_token(app):
+    """Identifiant de la version déployée : le commit fourni par l'hébergeur,
+    sinon une empreinte des templates et du manifeste des fichiers statiques"""
+    if app.config.get('RELEASE'):
+        return app.config['RELEASE']
+    digest = hashlib.sha1()
+    paths = [os.path.join(app.static_folder, 'dist', 'manifest.json')]
+    for root, _, files in os.walk(os.path.join(app.root_path, app.template_folder)):
+        paths.extend(os.path.join(root, filename) for filename in files)
+    for path in sorted(paths):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        digest.update(f'{path}:{stat.st_mtime_ns}:{stat.st_size}'.encode('utf-8'))
+    return digest.hexdigest()[:12]
@@ -32,7 +32,73 @@ class Config:
     UPLOAD_FOLDER = os.path.join(os.getcwd(), "static", "uploads")
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16 MB
 
+    # 📤 Envoi des photos en arrière-plan
+    PHOTO_UPLOADER = os.environ.get("PHOTO_UPLOADER", "cloudinary")  # ou "local"
+    LOCAL_UPLOAD_LATENCY_MS = 0  # latence simulée par l'hébergeur local
+    UPLOAD_WORKERS = 2
+    UPLOAD_MAX_ATTEMPTS = 3
+    UPLOAD_RETRY_BACKOFF = 2.0  # secondes, doublées à chaque nouvelle tentative
+    UPLOAD_LEASE = 300          # secondes avant qu'un envoi interrompu soit repris par un autre worker
+    PHOTO_UPLOAD_INTERVAL = 10  # secondes entre deux passages sans nouvel envoi
+    PHOTO_VARIANT_WIDTHS = (400, 800, 1600)  # miniature, moyenne et grande taille
+
+    # 🗑️ Suppression des photos hébergées, par lots et en arrière-plan
+    PHOTO_DELETE_BATCH_SIZE = 100       # maximum de delete_resources chez Cloudinary
+    PHOTO_DELETE_INTERVAL = 60          # secondes entre deux passages sans nouvelle suppression
+    PHOTO_DELETE_RETRY_BACKOFF = 30     # secondes, doublées à chaque échec...
+    PHOTO_DELETE_MAX_BACKOFF = 6 * 3600  # ...sans dépasser 6 heures
+
+    # 🌷 Versets de l'humeur du jour
+    MOOD_VERSES_RELOAD_INTERVAL = 30  # secondes entre deux vérifications du fichier
+
+    # 📝 Journal d'activité : écriture différée par lots
+    ACTIVITY_LOG_ASYNC = True
+    ACTIVITY_QUEUE_SIZE = 10000       # activités en attente au maximum
+    ACTIVITY_FLUSH_ROWS = 100         # écrire dès que ce nombre est atteint...
+    ACTIVITY_FLUSH_INTERVAL_MS = 500  # ...ou au plus tard après ce délai
+
+    # ⏱️ Mesures des requêtes
+    SERVER_TIMING = True  # en-tête Server-Timing sur chaque réponse
+    METRICS_TOKEN = os.environ.get("METRICS_TOKEN")  # jeton Bearer exigé par /metrics s'il est défini
+
+    # 🧩 Templates : bytecode compilé partagé par les workers, fragments rendus en mémoire
+    JINJA_BYTECODE_CACHE_DIR = os.path.join(os.getcwd(), "instance", "jinja_cache")  # None = désactivé
+    FRAGMENT_CACHE_SIZE = 2000                  # fragments par processus (0 = désactivé)
+    FRAGMENT_CACHE_MAX_BYTES = 8 * 1024 * 1024  # taille totale maximale
+
+    # 🗜️ Compression à la volée des réponses (HTML, JSON, exports...)
+    COMPRESS_LEVEL = 6          # gzip, de 1 à 9 (0 = compression désactivée)
+    COMPRESS_BROTLI_LEVEL = 4   # brotli, de 0 à 11, si le paquet Brotli est installé
+    COMPRESS_MIN_SIZE = 500     # octets : en dessous, la réponse part telle quelle
+
+    # 🔁 Requêtes conditionnelles (ETag / Last-Modified) des pages principales
+    CONDITIONAL_GET = True
+    RELEASE = os.environ.get("RENDER_GIT_COMMIT") or os.environ.get("SOURCE_VERSION")  # sinon empreinte des templates
+
+    # 🔥 Préchauffage des workers (gunicorn.conf.py ou `flask warmup`)
+    WARMUP_DB_CONNECTIONS = None  # connexions ouvertes d'avance (None = taille du pool)
+
+    # 👤 Cache des utilisateurs connectés (par processus)
+    USER_CACHE_TTL = 60  # secondes
+
+    # 📥 Import en masse
+    IMPORT_BATCH_SIZE = int(os.environ.get("IMPORT_BATCH_SIZE", 1000))  # lignes par INSERT et par transaction
+
+    # ❤️ Likes : regroupement des clics en rafale (0 = un UPDATE par clic)
+    LIKES_COALESCE_MS = int(os.environ.get("LIKES_COALESCE_MS", 0))
+
+    # 🚦 Limitation de débit : seaux à jetons (rafale autorisée, secondes pour la recharger)
+    RATE_LIMIT_STORAGE = os.environ.get("RATE_LIMIT_STORAGE", "memory")  # ou "database" (partagé par les workers)
+    RATE_LIMITS = {
+        'login_ip': (10, 60),     # essais de connexion par adresse IP
+        'login_user': (10, 300),  # essais de connexion par nom d'utilisateur
+        'like': (30, 30),         # likes par utilisateur
+        'unlock': (5, 300),       # essais de la porte mystérieuse par adresse IP
+    }
+    PROXY_FIX_X_FOR = 0  # proxys de confiance devant l'application (adresse IP du client)
+
     # 🍪 Configuration des sessions
+    SESSION_STORAGE = os.environ.get("SESSION_STORAGE", "database")  # "memory" (un seul processus) ou "cookie"
     PERMANENT_SESSION_LIFETIME = timedelta(days=7)
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SAMESITE = "Lax"
@@ -47,6 +113,13 @@ class ProductionConfig(Config):
     DEBUG = False
     SESSION_COOKIE_SECURE = True
     PREFERRED_URL_SCHEME = 'https'
+    PROXY_FIX_X_FOR = int(os.environ.get("PROXY_FIX_X_FOR", 1))  # Render et Heroku : un proxy
+
+class TestingConfig(Config):
+    """Configuration pour les tests"""
+    TESTING = True
+    SESSION_COOKIE_SECURE = False
+    ACTIVITY_LOG_ASYNC = False  # écriture synchrone, visible immédiatement
 
 # Configuration automatique
 if os.environ.get("FLASK_ENV") == "production" or os.environ.get("RENDER"):
@@ -0,0 +1,206 @@
+from collections import Counter as Tally
+from datetime import datetime
+from typing import NamedTuple
+
+from sqlalchemy import event, func, inspect
+
+
+class _Rule(NamedTuple):
+    fields: tuple
+    keys: object
+    version: str = None
+
+
+class Counters:
+    """Compteurs matérialisés (totaux, favoris, lettres non lues...).
+
+    Chaque modèle déclare les compteurs auxquels une ligne contribue selon
+    ses valeurs ; les écarts sont calculés à chaque flush et appliqués par
+    un upsert `value = value + delta` dans la même transaction que
+    l'écriture qui les provoque. `reconcile()` recalcule tout depuis les
+    tables sources en cas de dérive.
+
+    Les compteurs préfixés par `version:` ne sont pas dérivés des données :
+    ce sont des numéros de version (invalidation de caches), incrémentés
+    par `bump()` et conservés par `reconcile()`. Un modèle enregistré avec
+    `version=` incrémente la sienne à chaque flush qui touche l'une de ses
+    lignes, quelle que soit la colonne modifiée.
+    """
+
+    VERSION_PREFIX = 'version:'
+
+    def __init__(self, table):
+        self.table = table
+        self._rules = {}
+
+    def register(self, model, fields, keys, version=None):
+        """`keys(values)` reçoit un dict {champ: valeur} et retourne les noms
+        des compteurs incrémentés par une ligne dans cet état"""
+        self._rules[model] = _Rule(tuple(fields), keys, version)
+
+    def attach(self, session):
+        event.listen(session, 'after_flush', self._after_flush)
+
+    # --- Suivi des écritures ---
+
+    @staticmethod
+    def _values(obj, fields, previous=False):
+        if not previous:
+            return {f: getattr(obj, f) for f in fields}
+        state = inspect(obj)
+        values = {}
+        for f in fields:
+            history = state.attrs[f].history
+            if history.deleted:
+                values[f] = history.deleted[0]
+            elif history.unchanged:
+                values[f] = history.unchanged[0]
+            else:
+                values[f] = getattr(obj, f)
+        return values
+
+    def _after_flush(self, session, flush_context):
+        deltas = Tally()
+        versions = set()
+        for obj in session.new:
+            rule = self._rules.get(type(obj))
+            if rule:
+                deltas.update(rule.keys(self._values(obj, rule.fields)))
+                versions.add(rule.version)
+        for obj in session.deleted:
+            rule = self._rules.get(type(obj))
+            if rule:
+                deltas.subtract(rule.keys(self._values(obj, rule.fields, previous=True)))
+                versions.add(rule.version)
+        for obj in session.dirty:
+            rule = self._rules.get(type(obj))
+            if not rule or not session.is_modified(obj):
+                continue
+            versions.add(rule.version)
+            state = inspect(obj)
+            if any(state.attrs[f].history.has_changes() for f in rule.fields):
+                deltas.subtract(rule.keys(self._values(obj, rule.fields, previous=True)))
+                deltas.update(rule.keys(self._values(obj, rule.fields)))
+        for name in versions - {None}:
+            deltas[self.VERSION_PREFIX + name] = 1
+        self.apply(session.connection(), deltas)
+
+    def add_rows(self, conn, model, rows):
+        """Compte des lignes insérées hors ORM (dicts {champ: valeur})"""
+        rule = self._rules.get(model)
+        if rule:
+            deltas = Tally()
+            for row in rows:
+                deltas.update(rule.keys({f: row.get(f) for f in rule.fields}))
+            if rule.version and rows:
+                deltas[self.VERSION_PREFIX + rule.version] = 1
+            self.apply(conn, deltas)
+
+    # --- Écriture ---
+
+    def _upsert(self, conn):
+        dialect = conn.dialect.name
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            return None
+        stmt = insert(self.table)
+        return stmt.on_conflict_do_update(
+            index_elements=[self.table.c.name],
+            set_={
+                'value': self.table.c.value + stmt.excluded.value,
+                'updated_at': stmt.excluded.updated_at,
+            }
+        )
+
+    def apply(self, conn, deltas):
+        """Ajoute les écarts {nom: delta} aux compteurs (créés au besoin)"""
+        now = datetime.utcnow()
+        rows = [{'name': name, 'value': delta, 'updated_at': now}
+                for name, delta in deltas.items() if delta]
+        if not rows:
+            return
+        stmt = self._upsert(conn)
+        if stmt is not None:
+            conn.execute(stmt, rows)
+            return
+        for row in rows:
+            result = conn.execute(
+                self.table.update()
+                .where(self.table.c.name == row['name'])
+                .values(value=self.table.c.value + row['value'], updated_at=now)
+            )
+            if not result.rowcount:
+                conn.execute(self.table.insert(), row)
+
+    def bump(self, conn, name):
+        """Incrémente le numéro de version `name` (dans la transaction de conn)"""
+        self.apply(conn, {self.VERSION_PREFIX + name: 1})
+
+    def touch(self, conn, model):
+        """Incrémente la version d'un modèle modifié hors ORM (UPDATE direct)"""
+        rule = self._rules.get(model)
+        if rule and rule.version:
+            self.bump(conn, rule.version)
+
+    def version(self, conn, name):
+        key = self.VERSION_PREFIX + name
+        return self.read(conn, [key])[key]
+
+    def versions(self, conn, names):
+        """{nom: (numéro, date de la dernière incrémentation)} en une requête"""
+        keys = {self.VERSION_PREFIX + name: name for name in names}
+        values = dict.fromkeys(names, (0, None))
+        rows = conn.execute(
+            self.table.select().with_only_columns(self.table.c.name, self.table.c.value,
+                                                  self.table.c.updated_at)
+            .where(self.table.c.name.in_(list(keys)))
+        )
+        for key, value, updated_at in rows:
+            values[keys[key]] = (value, updated_at)
+        return values
+
+    def reconcile(self, session):
+        """Recalcule tous les compteurs depuis les tables ; retourne les valeurs"""
+        totals = Tally()
+        for model, rule in self._rules.items():
+            # Un GROUP BY sur les champs de la règle : une ligne par état distinct
+            columns = [getattr(model, f) for f in rule.fields]
+            rows = session.query(*columns, func.count()).select_from(model).group_by(*columns)
+            for row in rows:
+                values, count = dict(zip(rule.fields, row[:-1])), row[-1]
+                for name in rule.keys(values):
+                    totals[name] += count
+
+        conn = session.connection()
+        now = datetime.utcnow()
+        conn.execute(self.table.delete().where(~self.table.c.name.startswith(self.VERSION_PREFIX)))
+        rows = [{'name': name, 'value': value, 'updated_at': now}
+                for name, value in totals.items() if value]
+        if rows:
+            conn.execute(self.table.insert(), rows)
+        return dict(totals)
+
+    # --- Lecture ---
+
+    def read(self, conn, names):
+        """Valeurs de plusieurs compteurs en une seule requête (0 si absent)"""
+        values = dict.fromkeys(names, 0)
+        rows = conn.execute(
+            self.table.select().with_only_columns(self.table.c.name, self.table.c.value)
+            .where(self.table.c.name.in_(list(names)))
+        )
+        for name, value in rows:
+            values[name] = value
+        return values
+
+    def read_all(self, conn):
+        rows = conn.execute(
+            self.table.select().with_only_columns(self.table.c.name, self.table.c.value)
+        )
+        return {name: value for name, value in rows}
+
+    def is_empty(self, conn):
+        return conn.execute(self.table.select().limit(1)).first() is None
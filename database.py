@@ -0,0 +1,189 @@
+"""Schéma, migrations et données de la base.
+
+Rien ici ne s'exécute à l'import : `flask init-db` (une fois par
+déploiement) crée le schéma, applique les migrations et crée les comptes.
+Toutes les fonctions s'attendent à un contexte d'application.
+"""
+from sqlalchemy import text
+from werkzeug.security import generate_password_hash
+
+from migrations import Migrator, add_column, create_indexes
+from models import (Activity, CalendarEvent, Challenge, Letter, Memory, Phrase, Photo, PhotoDeletion, PhotoUpload, Tag,
+                    User,
+                    backfill_phrase_tags, counters, db, link_couple, new_calendar_key, phrase_tags, search_index)
+from month_grid import month_bounds
+from services import after_bulk_insert
+
+# Migrations du schéma, appliquées dans l'ordre par init_db()
+migrator = Migrator()
+
+@migrator.migration(1, 'Index secondaires des filtres et tris fréquents')
+def add_secondary_indexes(session):
+    create_indexes(session, [
+        Phrase.__table__, Photo.__table__, Letter.__table__, Memory.__table__,
+        CalendarEvent.__table__, Challenge.__table__, Activity.__table__,
+        PhotoDeletion.__table__, phrase_tags,
+    ])
+
+@migrator.migration(2, 'Colonnes status et variants des photos')
+def add_photo_pipeline_columns(session):
+    add_column(session, 'photos', 'status', "VARCHAR(20) DEFAULT 'ready'")
+    add_column(session, 'photos', 'variants', 'TEXT')
+
+@migrator.migration(3, 'Index plein texte')
+def install_search_index(session):
+    if search_index.install(session.connection()):
+        search_index.rebuild(session)
+
+@migrator.migration(4, 'Table des tags alimentée depuis Phrase.tags')
+def backfill_tags(session):
+    if session.query(Tag.id).first() is None:
+        backfill_phrase_tags()
+
+@migrator.migration(5, 'Compteurs matérialisés')
+def seed_counters(session):
+    counters.reconcile(session)
+
+@migrator.migration(6, 'Partenaire de chaque utilisateur')
+def add_user_partner(session):
+    add_column(session, 'users', 'partner_id', 'INTEGER REFERENCES users(id)')
+    link_couple()
+
+@migrator.migration(7, 'Outbox des envois de photos')
+def add_photo_upload_outbox(session):
+    PhotoUpload.__table__.create(session.connection(), checkfirst=True)
+    # Photos restées en attente dans la file en mémoire d'un ancien worker
+    queued = db.select(PhotoUpload.photo_id)
+    session.execute(db.insert(PhotoUpload).from_select(
+        ['photo_id', 'filename'],
+        db.select(Photo.id, Photo.filename).filter(Photo.status == 'pending', Photo.id.notin_(queued))
+    ))
+
+@migrator.migration(8, 'Clé des liens d\'abonnement au calendrier')
+def add_calendar_keys(session):
+    add_column(session, 'users', 'calendar_key', 'VARCHAR(32)')
+    for user in User.query.filter(User.calendar_key.is_(None)):
+        user.calendar_key = new_calendar_key()
+
+# Requêtes principales de chaque page et index qu'elles doivent utiliser
+QUERY_PLAN_CHECKS = [
+    ('index', 'messages par curseur',
+     lambda: db.select(Phrase).order_by(Phrase.date.desc(), Phrase.id.desc()).limit(11),
+     'ix_phrases_date_id'),
+    ('galerie', 'photos par curseur',
+     lambda: db.select(Photo).order_by(Photo.date.desc(), Photo.id.desc()).limit(13),
+     'ix_photos_date_id'),
+    ('letters', 'lettres reçues',
+     lambda: db.select(Letter).filter_by(recipient='panda bg').order_by(Letter.created_at.desc()),
+     'ix_letters_recipient_created_at'),
+    ('letters', 'lettres envoyées',
+     lambda: db.select(Letter).filter_by(sender='panda bg').order_by(Letter.created_at.desc()),
+     'ix_letters_sender_created_at'),
+    ('read_letter', 'lettres non lues',
+     lambda: db.select(db.func.count(Letter.id)).filter_by(recipient='panda bg', is_read=False),
+     'ix_letters_recipient_is_read'),
+    ('memories', 'anniversaires',
+     lambda: db.select(Memory).filter_by(is_anniversary=True).order_by(Memory.date_memory.desc()),
+     'ix_memories_is_anniversary_date_memory'),
+    ('memories', 'souvenirs',
+     lambda: db.select(Memory).filter_by(is_anniversary=False).order_by(Memory.date_memory.desc()),
+     'ix_memories_is_anniversary_date_memory'),
+    ('love_challenges', 'points de l\'utilisateur',
+     lambda: db.select(db.func.sum(Challenge.points)).filter(Challenge.completed_by == 'panda bg'),
+     'ix_challenges_completed_by'),
+    ('stats', 'activité récente',
+     lambda: db.select(Activity).order_by(Activity.date.desc()).limit(20),
+     'ix_activities_date'),
+    ('love_calendar', 'événements du mois',
+     lambda: db.select(CalendarEvent).filter(CalendarEvent.event_date >= month_bounds(2025, 9)[0],
+                                             CalendarEvent.event_date < month_bounds(2025, 9)[1]),
+     'ix_calendar_events_event_date'),
+    ('phrases_by_tag', 'messages d\'un tag',
+     lambda: db.select(Phrase).join(phrase_tags, phrase_tags.c.phrase_id == Phrase.id)
+     .join(Tag, Tag.id == phrase_tags.c.tag_id).filter(Tag.name == 'amour'),
+     'ix_phrase_tags_tag_id'),
+]
+
+def init_db():
+    """Initialise la base de données avec toutes les tables nécessaires"""
+    # Créer toutes les tables
+    db.create_all()
+    
+    # Mettre à jour le schéma des bases existantes
+    migrator.upgrade(db.session)
+    
+    # Vérifier si les utilisateurs existent déjà
+    existing_users = User.query.all()
+    existing_usernames = [user.username for user in existing_users]
+    
+    # Créer les utilisateurs s'ils n'existent pas
+    if 'maninka mousso' not in existing_usernames:
+        user1 = User(
+            username='maninka mousso',
+            password_hash=generate_password_hash('Elle a toujours été belle'),
+            favorite_color='#ffdde1'
+        )
+        db.session.add(user1)
+    
+    if 'panda bg' not in existing_usernames:
+        user2 = User(
+            username='panda bg',
+            password_hash=generate_password_hash('La lune est belle ce soir'),
+            favorite_color='#e1f5fe'
+        )
+        db.session.add(user2)
+    
+    db.session.flush()
+    link_couple()
+    
+    # Ajouter des défis par défaut s'ils n'existent pas
+    existing_challenges = Challenge.query.count()
+    if existing_challenges == 0:
+        default_challenges = [
+            ("Écris un message d'amour", "Partage un message tendre avec ton amour", "message", 15),
+            ("Partage une photo souvenir", "Upload une photo qui vous rappelle un beau moment", "photo", 20),
+            ("Vérifie ton humeur", "Utilise la fonction humeur du jour", "mood", 10),
+            ("Ajoute un souvenir précieux", "Immortalise un moment spécial dans vos souvenirs", "memory", 25),
+            ("Envoie une lettre d'amour", "Écris une belle lettre à ton partenaire", "letter", 30)
+        ]
+        
+        for title, desc, c_type, points in default_challenges:
+            challenge = Challenge(
+                title=title,
+                description=desc,
+                challenge_type=c_type,
+                points=points
+            )
+            db.session.add(challenge)
+    
+    db.session.commit()
+
+# Tables générées par `flask seed`, dans l'ordre d'insertion
+SEED_MODELS = {
+    'phrases': Phrase, 'photos': Photo, 'letters': Letter,
+    'memories': Memory, 'events': CalendarEvent, 'activities': Activity,
+}
+
+def seed_database(counts, batch_size=5000, seed=None):
+    """Génère des données synthétiques par INSERT en masse ; retourne {table: lignes}"""
+    from seeder import Seeder, bulk_insert
+
+    users = [username for (username,) in db.session.query(User.username).order_by(User.id)]
+    seeder = Seeder(users or ['maninka mousso', 'panda bg'], seed=seed)
+    inserted = {}
+    for name, model in SEED_MODELS.items():
+        if counts.get(name):
+            inserted[name] = bulk_insert(db.session.connection(), model.__table__,
+                                         getattr(seeder, name)(counts[name]),
+                                         batch_size, after_bulk_insert(model))
+            db.session.commit()
+    return inserted
+
+def reset_database():
+    """Supprime toutes les données puis recrée le schéma et les comptes"""
+    db.drop_all()
+    # Tables hors modèles : index de recherche et suivi des migrations
+    search_index.drop(db.session.connection())
+    db.session.execute(text(f'DROP TABLE IF EXISTS {Migrator.TABLE}'))
+    db.session.commit()
+    init_db()
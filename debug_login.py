@@ -1,5 +1,8 @@
 import os
-from app import app, db, User
+from app import create_app
+from models import db, User
+
+app = create_app()
 from werkzeug.security import check_password_hash
 
 with app.app_context():
@@ -0,0 +1,121 @@
+import json
+import os
+import zipfile
+from datetime import date, datetime
+from typing import NamedTuple
+from urllib.parse import urlparse
+
+from sqlalchemy import or_, select
+
+# Version du format des archives (première ligne de chaque export)
+FORMAT_VERSION = 1
+
+
+class ExportSource(NamedTuple):
+    kind: str          # valeur du champ "type" des lignes exportées
+    table: object      # table SQLAlchemy
+    since: tuple       # colonnes de date comparées au paramètre since
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} non sérialisable')
+
+
+def dumps(record):
+    return json.dumps(record, ensure_ascii=False, default=_default, separators=(',', ':'))
+
+
+class Exporter:
+    """Export complet ou incrémental des données, en flux.
+
+    Chaque table est lue par un curseur côté serveur (`yield_per`) : la
+    mémoire utilisée ne dépend pas de la taille de l'historique. Chaque
+    ligne NDJSON est un objet {"type": ..., <colonnes>} ; la première
+    décrit l'export lui-même, et son `generated_at` peut servir de `since`
+    pour l'export suivant.
+    """
+
+    def __init__(self, sources, batch_size=500):
+        self.sources = list(sources)
+        self.batch_size = batch_size
+
+    def header(self, since=None):
+        return {'type': 'export', 'version': FORMAT_VERSION,
+                'generated_at': datetime.utcnow(), 'since': since}
+
+    def records(self, session, since=None, kinds=None):
+        """Génère les enregistrements {type, ...} table par table"""
+        for source in self.sources:
+            if kinds and source.kind not in kinds:
+                continue
+            stmt = select(source.table).order_by(*source.table.primary_key.columns)
+            if since is not None:
+                stmt = stmt.where(or_(*(column >= since for column in source.since)))
+            rows = session.execute(stmt.execution_options(yield_per=self.batch_size))
+            for row in rows.mappings():
+                yield {'type': source.kind, **row}
+
+    def iter_ndjson(self, session, since=None):
+        yield dumps(self.header(since)) + '\n'
+        for record in self.records(session, since):
+            yield dumps(record) + '\n'
+
+    def iter_zip(self, session, since=None, fetch=None, chunk_size=64 * 1024):
+        """Archive ZIP produite à la volée : data.ndjson puis, si `fetch` est
+        fourni, le fichier de chaque photo (`fetch(record)` génère ses octets)"""
+        stream = _ZipStream()
+        with zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            info = zipfile.ZipInfo('data.ndjson', datetime.now().timetuple()[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with archive.open(info, 'w') as data:
+                data.write((dumps(self.header(since)) + '\n').encode())
+                for record in self.records(session, since):
+                    data.write((dumps(record) + '\n').encode())
+                    if stream.size >= chunk_size:
+                        yield stream.drain()
+
+            # Second passage sur les photos, plutôt que de les garder en mémoire
+            for record in self.records(session, since, kinds={'photo'}) if fetch else ():
+                info = zipfile.ZipInfo(f"photos/{record['id']}{photo_extension(record)}")
+                if record.get('date'):
+                    info.date_time = record['date'].timetuple()[:6]
+                try:
+                    # Les images sont déjà compressées : stockées telles quelles
+                    with archive.open(info, 'w') as target:
+                        for chunk in fetch(record):
+                            target.write(chunk)
+                            if stream.size >= chunk_size:
+                                yield stream.drain()
+                except Exception as e:
+                    print(f"Erreur lors de l'export de la photo {record['id']}: {e}")
+                if stream.size >= chunk_size:
+                    yield stream.drain()
+        yield stream.drain()
+
+
+def photo_extension(record):
+    path = urlparse(record.get('cloudinary_url') or '').path or record.get('filename') or ''
+    return os.path.splitext(path)[1].lower() or '.jpg'
+
+
+class _ZipStream:
+    """Fichier en écriture seule, non positionnable, vidé au fil de l'eau"""
+
+    def __init__(self):
+        self._chunks = []
+        self.size = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks, self.size = [], 0
+        return data
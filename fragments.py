@@ -0,0 +1,114 @@
+import os
+import threading
+from collections import OrderedDict
+
+from jinja2 import FileSystemBytecodeCache, nodes
+from jinja2.ext import Extension
+
+
+class FragmentCache:
+    """LRU des fragments de templates déjà rendus, par processus.
+
+    Bornée à la fois en nombre de fragments et en taille totale (octets
+    UTF-8) : les fragments les moins récemment servis sont évincés d'abord.
+    """
+
+    def __init__(self, maxsize=2000, max_bytes=8 * 1024 * 1024):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # {clé: (fragment, taille)}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, fragment):
+        size = len(fragment.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (fragment, size)
+            self._bytes += size
+            while len(self._entries) > self.maxsize or self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size_bytes(self):
+        return self._bytes
+
+
+class FragmentCacheExtension(Extension):
+    """Balise `{% cache clé, ... %}...{% endcache %}`.
+
+    Le fragment est rendu une fois par combinaison de clés puis resservi
+    depuis `environment.fragment_cache` ; les clés doivent donc couvrir tout
+    ce qui change son rendu : tous les champs affichés, pas seulement l'id,
+    que SQLite réattribue après une suppression. Sans cache configuré, le
+    contenu est rendu normalement.
+    """
+
+    tags = {'cache'}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=None)
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        keys = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            keys.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        # Deux balises d'un même template ne partagent jamais leurs entrées
+        where = nodes.Const(f'{parser.name}:{lineno}')
+        call = self.call_method('_render', [where, nodes.Tuple(keys, 'load')])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _render(self, where, keys, caller):
+        cache = self.environment.fragment_cache
+        if cache is None:
+            return caller()
+        key = (where, keys)
+        fragment = cache.get(key)
+        if fragment is None:
+            fragment = caller()
+            cache.set(key, fragment)
+        return fragment
+
+
+def init_app(app):
+    """Bytecode des templates sur disque (partagé par les workers) et cache
+    des fragments ; à appeler avant le premier accès à `app.jinja_env`"""
+    options = dict(app.jinja_options)
+    options['extensions'] = [*options.get('extensions', ()), FragmentCacheExtension]
+    directory = app.config['JINJA_BYTECODE_CACHE_DIR']
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        options['bytecode_cache'] = FileSystemBytecodeCache(directory)
+    app.jinja_options = options
+
+    if app.config['FRAGMENT_CACHE_SIZE']:
+        app.jinja_env.fragment_cache = FragmentCache(app.config['FRAGMENT_CACHE_SIZE'],
+                                                     app.config['FRAGMENT_CACHE_MAX_BYTES'])
@@ -0,0 +1,10 @@
+# Configuration gunicorn, chargée automatiquement depuis le répertoire courant
+
+def post_worker_init(worker):
+    """Préchauffe chaque worker après le chargement de l'application,
+    avant qu'il n'accepte sa première requête"""
+    from services import warm_up
+
+    worker.log.info("Préchauffage du worker %s", worker.pid)
+    results = warm_up(worker.wsgi, log=worker.log.info)
+    worker.log.info("Worker %s prêt en %.1f ms", worker.pid, sum(r.seconds for r in results) * 1000)
@@ -0,0 +1,65 @@
+from datetime import timedelta
+
+# Longueur maximale d'une ligne iCalendar, en octets (RFC 5545, 3.1)
+LINE_LIMIT = 75
+
+
+def escape_text(value):
+    """Échappe une valeur TEXT (antislash, point-virgule, virgule, sauts de ligne)"""
+    return (str(value or '').replace('\\', '\\\\').replace(';', '\\;')
+            .replace(',', '\\,').replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def fold(line):
+    """Replie une ligne à 75 octets sans couper un caractère UTF-8"""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= LINE_LIMIT:
+        return line + '\r\n'
+    parts, current, size, limit = [], [], 0, LINE_LIMIT
+    for char in line:
+        width = len(char.encode('utf-8'))
+        if size + width > limit:
+            parts.append(''.join(current))
+            # Les lignes de continuation commencent par une espace
+            current, size, limit = [], 0, LINE_LIMIT - 1
+        current.append(char)
+        size += width
+    parts.append(''.join(current))
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def event_lines(uid, day, title, stamp, description=None, category=None, rrule=None):
+    """Lignes d'un VEVENT sur une journée entière"""
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:{uid}',
+        f'DTSTAMP:{stamp:%Y%m%dT%H%M%SZ}',
+        f'DTSTART;VALUE=DATE:{day:%Y%m%d}',
+        f'DTEND;VALUE=DATE:{day + timedelta(days=1):%Y%m%d}',
+        f'SUMMARY:{escape_text(title)}',
+    ]
+    if description:
+        lines.append(f'DESCRIPTION:{escape_text(description)}')
+    if category:
+        lines.append(f'CATEGORIES:{escape_text(category)}')
+    if rrule:
+        lines.append(f'RRULE:{rrule}')
+    lines.append('END:VEVENT')
+    return lines
+
+
+def iter_calendar(name, events):
+    """Génère le flux .ics morceau par morceau ; `events` produit des listes
+    de lignes (voir event_lines) et n'est parcouru qu'une fois"""
+    header = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//Cisse Fanta//Calendrier//FR',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{escape_text(name)}',
+    ]
+    yield ''.join(fold(line) for line in header)
+    for lines in events:
+        yield ''.join(fold(line) for line in lines)
+    yield fold('END:VCALENDAR')
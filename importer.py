@@ -0,0 +1,247 @@
+import csv
+import json
+from datetime import date, datetime, timezone
+from typing import NamedTuple
+
+from sqlalchemy import insert, select
+
+
+class InvalidRecord(ValueError):
+    """Enregistrement invalide (le message est montré à l'utilisateur)"""
+
+
+def parse_text(value):
+    return str(value).strip() if value is not None else None
+
+
+def parse_datetime(value):
+    """Date-heure ISO 8601, ramenée en UTC naïf comme dans la base"""
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(str(value).strip().replace('Z', '+00:00'))
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+
+def parse_date(value):
+    if isinstance(value, date) and not isinstance(value, datetime):
+        return value
+    return date.fromisoformat(str(value).strip()[:10])
+
+
+def parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ('1', 'true', 'vrai', 'oui', 'yes'):
+        return True
+    if text in ('', '0', 'false', 'faux', 'non', 'no'):
+        return False
+    raise ValueError(f'booléen attendu : {value!r}')
+
+
+def parse_int(value):
+    return int(value)
+
+
+class Field(NamedTuple):
+    name: str
+    parse: object = parse_text
+    required: bool = False
+    max_length: int = None
+    default: object = None  # valeur ou fonction sans argument
+
+
+class ImportTarget(NamedTuple):
+    """Type d'enregistrement importable.
+
+    `key` liste les champs de la clé naturelle (le plus sélectif en premier,
+    de préférence indexé) : un enregistrement dont la clé existe déjà est
+    ignoré, ce qui rend un nouvel import du même fichier sans effet.
+    `after_insert(conn, rows)` reçoit les lignes insérées (avec leur id) pour
+    maintenir ce que les événements de session ne voient pas (compteurs,
+    index de recherche...).
+    """
+    kind: str
+    table: object
+    fields: tuple
+    key: tuple
+    after_insert: object = None
+
+    def validate(self, record):
+        row = {}
+        for field in self.fields:
+            value = record.get(field.name)
+            if value is None or value == '':
+                if field.required:
+                    raise InvalidRecord(f'champ « {field.name} » obligatoire')
+                row[field.name] = field.default() if callable(field.default) else field.default
+                continue
+            try:
+                value = field.parse(value)
+            except (TypeError, ValueError) as e:
+                raise InvalidRecord(f'champ « {field.name} » invalide ({e})')
+            if field.max_length and len(value) > field.max_length:
+                raise InvalidRecord(f'champ « {field.name} » trop long (max {field.max_length})')
+            if field.required and value == '':
+                raise InvalidRecord(f'champ « {field.name} » obligatoire')
+            row[field.name] = value
+        return row
+
+    def natural_key(self, row):
+        return tuple(row[name] for name in self.key)
+
+
+class ImportReport(NamedTuple):
+    read: int
+    inserted: dict    # {type: nombre}
+    duplicates: int
+    skipped: int      # types non importables (ex. en-tête d'export)
+    errors: list      # [(ligne, message)], limité aux premières erreurs
+
+    def as_dict(self):
+        return {'read': self.read, 'inserted': self.inserted, 'duplicates': self.duplicates,
+                'skipped': self.skipped, 'errors': [{'line': n, 'error': e} for n, e in self.errors]}
+
+
+def read_ndjson(stream):
+    """(numéro de ligne, dict) pour chaque ligne JSON d'un flux texte"""
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield number, InvalidRecord(f'JSON invalide ({e})')
+            continue
+        yield number, record if isinstance(record, dict) else InvalidRecord('objet JSON attendu')
+
+
+def read_csv(stream, kind=None):
+    """(numéro de ligne, dict) pour chaque ligne d'un CSV avec en-tête ;
+    le type vient de la colonne `type`, sinon de `kind`"""
+    for number, record in enumerate(csv.DictReader(stream), 2):
+        if kind and not record.get('type'):
+            record['type'] = kind
+        yield number, record
+
+
+def insert_with_ids(conn, table, rows, key=None):
+    """INSERT multi-lignes qui renseigne l'`id` attribué à chaque ligne.
+
+    INSERT ... RETURNING dans l'ordre des lignes ailleurs ; SQLite ne peut
+    garantir cet ordre qu'en insérant ligne par ligne : un seul executemany,
+    puis les ids relus par clé naturelle (`key`, unique dans le lot et
+    absente de la base avant l'insertion), ou à défaut les derniers ids de
+    la table (le verrou d'écriture pris par l'INSERT empêche toute autre
+    insertion jusqu'au commit).
+    """
+    if conn.dialect.name != 'sqlite':
+        ids = conn.execute(insert(table).returning(table.c.id, sort_by_parameter_order=True), rows).scalars().all()
+        for row, row_id in zip(rows, ids):
+            row['id'] = row_id
+        return
+
+    conn.execute(insert(table), rows)
+    if key is None:
+        ids = conn.execute(select(table.c.id).order_by(table.c.id.desc()).limit(len(rows))).scalars().all()
+        for row, row_id in zip(rows, reversed(ids)):
+            row['id'] = row_id
+        return
+    columns = [table.c[name] for name in key]
+    ids = {
+        tuple(found[:-1]): found[-1] for found in conn.execute(
+            select(*columns, table.c.id).where(columns[0].in_({row[key[0]] for row in rows}))
+        )
+    }
+    for row in rows:
+        row['id'] = ids[tuple(row[name] for name in key)]
+
+
+class Importer:
+    """Import en flux, validé enregistrement par enregistrement.
+
+    Les lignes valides sont accumulées par type puis écrites par lots de
+    `batch_size` en un seul INSERT multi-lignes, chaque lot dans sa propre
+    transaction : un import interrompu peut être relancé tel quel.
+    """
+
+    MAX_ERRORS = 100
+
+    def __init__(self, session, targets, batch_size=1000, on_progress=None):
+        self.session = session
+        self.targets = {target.kind: target for target in targets}
+        self.batch_size = batch_size
+        self.on_progress = on_progress
+
+    def run(self, records):
+        pending = {kind: {} for kind in self.targets}
+        inserted = dict.fromkeys(self.targets, 0)
+        read = duplicates = skipped = 0
+        errors = []
+
+        for number, record in records:
+            read += 1
+            if isinstance(record, Exception):
+                self._error(errors, number, record)
+                continue
+            target = self.targets.get(record.get('type'))
+            if target is None:
+                skipped += 1
+                continue
+            try:
+                row = target.validate(record)
+            except InvalidRecord as e:
+                self._error(errors, number, e)
+                continue
+            batch = pending[target.kind]
+            key = target.natural_key(row)
+            if key in batch:
+                duplicates += 1
+                continue
+            batch[key] = row
+            if len(batch) >= self.batch_size:
+                count = self._write(target, batch)
+                inserted[target.kind] += count
+                duplicates += len(batch) - count
+                batch.clear()
+                self._progress(read, inserted, duplicates, errors)
+
+        for kind, batch in pending.items():
+            if batch:
+                count = self._write(self.targets[kind], batch)
+                inserted[kind] += count
+                duplicates += len(batch) - count
+        self._progress(read, inserted, duplicates, errors)
+        return ImportReport(read, inserted, duplicates, skipped, errors)
+
+    def _error(self, errors, number, error):
+        if len(errors) < self.MAX_ERRORS:
+            errors.append((number, str(error)))
+
+    def _progress(self, read, inserted, duplicates, errors):
+        if self.on_progress:
+            self.on_progress(read, sum(inserted.values()), duplicates, len(errors))
+
+    def _write(self, target, batch):
+        """Insère les lignes du lot absentes de la base ; retourne leur nombre"""
+        table = target.table
+        first = table.c[target.key[0]]
+        columns = [table.c[name] for name in target.key]
+        existing = {
+            tuple(row) for row in self.session.execute(
+                select(*columns).where(first.in_({key[0] for key in batch}))
+            )
+        }
+        rows = [row for key, row in batch.items() if key not in existing]
+        if not rows:
+            return 0
+        try:
+            conn = self.session.connection()
+            insert_with_ids(conn, table, rows, target.key)
+            if target.after_insert:
+                target.after_insert(conn, rows)
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        return len(rows)
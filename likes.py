@@ -0,0 +1,97 @@
+import os
+import threading
+
+
+class LikeBuffer:
+    """Regroupe les likes d'une ligne très sollicitée en un seul UPDATE.
+
+    Le premier clic sur une ligne est appliqué immédiatement (ce qui donne
+    le compteur courant) ; les clics suivants sont cumulés en mémoire et
+    écrits toutes les `interval_ms` millisecondes par un thread de fond, en
+    un seul `likes = likes + n` par ligne. La valeur renvoyée au client est
+    la dernière valeur connue plus les clics encore en attente.
+
+    `apply(key, amount)` doit incrémenter atomiquement la ligne désignée par
+    `key` et retourner la nouvelle valeur, ou None si la ligne n'existe plus.
+    """
+
+    def __init__(self, apply, interval_ms=250):
+        self.apply = apply
+        self.interval = interval_ms / 1000.0
+        self._lock = threading.Lock()
+        self._known = {}
+        self._pending = {}
+        self._inflight = {}
+        self._stopping = threading.Event()
+        self._thread = None
+        self._pid = os.getpid()
+
+    def add(self, key):
+        """Compte un clic ; retourne le nombre de likes à afficher (None si inconnu)"""
+        self._ensure_worker()
+        with self._lock:
+            if key in self._known:
+                self._pending[key] = self._pending.get(key, 0) + 1
+                return self._current(key)
+
+        likes = self.apply(key, 1)
+        if likes is not None:
+            with self._lock:
+                self._known.setdefault(key, likes)
+                return self._current(key)
+        return None
+
+    def _current(self, key):
+        return self._known[key] + self._inflight.get(key, 0) + self._pending.get(key, 0)
+
+    def flush(self):
+        """Écrit tous les clics en attente ; retourne le nombre de lignes mises à jour"""
+        with self._lock:
+            batch, self._pending = self._pending, {}
+            idle = [key for key in self._known if key not in batch and key not in self._inflight]
+            for key in idle:
+                # Sans activité depuis un cycle : la valeur connue peut avoir vieilli
+                del self._known[key]
+            for key, amount in batch.items():
+                self._inflight[key] = self._inflight.get(key, 0) + amount
+
+        for key, amount in batch.items():
+            try:
+                likes = self.apply(key, amount)
+            except Exception as e:
+                print(f"Erreur lors de l'écriture des likes {key}: {e}")
+                likes = None
+                with self._lock:
+                    # Remettre les clics en attente pour le prochain cycle
+                    self._pending[key] = self._pending.get(key, 0) + amount
+            with self._lock:
+                self._inflight[key] -= amount
+                if not self._inflight[key]:
+                    del self._inflight[key]
+                if likes is not None:
+                    self._known[key] = likes
+                elif key not in self._pending:
+                    self._known.pop(key, None)
+        return len(batch)
+
+    def close(self):
+        self._stopping.set()
+        self.flush()
+
+    def _ensure_worker(self):
+        if self._pid != os.getpid():
+            # Après un fork, repartir d'un état vierge dans le worker
+            self._pid = os.getpid()
+            self._lock = threading.Lock()
+            self._known, self._pending, self._inflight = {}, {}, {}
+            self._stopping = threading.Event()
+            self._thread = None
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name='like-buffer', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while not self._stopping.wait(self.interval):
+            self.flush()
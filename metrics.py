@@ -0,0 +1,236 @@
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from flask import g, has_app_context, request
+from flask.signals import before_render_template, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Bornes des histogrammes (secondes, puis nombre de requêtes SQL)
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.total += value
+        self.count += 1
+
+    def lines(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            cumulative += count
+            yield f'{name}_bucket{_labels(labels, le=bound)} {cumulative}'
+        yield f'{name}_sum{_labels(labels)} {self.total:.6f}'
+        yield f'{name}_count{_labels(labels)} {self.count}'
+
+
+def _labels(labels, **extra):
+    items = {**labels, **extra}
+    if not items:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in items.items()) + '}'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class _Timing:
+    """Mesures de la requête en cours (stockées dans g)"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db = 0.0
+        self.templates = 0.0
+        self.external = defaultdict(float)
+        self._template_starts = []
+
+
+class Metrics:
+    """Instrumentation des requêtes : en-tête Server-Timing et texte Prometheus.
+
+    Pour chaque requête : durée totale, nombre et durée des requêtes SQL
+    (événements de curseur SQLAlchemy), durée de rendu des templates
+    (signaux Flask) et durée des appels sortants déclarés avec `timed()`.
+    Les agrégats sont propres à chaque processus : chaque worker gunicorn
+    expose les siens.
+    """
+
+    def __init__(self, server_timing=True):
+        self.server_timing = server_timing
+        self._lock = threading.Lock()
+        self._durations = defaultdict(lambda: Histogram(DURATION_BUCKETS))
+        self._queries = defaultdict(lambda: Histogram(QUERY_BUCKETS))
+        self._external = defaultdict(lambda: Histogram(DURATION_BUCKETS))
+        self._totals = defaultdict(float)
+        self._requests = defaultdict(int)
+        self._compression = defaultdict(int)
+        self._warmup = {}
+
+    def attach(self, app):
+        """À appeler avant les autres before_request pour tout mesurer"""
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        # Écouteurs globaux, installés une seule fois même pour plusieurs applications
+        if not event.contains(Engine, 'after_cursor_execute', Metrics._after_cursor_execute):
+            event.listen(Engine, 'before_cursor_execute', Metrics._before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', Metrics._after_cursor_execute)
+        before_render_template.connect(self._before_render, app, weak=False)
+        template_rendered.connect(self._after_render, app, weak=False)
+
+    @staticmethod
+    def _current():
+        return g.get('_timing') if has_app_context() else None
+
+    # --- Mesures ---
+
+    def _before_request(self):
+        g._timing = _Timing()
+
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('_query_start', []).append(time.perf_counter())
+
+    @staticmethod
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info['_query_start'].pop()
+        timing = Metrics._current()
+        if timing is not None:
+            timing.queries += 1
+            timing.db += time.perf_counter() - started
+
+    def _before_render(self, sender, template, context, **extra):
+        timing = self._current()
+        if timing is not None:
+            timing._template_starts.append(time.perf_counter())
+
+    def _after_render(self, sender, template, context, **extra):
+        timing = self._current()
+        if timing is not None and timing._template_starts:
+            elapsed = time.perf_counter() - timing._template_starts.pop()
+            # Les rendus imbriqués sont déjà comptés dans le rendu englobant
+            if not timing._template_starts:
+                timing.templates += elapsed
+
+    @contextmanager
+    def timed(self, service):
+        """Chronomètre un appel sortant (Cloudinary...), dans ou hors requête"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._external[service].observe(elapsed)
+            timing = self._current()
+            if timing is not None:
+                timing.external[service] += elapsed
+
+    def _after_request(self, response):
+        timing = self._current()
+        if timing is None:
+            return response
+        elapsed = time.perf_counter() - timing.start
+        endpoint = request.endpoint or 'not_found'
+
+        with self._lock:
+            self._durations[endpoint].observe(elapsed)
+            self._queries[endpoint].observe(timing.queries)
+            self._totals[('db', endpoint)] += timing.db
+            self._totals[('templates', endpoint)] += timing.templates
+            self._requests[(endpoint, request.method, response.status_code)] += 1
+
+        if self.server_timing:
+            entries = [
+                f'app;dur={elapsed * 1000:.1f}',
+                f'db;dur={timing.db * 1000:.1f};desc="{timing.queries} requetes SQL"',
+                f'tpl;dur={timing.templates * 1000:.1f}',
+            ]
+            entries += [f'{service};dur={seconds * 1000:.1f}' for service, seconds in timing.external.items()]
+            response.headers.add('Server-Timing', ', '.join(entries))
+        return response
+
+    def record_compression(self, encoding, original, sent):
+        """Taille d'une réponse avant et après compression (voir compression.py)"""
+        with self._lock:
+            self._compression[('responses', encoding)] += 1
+            self._compression[('original', encoding)] += original
+            self._compression[('sent', encoding)] += sent
+
+    def record_warmup(self, results):
+        """Durées des étapes du préchauffage du worker (voir warmup.py)"""
+        with self._lock:
+            self._warmup = {result.name: result.seconds for result in results}
+
+    # --- Exposition ---
+
+    def render(self):
+        """Texte d'exposition Prometheus (version 0.0.4)"""
+        with self._lock:
+            lines = [
+                '# HELP cisse_requests_total Requêtes HTTP traitées',
+                '# TYPE cisse_requests_total counter',
+            ]
+            for (endpoint, method, status), count in sorted(self._requests.items()):
+                lines.append(f'cisse_requests_total{_labels({"endpoint": endpoint, "method": method, "status": status})} {count}')
+
+            lines += ['# HELP cisse_request_duration_seconds Durée des requêtes HTTP',
+                      '# TYPE cisse_request_duration_seconds histogram']
+            for endpoint, histogram in sorted(self._durations.items()):
+                lines.extend(histogram.lines('cisse_request_duration_seconds', {'endpoint': endpoint}))
+
+            lines += ['# HELP cisse_request_db_queries Requêtes SQL par requête HTTP',
+                      '# TYPE cisse_request_db_queries histogram']
+            for endpoint, histogram in sorted(self._queries.items()):
+                lines.extend(histogram.lines('cisse_request_db_queries', {'endpoint': endpoint}))
+
+            for kind, help_text in (('db', 'Temps passé en SQL'), ('templates', 'Temps de rendu des templates')):
+                name = f'cisse_request_{kind}_seconds_total'
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+                for (total_kind, endpoint), seconds in sorted(self._totals.items()):
+                    if total_kind == kind:
+                        lines.append(f'{name}{_labels({"endpoint": endpoint})} {seconds:.6f}')
+
+            lines += ['# HELP cisse_external_duration_seconds Durée des appels sortants',
+                      '# TYPE cisse_external_duration_seconds histogram']
+            for service, histogram in sorted(self._external.items()):
+                lines.extend(histogram.lines('cisse_external_duration_seconds', {'service': service}))
+
+            lines += ['# HELP cisse_compressed_responses_total Réponses compressées à la volée',
+                      '# TYPE cisse_compressed_responses_total counter']
+            for (kind, encoding), value in sorted(self._compression.items()):
+                if kind == 'responses':
+                    lines.append(f'cisse_compressed_responses_total{_labels({"encoding": encoding})} {value}')
+            lines += ['# HELP cisse_compression_bytes_total Octets des réponses compressées, avant et après',
+                      '# TYPE cisse_compression_bytes_total counter']
+            for (kind, encoding), value in sorted(self._compression.items()):
+                if kind != 'responses':
+                    lines.append(f'cisse_compression_bytes_total{_labels({"encoding": encoding, "stage": kind})} {value}')
+            lines += ['# HELP cisse_compression_saved_bytes_total Octets économisés par la compression',
+                      '# TYPE cisse_compression_saved_bytes_total counter']
+            for (kind, encoding), value in sorted(self._compression.items()):
+                if kind == 'original':
+                    saved = value - self._compression[('sent', encoding)]
+                    lines.append(f'cisse_compression_saved_bytes_total{_labels({"encoding": encoding})} {saved}')
+
+            lines += ['# HELP cisse_warmup_seconds Durée des étapes du préchauffage du worker',
+                      '# TYPE cisse_warmup_seconds gauge']
+            for step, seconds in self._warmup.items():
+                lines.append(f'cisse_warmup_seconds{_labels({"step": step})} {seconds:.6f}')
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,120 @@
+import sys
+from datetime import datetime
+from typing import NamedTuple
+
+from sqlalchemy import inspect, text
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    upgrade: object
+
+
+class Migrator:
+    """Migrations de schéma versionnées, pour SQLite comme pour PostgreSQL.
+
+    Chaque migration est une fonction `upgrade(session)` exécutée dans sa
+    propre transaction, avec l'enregistrement de sa version dans la table
+    `schema_migrations`. Les migrations doivent rester idempotentes : une
+    base créée par `create_all()` possède déjà une partie du schéma.
+    """
+
+    TABLE = 'schema_migrations'
+    # Clé du verrou consultatif PostgreSQL (workers démarrant en même temps)
+    LOCK_KEY = 7263541
+
+    def __init__(self):
+        self._migrations = {}
+
+    def migration(self, version, name):
+        """Décorateur déclarant une migration"""
+        def register(fn):
+            if version in self._migrations:
+                raise ValueError(f'Migration {version} déjà déclarée')
+            self._migrations[version] = Migration(version, name, fn)
+            return fn
+        return register
+
+    @property
+    def migrations(self):
+        return [self._migrations[v] for v in sorted(self._migrations)]
+
+    def _ensure_table(self, session):
+        session.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS {self.TABLE} (
+                version INTEGER PRIMARY KEY,
+                name VARCHAR(200) NOT NULL,
+                applied_at TIMESTAMP NOT NULL
+            )
+        """))
+
+    def applied(self, session):
+        self._ensure_table(session)
+        return {row[0] for row in session.execute(text(f'SELECT version FROM {self.TABLE}'))}
+
+    def pending(self, session):
+        done = self.applied(session)
+        session.commit()
+        return [m for m in self.migrations if m.version not in done]
+
+    def upgrade(self, session, log=None):
+        """Applique les migrations manquantes ; retourne celles appliquées"""
+        # Par défaut sur stderr, pour ne pas polluer la sortie des commandes
+        log = log or (lambda message: print(message, file=sys.stderr))
+        applied = []
+        for migration in self.pending(session):
+            if session.get_bind().dialect.name == 'postgresql':
+                session.execute(text('SELECT pg_advisory_xact_lock(:key)'), {'key': self.LOCK_KEY})
+            # Un autre processus a pu l'appliquer pendant l'attente du verrou
+            if migration.version in self.applied(session):
+                session.rollback()
+                continue
+            try:
+                migration.upgrade(session)
+                session.execute(
+                    text(f'INSERT INTO {self.TABLE} (version, name, applied_at) '
+                         f'VALUES (:version, :name, :applied_at)'),
+                    {'version': migration.version, 'name': migration.name,
+                     'applied_at': datetime.utcnow()}
+                )
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
+            log(f"  Migration {migration.version:04d} appliquée : {migration.name}")
+            applied.append(migration)
+        return applied
+
+
+def add_column(session, table, column, ddl):
+    """ALTER TABLE ... ADD COLUMN, seulement si la colonne n'existe pas déjà"""
+    existing = {c['name'] for c in inspect(session.connection()).get_columns(table)}
+    if column not in existing:
+        session.execute(text(f'ALTER TABLE {table} ADD COLUMN {column} {ddl}'))
+
+
+def create_indexes(session, tables):
+    """Crée les index déclarés sur les modèles qui manquent dans la base"""
+    conn = session.connection()
+    for table in tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+def explain(session, statement):
+    """Plan d'exécution d'une requête SQLAlchemy, sous forme de texte"""
+    conn = session.connection()
+    compiled = statement.compile(conn, compile_kwargs={'literal_binds': True})
+    if conn.dialect.name == 'postgresql':
+        # Sur une petite base, PostgreSQL préfère un parcours séquentiel :
+        # on vérifie ici que l'index est utilisable, pas qu'il est choisi
+        session.execute(text('SET LOCAL enable_seqscan = off'))
+        rows = session.execute(text(f'EXPLAIN {compiled}'))
+        return '\n'.join(row[0] for row in rows)
+    rows = session.execute(text(f'EXPLAIN QUERY PLAN {compiled}'))
+    return '\n'.join(row[-1] for row in rows)
+
+
+def uses_index(plan, index_name):
+    return f'INDEX {index_name}' in plan or f'using {index_name}' in plan or f'on {index_name}' in plan
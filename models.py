@@ -0,0 +1,298 @@
+import json
+import secrets
+from datetime import datetime
+
+from flask_sqlalchemy import SQLAlchemy
+
+from counters import Counters
+from search import SearchIndex
+
+# Initialisation de la base de données (liée à l'application par create_app)
+db = SQLAlchemy()
+
+# Longueur maximale d'un tag normalisé
+MAX_TAG_LENGTH = 50
+
+def normalize_tag(raw):
+    """Normalise un tag saisi : « #Amour  Fou » -> « amour fou »"""
+    return ' '.join(raw.strip().lstrip('#').lower().split())[:MAX_TAG_LENGTH]
+
+def parse_tags(raw):
+    """Découpe le champ libre des tags (séparés par des virgules), sans doublons"""
+    names = []
+    for part in (raw or '').split(','):
+        name = normalize_tag(part)
+        if name and name not in names:
+            names.append(name)
+    return names
+
+def new_calendar_key():
+    """Clé aléatoire des liens d'abonnement au calendrier d'un utilisateur"""
+    return secrets.token_urlsafe(16)
+
+# Modèles de base de données
+class User(db.Model):
+    __tablename__ = 'users'
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(80), unique=True, nullable=False)
+    password_hash = db.Column(db.String(120), nullable=False)
+    favorite_color = db.Column(db.String(7), default='#ffdde1')
+    visit_count = db.Column(db.Integer, default=0)
+    last_login = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    partner_id = db.Column(db.Integer, db.ForeignKey('users.id'))
+    calendar_key = db.Column(db.String(32), default=new_calendar_key)  # changée pour révoquer les liens .ics
+    
+    partner = db.relationship('User', remote_side=[id], post_update=True)
+
+class Phrase(db.Model):
+    __tablename__ = 'phrases'
+    id = db.Column(db.Integer, primary_key=True)
+    texte = db.Column(db.Text, nullable=False)
+    auteur = db.Column(db.String(80), nullable=False)
+    date = db.Column(db.DateTime, default=datetime.utcnow)
+    couleur = db.Column(db.String(7), default='#ffdde1')
+    tags = db.Column(db.String(200))
+    est_favori = db.Column(db.Boolean, default=False)
+    likes = db.Column(db.Integer, default=0)
+    is_special = db.Column(db.Boolean, default=False)
+    
+    # Index composite pour la pagination par curseur (date, id)
+    __table_args__ = (db.Index('ix_phrases_date_id', 'date', 'id'),)
+    
+    tag_items = db.relationship('Tag', secondary='phrase_tags', back_populates='phrases')
+
+# Tags normalisés, liés aux messages par une table d'association indexée
+phrase_tags = db.Table(
+    'phrase_tags',
+    db.Column('phrase_id', db.Integer, db.ForeignKey('phrases.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('tag_id', db.Integer, db.ForeignKey('tags.id', ondelete='CASCADE'), primary_key=True),
+    db.Index('ix_phrase_tags_tag_id', 'tag_id', 'phrase_id')
+)
+
+class Tag(db.Model):
+    __tablename__ = 'tags'
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(MAX_TAG_LENGTH), unique=True, nullable=False)
+    phrases = db.relationship('Phrase', secondary=phrase_tags, back_populates='tag_items')
+
+class Photo(db.Model):
+    __tablename__ = 'photos'
+    id = db.Column(db.Integer, primary_key=True)
+    filename = db.Column(db.String(200), nullable=False)
+    cloudinary_url = db.Column(db.Text)
+    cloudinary_public_id = db.Column(db.String(200))
+    legende = db.Column(db.Text)
+    auteur = db.Column(db.String(80), nullable=False)
+    date = db.Column(db.DateTime, default=datetime.utcnow)
+    file_size = db.Column(db.Integer)
+    likes = db.Column(db.Integer, default=0)
+    status = db.Column(db.String(20), default='ready')  # pending, ready ou failed
+    variants = db.Column(db.Text)  # JSON {largeur: url} des déclinaisons redimensionnées
+    
+    __table_args__ = (db.Index('ix_photos_date_id', 'date', 'id'),)
+    
+    def variant_urls(self):
+        """Déclinaisons [(largeur, url)] triées par largeur croissante"""
+        if not self.variants:
+            return []
+        return sorted((int(width), url) for width, url in json.loads(self.variants).items())
+    
+    @property
+    def srcset(self):
+        return ', '.join(f'{url} {width}w' for width, url in self.variant_urls())
+    
+    def image_url(self, width):
+        """Plus petite déclinaison d'au moins `width` pixels, sinon l'original"""
+        for variant_width, url in self.variant_urls():
+            if variant_width >= width:
+                return url
+        return self.cloudinary_url
+
+class PhotoDeletion(db.Model):
+    """Outbox des photos à supprimer chez l'hébergeur, traitée en arrière-plan"""
+    __tablename__ = 'photo_deletions'
+    id = db.Column(db.Integer, primary_key=True)
+    public_id = db.Column(db.String(200), nullable=False)
+    attempts = db.Column(db.Integer, default=0)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class PhotoUpload(db.Model):
+    """Outbox des photos déposées à envoyer chez l'hébergeur, traitée en arrière-plan"""
+    __tablename__ = 'photo_uploads'
+    id = db.Column(db.Integer, primary_key=True)
+    photo_id = db.Column(db.Integer, nullable=False)
+    filename = db.Column(db.String(200), nullable=False)
+    attempts = db.Column(db.Integer, default=0)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class Letter(db.Model):
+    __tablename__ = 'letters'
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(200), nullable=False)
+    content = db.Column(db.Text, nullable=False)
+    sender = db.Column(db.String(80), nullable=False)
+    recipient = db.Column(db.String(80), nullable=False)
+    is_read = db.Column(db.Boolean, default=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_letters_recipient_is_read', 'recipient', 'is_read'),
+        db.Index('ix_letters_recipient_created_at', 'recipient', 'created_at'),
+        db.Index('ix_letters_sender_created_at', 'sender', 'created_at'),
+    )
+
+class Memory(db.Model):
+    __tablename__ = 'memories'
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text, nullable=False)
+    date_memory = db.Column(db.Date, nullable=False)
+    author = db.Column(db.String(80), nullable=False)
+    is_anniversary = db.Column(db.Boolean, default=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (db.Index('ix_memories_is_anniversary_date_memory', 'is_anniversary', 'date_memory'),)
+
+class CalendarEvent(db.Model):
+    __tablename__ = 'calendar_events'
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(200), nullable=False)
+    event_date = db.Column(db.Date, nullable=False, index=True)
+    event_type = db.Column(db.String(50), default='special')
+    description = db.Column(db.Text)
+    created_by = db.Column(db.String(80), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class Challenge(db.Model):
+    __tablename__ = 'challenges'
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text, nullable=False)
+    challenge_type = db.Column(db.String(50), nullable=False)
+    points = db.Column(db.Integer, default=10)
+    is_active = db.Column(db.Boolean, default=True)
+    completed_by = db.Column(db.String(80), index=True)
+    completed_date = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class Activity(db.Model):
+    __tablename__ = 'activities'
+    id = db.Column(db.Integer, primary_key=True)
+    user = db.Column(db.String(80), nullable=False)
+    action = db.Column(db.String(100), nullable=False)
+    details = db.Column(db.Text)
+    date = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+class Counter(db.Model):
+    __tablename__ = 'counters'
+    name = db.Column(db.String(120), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class RateLimitBucket(db.Model):
+    """Seau à jetons du limiteur de débit partagé par les workers (voir ratelimit.py)"""
+    __tablename__ = 'rate_limits'
+    key = db.Column(db.String(200), primary_key=True)
+    tokens = db.Column(db.Float, nullable=False)
+    updated_at = db.Column(db.Float, nullable=False, index=True)  # horodatage Unix
+
+class ServerSession(db.Model):
+    """Données de session côté serveur ; le cookie ne porte que l'identifiant"""
+    __tablename__ = 'server_sessions'
+    id = db.Column(db.String(64), primary_key=True)
+    data = db.Column(db.Text, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+# Compteurs matérialisés, mis à jour dans la transaction de chaque écriture
+# (et versions des pages qui les affichent, pour les requêtes conditionnelles)
+counters = Counters(Counter.__table__)
+counters.register(Phrase, ('auteur', 'est_favori'),
+                  lambda v: ['phrases', f"phrases_by:{v['auteur']}"] + (['favoris'] if v['est_favori'] else []),
+                  version='phrases')
+counters.register(Photo, ('auteur',),
+                  lambda v: ['photos', f"photos_by:{v['auteur']}"],
+                  version='photos')
+counters.register(Letter, ('recipient', 'is_read'),
+                  lambda v: ['letters'] + ([] if v['is_read'] else [f"unread:{v['recipient']}"]),
+                  version='letters')
+counters.register(Memory, (),
+                  lambda v: ['memories'],
+                  version='memories')
+counters.register(User, (),
+                  lambda v: [],
+                  version='users')
+counters.attach(db.session)
+
+# Index plein texte, tenu à jour à chaque flush de la session
+search_index = SearchIndex()
+search_index.register(Phrase, 'phrase', ('texte', 'tags'),
+                      lambda p: (p.tags, p.texte, None))
+search_index.register(Letter, 'letter', ('title', 'content', 'sender', 'recipient'),
+                      lambda l: (l.title, l.content, (l.sender, l.recipient)))
+search_index.register(Memory, 'memory', ('title', 'description'),
+                      lambda m: (m.title, m.description, None))
+search_index.register(Photo, 'photo', ('legende',),
+                      lambda p: (p.legende, '', None))
+search_index.attach(db.session)
+
+SEARCH_MODELS = {'phrase': Phrase, 'letter': Letter, 'memory': Memory, 'photo': Photo}
+
+def set_phrase_tags(phrase, raw):
+    """Associe au message les tags du champ libre, en créant ceux qui manquent"""
+    names = parse_tags(raw)
+    existing = {tag.name: tag for tag in Tag.query.filter(Tag.name.in_(names))} if names else {}
+    for name in names:
+        if name not in existing:
+            existing[name] = Tag(name=name)
+            db.session.add(existing[name])
+    phrase.tag_items = [existing[name] for name in names]
+
+def backfill_phrase_tags(batch_size=500):
+    """Migration : crée les liens message/tag pour tous les messages existants"""
+    tags_by_name = {tag.name: tag for tag in Tag.query}
+    last_id = 0
+    while True:
+        phrases = Phrase.query.filter(
+            Phrase.id > last_id, Phrase.tags.isnot(None), Phrase.tags != ''
+        ).order_by(Phrase.id).limit(batch_size).all()
+        if not phrases:
+            break
+        for phrase in phrases:
+            names = parse_tags(phrase.tags)
+            for name in names:
+                if name not in tags_by_name:
+                    tags_by_name[name] = Tag(name=name)
+                    db.session.add(tags_by_name[name])
+            phrase.tag_items = [tags_by_name[name] for name in names]
+        db.session.flush()
+        last_id = phrases[-1].id
+
+def link_couple():
+    """Relie les deux membres du couple s'ils n'ont pas encore de partenaire"""
+    users = User.query.order_by(User.id).all()
+    if len(users) == 2 and not any(user.partner_id for user in users):
+        users[0].partner, users[1].partner = users[1], users[0]
+
+
+def link_phrase_tags(conn, rows):
+    """Version ensembliste de set_phrase_tags pour des messages insérés en masse"""
+    names_by_phrase = {row['id']: parse_tags(row.get('tags')) for row in rows}
+    names = {name for names in names_by_phrase.values() for name in names}
+    if not names:
+        return
+    tags = Tag.__table__
+    ids = dict(conn.execute(db.select(tags.c.name, tags.c.id).where(tags.c.name.in_(names))).all())
+    missing = [{'name': name} for name in names if name not in ids]
+    if missing:
+        ids.update(conn.execute(
+            tags.insert().returning(tags.c.name, tags.c.id, sort_by_parameter_order=True), missing
+        ).all())
+    conn.execute(phrase_tags.insert(), [
+        {'phrase_id': phrase_id, 'tag_id': ids[name]}
+        for phrase_id, names in names_by_phrase.items() for name in names
+    ])
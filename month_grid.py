@@ -0,0 +1,54 @@
+import threading
+from calendar import monthcalendar
+from collections import OrderedDict
+from datetime import date
+from typing import NamedTuple
+
+
+def month_bounds(year, month):
+    """Intervalle semi-ouvert [premier jour, premier jour du mois suivant[
+    (une comparaison directe sur la colonne, que l'index peut servir)"""
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start, end
+
+
+class MonthGrid(NamedTuple):
+    """Grille d'un mois : semaines (0 = case vide) et événements par jour"""
+    weeks: list
+    events_by_day: dict  # {jour: [{'title': ..., 'event_type': ...}]}
+
+
+class MonthGridCache:
+    """Cache LRU des grilles mensuelles, en données simples (pas d'objets ORM).
+
+    Chaque entrée est associée à une version : `load(year, month)` n'est
+    rappelé que si la version courante, lue par l'appelant, a changé depuis
+    la mise en cache (par exemple après l'ajout d'un événement).
+    """
+
+    def __init__(self, load, maxsize=48):
+        self.load = load
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, year, month, version):
+        key = (year, month)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                return entry[1]
+
+        grid = MonthGrid(monthcalendar(year, month), self.load(year, month))
+        with self._lock:
+            self._entries[key] = (version, grid)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return grid
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
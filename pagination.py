@@ -0,0 +1,70 @@
+import base64
+import binascii
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+from sqlalchemy import tuple_
+
+
+class KeysetPage(NamedTuple):
+    """Page obtenue par curseur : aucun COUNT ni OFFSET"""
+    items: list
+    has_prev: bool
+    has_next: bool
+    prev_cursor: Optional[str]
+    next_cursor: Optional[str]
+
+
+def encode_cursor(date, row_id):
+    """Curseur opaque pour l'URL, construit à partir de (date, id)"""
+    raw = f'{date.isoformat()}|{row_id}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Retourne (date, id), ou None si le curseur est absent ou invalide"""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+        date, row_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(date), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def keyset_paginate(query, date_column, id_column, per_page, after=None, before=None):
+    """Pagine `query` du plus récent au plus ancien selon (date, id).
+
+    `after` est le curseur du dernier élément de la page précédente (page
+    suivante), `before` celui du premier élément de la page suivante (page
+    précédente). Chaque page coûte une lecture de l'index (date, id) de
+    per_page + 1 lignes, quelle que soit sa profondeur.
+    """
+    key = tuple_(date_column, id_column)
+    after, before = decode_cursor(after), decode_cursor(before)
+
+    if before is not None:
+        rows = query.filter(key > tuple_(*before)).order_by(
+            date_column.asc(), id_column.asc()
+        ).limit(per_page + 1).all()
+        has_prev, has_next = len(rows) > per_page, True
+        items = list(reversed(rows[:per_page]))
+    else:
+        if after is not None:
+            query = query.filter(key < tuple_(*after))
+        rows = query.order_by(date_column.desc(), id_column.desc()).limit(per_page + 1).all()
+        has_prev, has_next = after is not None, len(rows) > per_page
+        items = rows[:per_page]
+
+    def cursor(obj):
+        return encode_cursor(getattr(obj, date_column.key), getattr(obj, id_column.key))
+
+    has_prev, has_next = has_prev and bool(items), has_next and bool(items)
+    return KeysetPage(
+        items=items,
+        has_prev=has_prev,
+        has_next=has_next,
+        prev_cursor=cursor(items[0]) if has_prev else None,
+        next_cursor=cursor(items[-1]) if has_next else None,
+    )
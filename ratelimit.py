@@ -0,0 +1,157 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from sqlalchemy import case, literal
+
+
+class Limit(NamedTuple):
+    capacity: int   # rafale autorisée
+    period: float   # secondes pour remplir de nouveau un seau vide
+
+    @property
+    def rate(self):
+        return self.capacity / self.period
+
+
+class Decision(NamedTuple):
+    allowed: bool
+    retry_after: float = 0.0  # secondes avant le prochain jeton
+    tokens: float = None      # jetons restants dans le seau (None : limite non appliquée)
+
+
+def _retry_after(tokens, limit):
+    return max(0.0, (1 - tokens) / limit.rate)
+
+
+class MemoryBuckets:
+    """Seaux en mémoire, propres au processus (un seul worker, développement)"""
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()  # {clé: (jetons, horodatage)}
+        self._lock = threading.Lock()
+
+    def take(self, key, limit, now):
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (limit.capacity, now))
+            tokens = min(limit.capacity, tokens + (now - updated) * limit.rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            # Les seaux les plus anciens sont pleins depuis longtemps : les oublier
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        return Decision(allowed, 0.0 if allowed else _retry_after(tokens, limit), tokens)
+
+
+class DatabaseBuckets:
+    """Seaux dans une table, partagés par tous les workers.
+
+    Un jeton est pris par un seul upsert conditionnel (PostgreSQL et
+    SQLite) : le seau est rechargé puis décrémenté s'il contient au moins
+    un jeton ; aucune ligne retournée signifie que la requête est refusée.
+    Chaque appel s'exécute dans sa propre transaction, hors de celle de la
+    requête.
+    """
+
+    # Suppression des seaux pleins tous les N appels (par processus)
+    PRUNE_EVERY = 1000
+
+    def __init__(self, table, engine):
+        self.table = table
+        self.engine = engine
+        self._calls = 0
+
+    def _insert(self, dialect):
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            return None
+        return insert
+
+    def take(self, key, limit, now):
+        t = self.table
+        with self.engine().begin() as conn:
+            insert = self._insert(conn.dialect.name)
+            if insert is None:
+                return self._take_locked(conn, key, limit, now)
+            refilled = t.c.tokens + (literal(now) - t.c.updated_at) * limit.rate
+            refilled = case((refilled > limit.capacity, literal(float(limit.capacity))), else_=refilled)
+            stmt = insert(t).values(key=key, tokens=float(limit.capacity - 1), updated_at=now)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[t.c.key],
+                set_={'tokens': refilled - 1, 'updated_at': now},
+                where=refilled >= 1
+            ).returning(t.c.tokens)
+            row = conn.execute(stmt).first()
+            if row is not None:
+                allowed, retry_after, tokens = True, 0.0, row[0]
+            else:
+                tokens, updated = conn.execute(
+                    t.select().with_only_columns(t.c.tokens, t.c.updated_at).where(t.c.key == key)
+                ).one()
+                tokens = min(limit.capacity, tokens + (now - updated) * limit.rate)
+                allowed, retry_after = False, _retry_after(tokens, limit)
+            self._calls += 1
+            if self._calls % self.PRUNE_EVERY == 0:
+                self.prune(conn, now)
+        return Decision(allowed, retry_after, tokens)
+
+    def _take_locked(self, conn, key, limit, now):
+        """Autres bases : lecture verrouillée puis écriture"""
+        t = self.table
+        row = conn.execute(
+            t.select().with_only_columns(t.c.tokens, t.c.updated_at).where(t.c.key == key).with_for_update()
+        ).first()
+        tokens = limit.capacity if row is None else min(limit.capacity, row[0] + (now - row[1]) * limit.rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        if row is None:
+            conn.execute(t.insert().values(key=key, tokens=tokens, updated_at=now))
+        else:
+            conn.execute(t.update().where(t.c.key == key).values(tokens=tokens, updated_at=now))
+        return Decision(allowed, 0.0 if allowed else _retry_after(tokens, limit), tokens)
+
+    def prune(self, conn, now, max_period=24 * 3600):
+        """Supprime les seaux inutilisés depuis plus longtemps que max_period"""
+        conn.execute(self.table.delete().where(self.table.c.updated_at < now - max_period))
+
+
+class RateLimiter:
+    """Limitation de débit par seaux à jetons.
+
+    Chaque limite nommée ('login_ip', 'like'...) autorise une rafale de
+    `capacity` requêtes, rechargée progressivement en `period` secondes.
+    Une limite absente de la configuration n'est pas appliquée.
+    """
+
+    def __init__(self, store, limits, clock=time.time):
+        self.store = store
+        self.limits = {name: Limit(*value) for name, value in limits.items()}
+        self.clock = clock
+
+    def hit(self, name, key):
+        """Prend un jeton dans le seau (name, key) ; retourne une Decision"""
+        limit = self.limits.get(name)
+        if limit is None:
+            return Decision(True)
+        return self.store.take(f'{name}:{key}', limit, self.clock())
+
+    def used(self, name, decision):
+        """Requêtes récentes dans le seau d'une décision (celle-ci comprise),
+        ou None si la limite n'est pas appliquée"""
+        limit = self.limits.get(name)
+        if limit is None or decision.tokens is None:
+            return None
+        return math.ceil(limit.capacity - decision.tokens - 1e-9)
+
+    @staticmethod
+    def retry_after_header(decision):
+        return str(max(1, math.ceil(decision.retry_after)))
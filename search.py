@@ -0,0 +1,274 @@
+import re
+import unicodedata
+from types import SimpleNamespace
+from typing import NamedTuple
+
+from sqlalchemy import event, inspect, select, text
+
+# Codes stables des types de documents : ils servent à construire l'identifiant
+# unique de chaque document (ref_id * 8 + code) pour des mises à jour en O(log n)
+KIND_CODES = {'phrase': 1, 'letter': 2, 'memory': 3, 'photo': 4}
+
+_LIGATURES = str.maketrans({'œ': 'oe', 'Œ': 'oe', 'æ': 'ae', 'Æ': 'ae', 'ß': 'ss'})
+_WORD_RE = re.compile(r'\w+')
+
+MAX_QUERY_TERMS = 8
+
+
+def fold(value):
+    """Minuscules sans accents ni ligatures : « Été » -> « ete »"""
+    if not value:
+        return ''
+    value = unicodedata.normalize('NFKD', value.translate(_LIGATURES))
+    return ''.join(c for c in value if not unicodedata.combining(c)).lower()
+
+
+def terms(value):
+    """Découpe une requête utilisateur en termes normalisés"""
+    return _WORD_RE.findall(fold(value))[:MAX_QUERY_TERMS]
+
+
+class SearchHit(NamedTuple):
+    kind: str
+    ref_id: int
+    rank: float
+
+
+class SearchPage(NamedTuple):
+    hits: list
+    page: int
+    per_page: int
+    has_next: bool
+
+    @property
+    def has_prev(self):
+        return self.page > 1
+
+
+class _Document(NamedTuple):
+    kind: str
+    fields: tuple
+    extract: object
+
+
+class SearchIndex:
+    """Index plein texte unique pour messages, lettres, souvenirs et photos.
+
+    SQLite utilise une table virtuelle FTS5, PostgreSQL une colonne tsvector
+    avec un index GIN. Le texte est normalisé (accents, casse) côté Python
+    afin que les deux moteurs indexent exactement les mêmes termes.
+    """
+
+    FTS_TABLE = 'search_fts'
+    PG_TABLE = 'search_documents'
+
+    def __init__(self):
+        self._documents = {}
+
+    # --- Enregistrement des modèles ---
+
+    def register(self, model, kind, fields, extract):
+        """Déclare un modèle indexé.
+
+        `fields` liste les attributs dont la modification impose une
+        réindexation, `extract(obj)` retourne (titre, corps, audience) où
+        audience est None (visible par tous) ou la liste des utilisateurs
+        autorisés.
+        """
+        self._documents[model] = _Document(kind, tuple(fields), extract)
+
+    def attach(self, session):
+        """Maintient l'index dans la même transaction que chaque flush"""
+        event.listen(session, 'after_flush', self._after_flush)
+
+    def _after_flush(self, session, flush_context):
+        if not self._documents:
+            return
+        upserts, deletes = [], []
+        for obj in session.new:
+            doc = self._documents.get(type(obj))
+            if doc:
+                upserts.append((doc, obj))
+        for obj in session.dirty:
+            doc = self._documents.get(type(obj))
+            if doc and session.is_modified(obj):
+                state = inspect(obj)
+                if any(state.attrs[f].history.has_changes() for f in doc.fields):
+                    upserts.append((doc, obj))
+        for obj in session.deleted:
+            doc = self._documents.get(type(obj))
+            if doc:
+                deletes.append((doc.kind, obj.id))
+
+        if not upserts and not deletes:
+            return
+        conn = session.connection()
+        for kind, ref_id in deletes:
+            self.delete(conn, kind, ref_id)
+        if upserts:
+            self.upsert_many(conn, [
+                (doc.kind, obj.id) + tuple(doc.extract(obj)) for doc, obj in upserts
+            ])
+
+    # --- Schéma ---
+
+    @staticmethod
+    def _is_postgres(conn):
+        return conn.dialect.name == 'postgresql'
+
+    def table_name(self, conn):
+        return self.PG_TABLE if self._is_postgres(conn) else self.FTS_TABLE
+
+    def install(self, conn):
+        """Crée l'index s'il n'existe pas ; retourne True s'il vient d'être créé"""
+        if inspect(conn).has_table(self.table_name(conn)):
+            return False
+        if self._is_postgres(conn):
+            conn.execute(text(f"""
+                CREATE TABLE IF NOT EXISTS {self.PG_TABLE} (
+                    doc_id BIGINT PRIMARY KEY,
+                    kind VARCHAR(16) NOT NULL,
+                    ref_id INTEGER NOT NULL,
+                    audience TEXT,
+                    document TSVECTOR NOT NULL
+                )
+            """))
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_{self.PG_TABLE}_document "
+                f"ON {self.PG_TABLE} USING GIN (document)"
+            ))
+        else:
+            conn.execute(text(f"""
+                CREATE VIRTUAL TABLE IF NOT EXISTS {self.FTS_TABLE} USING fts5(
+                    kind UNINDEXED,
+                    ref_id UNINDEXED,
+                    audience UNINDEXED,
+                    title,
+                    body,
+                    tokenize = 'unicode61 remove_diacritics 2'
+                )
+            """))
+        return True
+
+    # --- Écriture ---
+
+    @staticmethod
+    def doc_id(kind, ref_id):
+        return ref_id * 8 + KIND_CODES[kind]
+
+    @staticmethod
+    def _audience(users):
+        # Format « |a|b| » pour un filtrage par sous-chaîne sans ambiguïté
+        return '|' + '|'.join(users) + '|' if users else None
+
+    def upsert_many(self, conn, rows):
+        """Indexe une série de (kind, ref_id, titre, corps, audience)"""
+        params = [{
+            'doc_id': self.doc_id(kind, ref_id),
+            'kind': kind,
+            'ref_id': ref_id,
+            'audience': self._audience(audience),
+            'title': fold(title),
+            'body': fold(body),
+        } for kind, ref_id, title, body, audience in rows]
+        if not params:
+            return
+
+        if self._is_postgres(conn):
+            conn.execute(text(f"""
+                INSERT INTO {self.PG_TABLE} (doc_id, kind, ref_id, audience, document)
+                VALUES (:doc_id, :kind, :ref_id, :audience,
+                        setweight(to_tsvector('simple', :title), 'A') ||
+                        setweight(to_tsvector('simple', :body), 'B'))
+                ON CONFLICT (doc_id) DO UPDATE
+                SET audience = EXCLUDED.audience, document = EXCLUDED.document
+            """), params)
+        else:
+            # FTS5 ne gère pas ON CONFLICT : suppression puis insertion par rowid
+            conn.execute(text(f"DELETE FROM {self.FTS_TABLE} WHERE rowid = :doc_id"), params)
+            conn.execute(text(f"""
+                INSERT INTO {self.FTS_TABLE} (rowid, kind, ref_id, audience, title, body)
+                VALUES (:doc_id, :kind, :ref_id, :audience, :title, :body)
+            """), params)
+
+    def index_rows(self, conn, model, rows):
+        """Indexe des lignes insérées hors ORM (dicts contenant l'id)"""
+        doc = self._documents.get(model)
+        if doc:
+            self.upsert_many(conn, [(doc.kind, row['id']) + tuple(doc.extract(SimpleNamespace(**row)))
+                                    for row in rows])
+
+    def delete(self, conn, kind, ref_id):
+        key = 'doc_id' if self._is_postgres(conn) else 'rowid'
+        conn.execute(
+            text(f"DELETE FROM {self.table_name(conn)} WHERE {key} = :doc_id"),
+            {'doc_id': self.doc_id(kind, ref_id)}
+        )
+
+    def drop(self, conn):
+        conn.execute(text(f"DROP TABLE IF EXISTS {self.table_name(conn)}"))
+
+    def rebuild(self, session, batch_size=500):
+        """Reconstruit tout l'index à partir des tables ; retourne le nombre de documents"""
+        conn = session.connection()
+        self.install(conn)
+        conn.execute(text(f"DELETE FROM {self.table_name(conn)}"))
+        total = 0
+        for model in self._documents:
+            # Lignes brutes plutôt qu'objets ORM : beaucoup plus rapide sur de gros volumes
+            rows = session.execute(select(model.__table__).execution_options(yield_per=batch_size))
+            for batch in rows.mappings().partitions():
+                self.index_rows(conn, model, batch)
+                total += len(batch)
+        return total
+
+    # --- Lecture ---
+
+    def search(self, conn, query, user, kinds=None, page=1, per_page=20):
+        """Recherche classée par pertinence, avec préfixes et pagination"""
+        words = terms(query)
+        page = max(page, 1)
+        if not words:
+            return SearchPage([], page, per_page, False)
+
+        params = {
+            'user': f'|{user}|',
+            'limit': per_page + 1,
+            'offset': (page - 1) * per_page,
+        }
+        kind_filter = ''
+        if kinds:
+            names = [k for k in kinds if k in KIND_CODES]
+            if not names:
+                # Aucun type connu : pas de liste IN () vide (refusée par PostgreSQL)
+                return SearchPage([], page, per_page, False)
+            kind_filter = 'AND kind IN (' + ', '.join(f':kind_{i}' for i in range(len(names))) + ')'
+            params.update({f'kind_{i}': name for i, name in enumerate(names)})
+
+        if self._is_postgres(conn):
+            params['query'] = ' & '.join(f'{w}:*' for w in words)
+            sql = f"""
+                SELECT kind, ref_id, ts_rank_cd(document, q) AS rank
+                FROM {self.PG_TABLE}, to_tsquery('simple', :query) AS q
+                WHERE document @@ q
+                  AND (audience IS NULL OR position(:user IN audience) > 0)
+                  {kind_filter}
+                ORDER BY rank DESC, doc_id DESC
+                LIMIT :limit OFFSET :offset
+            """
+        else:
+            params['query'] = ' '.join(f'"{w}"*' for w in words)
+            # bm25 : plus petit = plus pertinent ; le titre pèse davantage que le corps
+            sql = f"""
+                SELECT kind, ref_id, bm25({self.FTS_TABLE}, 0, 0, 0, 4.0, 1.0) AS rank
+                FROM {self.FTS_TABLE}
+                WHERE {self.FTS_TABLE} MATCH :query
+                  AND (audience IS NULL OR instr(audience, :user) > 0)
+                  {kind_filter}
+                ORDER BY rank, rowid DESC
+                LIMIT :limit OFFSET :offset
+            """
+
+        rows = conn.execute(text(sql), params).all()
+        hits = [SearchHit(kind, int(ref_id), float(rank)) for kind, ref_id, rank in rows[:per_page]]
+        return SearchPage(hits, page, per_page, len(rows) > per_page)
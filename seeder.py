@@ -0,0 +1,140 @@
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from importer import insert_with_ids
+
+WORDS = (
+    'je', 'tu', 't', 'aime', 'mon', 'ma', 'coeur', 'lune', 'belle', 'ce', 'soir', 'toujours',
+    'ensemble', 'sourire', 'douce', 'étoile', 'rêve', 'merci', 'pour', 'tout', 'amour', 'nuit',
+    'souvenir', 'demain', 'jamais', 'rire', 'voyage', 'mer', 'soleil', 'pluie', 'câlin', 'bisous',
+    'promesse', 'vie', 'chérie', 'trésor', 'musique', 'danse', 'café', 'matin', 'main', 'yeux',
+)
+TAGS = ('amour', 'nuit', 'souvenir', 'voyage', 'rire', 'promesse', 'musique', 'famille')
+COLORS = ('#ffdde1', '#e1f5fe', '#fff3e0', '#f3e5f5', '#e8f5e9')
+ACTIONS = ('login', 'message_added', 'photo_uploaded', 'letter_sent', 'memory_added', 'search', 'mood_checked')
+
+
+class Seeder:
+    """Générateur de données synthétiques réalistes (mêmes champs que les formulaires).
+
+    Chaque méthode produit `n` dictionnaires prêts pour un INSERT en masse,
+    datés régulièrement sur la période [start, end[. Le générateur est
+    déterministe pour une même graine.
+    """
+
+    def __init__(self, users, seed=None, start=None, end=None):
+        self.users = list(users)
+        self.rng = random.Random(seed)
+        self.end = end or datetime.utcnow()
+        self.start = start or self.end - timedelta(days=3 * 365)
+
+    def _text(self, low, high):
+        return ' '.join(self.rng.choice(WORDS) for _ in range(self.rng.randint(low, high)))
+
+    def _dates(self, n):
+        step = (self.end - self.start) / max(n, 1)
+        for i in range(n):
+            yield i, self.start + i * step
+
+    def phrases(self, n):
+        for i, date in self._dates(n):
+            yield {
+                'texte': self._text(5, 40).capitalize(),
+                'auteur': self.users[i % len(self.users)],
+                'date': date,
+                'couleur': self.rng.choice(COLORS),
+                'tags': ', '.join(self.rng.sample(TAGS, self.rng.randint(1, 3))) if self.rng.random() < 0.3 else None,
+                'est_favori': self.rng.random() < 0.1,
+                'likes': self.rng.randint(0, 20),
+                'is_special': self.rng.random() < 0.02,
+            }
+
+    def photos(self, n):
+        for i, date in self._dates(n):
+            public_id = f'seed/{i:08d}'
+            yield {
+                'filename': f'photo_{i}.jpg',
+                # URLs factices : aucune photo n'est réellement hébergée
+                'cloudinary_url': f'https://picsum.photos/seed/{i}/1200/800',
+                'cloudinary_public_id': public_id,
+                'legende': self._text(2, 12).capitalize(),
+                'auteur': self.users[i % len(self.users)],
+                'date': date,
+                'file_size': self.rng.randint(80_000, 4_000_000),
+                'likes': self.rng.randint(0, 30),
+                'status': 'ready',
+            }
+
+    def letters(self, n):
+        for i, date in self._dates(n):
+            sender = self.users[i % len(self.users)]
+            recipient = self.users[(i + 1) % len(self.users)]
+            yield {
+                'title': self._text(2, 6).capitalize(),
+                'content': '\n\n'.join(self._text(20, 60).capitalize() + '.' for _ in range(self.rng.randint(1, 4))),
+                'sender': sender,
+                'recipient': recipient,
+                'is_read': self.rng.random() < 0.9,
+                'created_at': date,
+            }
+
+    def memories(self, n):
+        for i, date in self._dates(n):
+            yield {
+                'title': self._text(2, 6).capitalize(),
+                'description': self._text(15, 80).capitalize(),
+                'date_memory': date.date(),
+                'author': self.users[i % len(self.users)],
+                'is_anniversary': self.rng.random() < 0.05,
+                'created_at': date,
+            }
+
+    def events(self, n):
+        for i, date in self._dates(n):
+            yield {
+                'title': self._text(2, 5).capitalize(),
+                'event_date': date.date(),
+                'event_type': self.rng.choice(('special', 'anniversary', 'memory')),
+                'description': self._text(0, 20) or None,
+                'created_by': self.users[i % len(self.users)],
+                'created_at': date,
+            }
+
+    def activities(self, n):
+        for i, date in self._dates(n):
+            yield {
+                'user': self.users[i % len(self.users)],
+                'action': self.rng.choice(ACTIONS),
+                'details': self._text(0, 8) or None,
+                'date': date,
+            }
+
+
+def bulk_insert(conn, table, rows, batch_size=5000, after_insert=None):
+    """INSERT multi-lignes par lots ; retourne le nombre de lignes insérées.
+
+    Si `after_insert(conn, rows)` est fourni, il reçoit chaque lot avec les
+    identifiants attribués (voir insert_with_ids).
+    """
+    total = 0
+    batch = []
+
+    def flush():
+        if after_insert is None:
+            conn.execute(insert(table), batch)
+            return
+        insert_with_ids(conn, table, batch)
+        after_insert(conn, batch)
+
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            flush()
+            total += len(batch)
+            batch = []
+    if batch:
+        flush()
+        total += len(batch)
+    return total
@@ -0,0 +1,606 @@
+"""Services partagés par les blueprints : journal d'activité, likes, envoi et
+suppression des photos, cache des utilisateurs, versets...
+
+Ils dépendent de la configuration : `init_app()` les crée une fois par
+application, depuis create_app. Les threads de fond s'exécutent hors requête
+et ouvrent leur propre contexte sur l'application enregistrée ici.
+"""
+import atexit
+import json
+import os
+import random
+import secrets
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app, request, session
+from itsdangerous import BadSignature, URLSafeSerializer
+from sqlalchemy import text
+
+from activity_log import ActivityLog
+from conditional import PageValidator, release_token
+from export import ExportSource, Exporter
+from importer import Field, Importer, ImportTarget, parse_bool, parse_date, parse_datetime, parse_int, read_csv, read_ndjson
+from likes import LikeBuffer
+from metrics import Metrics
+from ratelimit import DatabaseBuckets, MemoryBuckets, RateLimiter
+from models import (Activity, CalendarEvent, Challenge, Letter, Memory, Phrase, Photo, PhotoDeletion, PhotoUpload,
+                    RateLimitBucket,
+                    SEARCH_MODELS, User, counters, db, link_phrase_tags, search_index)
+from pagination import keyset_paginate
+from uploads import CloudinaryUploader, LocalUploader, OutboxWorker, UploadPipeline
+from users import CachedUser, UserCache
+from verses import VerseStore
+from warmup import Warmup
+
+# Date de déverrouillage (27 septembre 2025)
+UNLOCK_DATE = datetime(2025, 9, 26, 23, 00, 59)
+
+# Extensions de fichiers autorisées
+ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
+
+# Créés par init_app()
+_app = None
+metrics = None
+release = None
+activity_log = None
+like_buffer = None
+photo_pipeline = None
+upload_worker = None
+deletion_worker = None
+user_cache = None
+verse_store = None
+calendar_tokens = None
+rate_limiter = None
+
+
+def init_app(app):
+    """Crée les services de l'application ; les mesures en premier, pour que
+    leur before_request passe avant tous les autres"""
+    global _app, metrics, activity_log, like_buffer, photo_pipeline, upload_worker, deletion_worker
+    global user_cache, verse_store, calendar_tokens, release, rate_limiter
+    _app = app
+    release = release_token(app)
+
+    # Mesures de chaque requête (Server-Timing et /metrics)
+    metrics = Metrics(server_timing=app.config['SERVER_TIMING'])
+    metrics.attach(app)
+
+    # Journal d'activité à écriture différée, vidé à l'arrêt du worker
+    activity_log = ActivityLog(
+        write_activities,
+        max_queue=app.config['ACTIVITY_QUEUE_SIZE'],
+        flush_rows=app.config['ACTIVITY_FLUSH_ROWS'],
+        flush_interval_ms=app.config['ACTIVITY_FLUSH_INTERVAL_MS']
+    )
+    atexit.register(activity_log.close)
+
+    # Regroupement optionnel des likes en rafale (désactivé si LIKES_COALESCE_MS = 0)
+    like_buffer = None
+    if app.config['LIKES_COALESCE_MS']:
+        like_buffer = LikeBuffer(apply_buffered_likes, interval_ms=app.config['LIKES_COALESCE_MS'])
+        atexit.register(like_buffer.close)
+
+    # Envoi des photos en arrière-plan, depuis une outbox qui survit aux redémarrages
+    photo_pipeline = UploadPipeline(
+        make_uploader(app.config),
+        os.path.join(app.config['UPLOAD_FOLDER'], 'staging'),
+        workers=app.config['UPLOAD_WORKERS']
+    )
+    atexit.register(photo_pipeline.shutdown)
+    upload_worker = OutboxWorker(
+        process_photo_uploads,
+        interval=app.config['PHOTO_UPLOAD_INTERVAL'],
+        name='photo-uploads'
+    )
+    atexit.register(upload_worker.close)
+
+    # Suppressions chez l'hébergeur, traitées par lots hors des requêtes
+    deletion_worker = OutboxWorker(
+        process_photo_deletions,
+        interval=app.config['PHOTO_DELETE_INTERVAL'],
+        name='photo-deletions'
+    )
+    atexit.register(deletion_worker.close)
+
+    user_cache = UserCache(load_user, ttl=app.config['USER_CACHE_TTL'])
+
+    # Versets de l'humeur du jour, chargés une seule fois par processus
+    verse_store = VerseStore(
+        os.path.join(app.root_path, 'mood_verses.json'),
+        check_interval=app.config.get('MOOD_VERSES_RELOAD_INTERVAL', 30)
+    )
+
+    # Jetons des abonnements au flux .ics (les clients de calendrier n'ont pas de session),
+    # valables tant que la clé de l'utilisateur ne change pas (voir calendar_feed_token)
+    calendar_tokens = URLSafeSerializer(app.config['SECRET_KEY'], salt='calendar-feed')
+
+    # Limitation de débit de la connexion, des likes et de la porte mystérieuse
+    if app.config['RATE_LIMIT_STORAGE'] == 'database':
+        buckets = DatabaseBuckets(RateLimitBucket.__table__, lambda: db.engine)
+    else:
+        buckets = MemoryBuckets()
+    rate_limiter = RateLimiter(buckets, app.config['RATE_LIMITS'])
+
+def allowed_file(filename):
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+def take_tokens(*buckets):
+    """Prend un jeton dans chaque seau (nom de la limite, clé) ; retourne
+    (None si la requête est autorisée, sinon la valeur de l'en-tête
+    Retry-After, décisions dans l'ordre des seaux)"""
+    decisions = [rate_limiter.hit(name, key) for name, key in buckets]
+    refused = [decision for decision in decisions if not decision.allowed]
+    if not refused:
+        return None, decisions
+    return RateLimiter.retry_after_header(max(refused, key=lambda decision: decision.retry_after)), decisions
+
+def limit_exceeded(*buckets):
+    """Comme take_tokens, sans les décisions"""
+    return take_tokens(*buckets)[0]
+
+def is_site_unlocked():
+    """Vérifie si le site est déverrouillé (après le 27 septembre 2025)"""
+    return datetime.now() >= UNLOCK_DATE
+
+def load_user(username):
+    """Utilisateur et nom de son partenaire, en une seule requête"""
+    partner = db.aliased(User)
+    row = db.session.query(User, partner.username).outerjoin(
+        partner, User.partner_id == partner.id
+    ).filter(User.username == username).first()
+    if row is None:
+        return None
+    user, partner_name = row
+    return CachedUser(user.id, user.username, user.favorite_color, user.visit_count or 0,
+                      user.last_login, user.created_at, partner_name, user.calendar_key)
+
+def calendar_feed_token(user):
+    """Jeton du lien d'abonnement au calendrier : signé, et lié à la clé de
+    l'utilisateur, dont le changement révoque tous les liens déjà donnés"""
+    return calendar_tokens.dumps([user.username, user.calendar_key])
+
+def calendar_feed_user(token):
+    """Nom de l'utilisateur d'un jeton d'abonnement encore valide, sinon None"""
+    try:
+        payload = calendar_tokens.loads(token)
+    except BadSignature:
+        return None
+    if not (isinstance(payload, list) and len(payload) == 2 and all(isinstance(v, str) for v in payload)):
+        return None
+    username, key = payload
+    current = db.session.query(User.calendar_key).filter_by(username=username).scalar()
+    if current is None or not secrets.compare_digest(current, key):
+        return None
+    return username
+
+def write_activities(rows):
+    """Insère un lot d'activités en une seule requête et un seul commit"""
+    with _app.app_context():
+        with db.engine.begin() as conn:
+            conn.execute(Activity.__table__.insert(), rows)
+
+def log_activity(user, action, details=None):
+    """Enregistre une activité utilisateur"""
+    if current_app.config['ACTIVITY_LOG_ASYNC']:
+        activity_log.record(user, action, details)
+        return
+
+    # Mode synchrone (tests) : une ligne et un commit par activité
+    activity = Activity(
+        user=user,
+        action=action,
+        details=details
+    )
+    db.session.add(activity)
+    db.session.commit()
+
+def increment_likes(model, row_id, amount=1):
+    """UPDATE ... SET likes = likes + n RETURNING likes, sans perte de mise à jour"""
+    table = model.__table__
+    likes = db.session.execute(
+        db.update(table)
+        .where(table.c.id == row_id)
+        .values(likes=db.func.coalesce(table.c.likes, 0) + amount)
+        .returning(table.c.likes)
+    ).scalar()
+    if likes is not None:
+        counters.touch(db.session.connection(), model)
+    db.session.commit()
+    return likes
+
+def apply_buffered_likes(key, amount):
+    """Écriture d'un lot de likes depuis le thread de regroupement"""
+    model, row_id = key
+    with _app.app_context():
+        return increment_likes(model, row_id, amount)
+
+def add_like(model, row_id):
+    """Ajoute un like et retourne le compteur à afficher (None si la ligne n'existe pas)"""
+    if like_buffer is not None:
+        return like_buffer.add((model, row_id))
+    return increment_likes(model, row_id)
+
+def make_uploader(config):
+    """Hébergeur des photos selon PHOTO_UPLOADER (cloudinary ou local)"""
+    widths = config['PHOTO_VARIANT_WIDTHS']
+    if config['PHOTO_UPLOADER'] == 'local':
+        return LocalUploader(
+            os.path.join(config['UPLOAD_FOLDER'], 'photos'),
+            '/static/uploads/photos',
+            latency=config['LOCAL_UPLOAD_LATENCY_MS'] / 1000.0,
+            widths=widths
+        )
+    # Le SDK n'est importé et configuré qu'au premier appel
+    credentials = {
+        'cloud_name': config['CLOUDINARY_CLOUD_NAME'],
+        'api_key': config['CLOUDINARY_API_KEY'],
+        'api_secret': config['CLOUDINARY_API_SECRET'],
+    }
+    return CloudinaryUploader(folder='love_site', widths=widths, timer=metrics.timed, credentials=credentials)
+
+def finish_photo_upload(photo_id, result):
+    """Photo envoyée : enregistrer son URL et la rendre visible ; retourne
+    False si elle a été supprimée pendant l'envoi (copie à supprimer)"""
+    photo = db.session.get(Photo, photo_id)
+    if photo is None:
+        # Supprimée pendant l'envoi : ne pas laisser la copie orpheline
+        db.session.add(PhotoDeletion(public_id=result.public_id))
+        return False
+    photo.cloudinary_url = result.url
+    photo.cloudinary_public_id = result.public_id
+    photo.file_size = result.bytes or photo.file_size
+    photo.variants = json.dumps(result.variants) if result.variants else None
+    photo.status = 'ready'
+    return True
+
+def fail_photo_upload(photo_id):
+    photo = db.session.get(Photo, photo_id)
+    if photo is not None:
+        photo.status = 'failed'
+
+def claim_photo_uploads(now, limit, lease):
+    """Réserve jusqu'à `limit` envois arrivés à échéance en repoussant leur
+    échéance de `lease` secondes ; retourne les entrées réservées.
+
+    La réservation est un UPDATE conditionnel sur l'ancienne échéance : un
+    seul worker gagne chaque entrée, et celle d'un worker arrêté en cours
+    d'envoi redevient disponible à la fin du bail.
+    """
+    due = db.session.query(PhotoUpload.id, PhotoUpload.next_attempt_at).filter(
+        PhotoUpload.next_attempt_at <= now
+    ).order_by(PhotoUpload.next_attempt_at).limit(limit).all()
+    claimed = []
+    for entry_id, next_attempt_at in due:
+        updated = db.session.execute(
+            db.update(PhotoUpload)
+            .where(PhotoUpload.id == entry_id, PhotoUpload.next_attempt_at == next_attempt_at)
+            .values(next_attempt_at=now + timedelta(seconds=lease))
+        ).rowcount
+        if updated:
+            claimed.append(entry_id)
+    db.session.commit()
+    return PhotoUpload.query.filter(PhotoUpload.id.in_(claimed)).all() if claimed else []
+
+def process_photo_uploads():
+    """Envoie chez l'hébergeur un lot de photos de l'outbox ; retourne sa taille.
+
+    Après le dernier échec, la photo passe en `failed` et son fichier déposé
+    est supprimé (il faudra la renvoyer depuis la galerie).
+    """
+    config = _app.config
+    with _app.app_context():
+        now = datetime.utcnow()
+        entries = claim_photo_uploads(now, config['UPLOAD_WORKERS'], config['UPLOAD_LEASE'])
+        if not entries:
+            return 0
+
+        # Photo supprimée ou fichier perdu entre-temps : rien à envoyer
+        pending = {photo_id for (photo_id,) in db.session.query(Photo.id).filter(
+            Photo.id.in_([entry.photo_id for entry in entries]), Photo.status == 'pending'
+        )}
+        jobs, done = [], []
+        for entry in entries:
+            if entry.photo_id not in pending:
+                done.append(entry)
+            elif not os.path.exists(photo_pipeline.staging_path(entry.photo_id, entry.filename)):
+                fail_photo_upload(entry.photo_id)
+                done.append(entry)
+            else:
+                jobs.append(entry)
+        # L'envoi se fait hors transaction (appels réseau parfois longs)
+        db.session.commit()
+        results = photo_pipeline.send_all([(entry.photo_id, entry.filename) for entry in jobs])
+
+        orphans = False
+        for entry, (result, error) in zip(jobs, results):
+            if error is None:
+                orphans |= not finish_photo_upload(entry.photo_id, result)
+            else:
+                entry.attempts = (entry.attempts or 0) + 1
+                entry.last_error = str(error)
+                if entry.attempts < config['UPLOAD_MAX_ATTEMPTS']:
+                    # Nouvelle tentative plus tard, avec un délai qui double à chaque échec
+                    delay = config['UPLOAD_RETRY_BACKOFF'] * 2 ** (entry.attempts - 1)
+                    entry.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+                    continue
+                fail_photo_upload(entry.photo_id)
+            done.append(entry)
+        for entry in done:
+            photo_pipeline.discard(entry.photo_id, entry.filename)
+            db.session.delete(entry)
+        db.session.commit()
+        if orphans:
+            deletion_worker.notify()
+        return len(entries)
+
+def process_photo_deletions():
+    """Supprime chez l'hébergeur un lot de photos de l'outbox ; retourne sa taille"""
+    config = _app.config
+    with _app.app_context():
+        now = datetime.utcnow()
+        entries = PhotoDeletion.query.filter(PhotoDeletion.next_attempt_at <= now).order_by(
+            PhotoDeletion.next_attempt_at
+        ).limit(config['PHOTO_DELETE_BATCH_SIZE']).with_for_update(skip_locked=True).all()
+        if not entries:
+            db.session.rollback()
+            return 0
+
+        # Un seul appel groupé pour tout le lot
+        error = None
+        try:
+            done = photo_pipeline.uploader.delete([entry.public_id for entry in entries])
+        except Exception as e:
+            done, error = set(), str(e)
+
+        for entry in entries:
+            if entry.public_id in done:
+                db.session.delete(entry)
+                continue
+            # Nouvelle tentative plus tard, avec un délai qui double à chaque échec
+            entry.attempts = (entry.attempts or 0) + 1
+            delay = min(config['PHOTO_DELETE_RETRY_BACKOFF'] * 2 ** (entry.attempts - 1),
+                        config['PHOTO_DELETE_MAX_BACKOFF'])
+            entry.next_attempt_at = now + timedelta(seconds=delay)
+            entry.last_error = error or 'non supprimée par l\'hébergeur'
+        db.session.commit()
+
+        if error:
+            print(f"Erreur lors de la suppression groupée de {len(entries)} photos: {error}")
+        return len(entries)
+
+def delete_photos(photos):
+    """Supprime des photos de la base et inscrit leurs copies hébergées dans l'outbox"""
+    for photo in photos:
+        if photo.cloudinary_public_id:
+            db.session.add(PhotoDeletion(public_id=photo.cloudinary_public_id))
+        db.session.delete(photo)
+
+def load_search_results(hits):
+    """Charge les objets correspondant aux résultats, dans l'ordre de pertinence"""
+    ids_by_kind = {}
+    for hit in hits:
+        ids_by_kind.setdefault(hit.kind, []).append(hit.ref_id)
+
+    objects = {}
+    for kind, ids in ids_by_kind.items():
+        model = SEARCH_MODELS[kind]
+        for obj in model.query.filter(model.id.in_(ids)):
+            objects[(kind, obj.id)] = obj
+
+    return [(hit.kind, objects[(hit.kind, hit.ref_id)])
+            for hit in hits if (hit.kind, hit.ref_id) in objects]
+
+def paginate_feed(model, per_page):
+    """Pagination du plus récent au plus ancien.
+
+    Par défaut, pagination par curseur (date, id) via ?after= / ?before= ;
+    ?page=N reste possible (COUNT + OFFSET) pour les anciens liens.
+    Retourne (éléments, objet de pagination pour le template).
+    """
+    page = request.args.get('page', type=int)
+    if page is not None:
+        pagination = model.query.order_by(model.date.desc(), model.id.desc()).paginate(
+            page=page, per_page=per_page, error_out=False
+        )
+        return pagination.items, pagination
+
+    pagination = keyset_paginate(
+        model.query, model.date, model.id, per_page,
+        after=request.args.get('after'), before=request.args.get('before')
+    )
+    return pagination.items, pagination
+
+def page_validator(versions, *extra):
+    """Validateur d'une page : les versions des tables qu'elle affiche et
+    celle des utilisateurs (visites, couleur, partenaire du visiteur), lues
+    en une requête, plus ce qui dépend d'autre chose (extra).
+
+    Les extra n'ont pas de date : avec eux, la page n'a pas de Last-Modified
+    et seul l'ETag permet un 304. Inactif tant que des messages flash
+    attendent d'être affichés : la page qui les montre ne doit jamais
+    resservir depuis le cache du navigateur.
+    """
+    if not current_app.config['CONDITIONAL_GET'] or session.get('_flashes'):
+        return PageValidator()
+    versions = (*versions, 'users')
+    values = counters.versions(db.session.connection(), versions)
+    parts = [release, request.endpoint, session.get('user'), bool(session.get('special_access'))]
+    parts += [values[name][0] for name in versions]
+    timestamps = () if extra else [values[name][1] for name in versions]
+    return PageValidator.build(parts + list(extra), timestamps)
+
+def counts_by_author(values, prefix):
+    """Extrait des compteurs « prefix:auteur » la liste triée par nombre décroissant"""
+    stats = [{'auteur': name[len(prefix):], 'count': count}
+             for name, count in values.items() if name.startswith(prefix) and count > 0]
+    return sorted(stats, key=lambda stat: stat['count'], reverse=True)
+
+def get_love_quotes():
+    """Retourne une liste de citations d'amour"""
+    quotes = [
+        "N'oublie pas que je pense à toi ",
+        "Prend soin de toi et de ton bonheur avant les autres",
+        "Appelle-moi quand tu veux, je suis là pour toi même si on se dispute ou on ne se voit pas",
+        "La lune est belle ce soir.",
+        "Tu es l'une des meilleurs choses qui me soit arrivée.",
+        "Mange bien et fait des activités que tu aimes avec des gens que tu aimes ou seule si tu préfères",
+        "Tu es belle à l'intérieur comme à l'extérieur",
+    ]
+    return random.choice(quotes)
+
+# Tables exportées, avec les colonnes de date qui servent au paramètre since
+exporter = Exporter([
+    ExportSource('phrase', Phrase.__table__, (Phrase.date,)),
+    ExportSource('letter', Letter.__table__, (Letter.created_at,)),
+    ExportSource('memory', Memory.__table__, (Memory.created_at,)),
+    ExportSource('calendar_event', CalendarEvent.__table__, (CalendarEvent.created_at,)),
+    ExportSource('challenge', Challenge.__table__, (Challenge.created_at, Challenge.completed_date)),
+    ExportSource('activity', Activity.__table__, (Activity.date,)),
+    ExportSource('photo', Photo.__table__, (Photo.date,)),
+])
+
+def after_bulk_insert(model):
+    """Ce que les événements de session maintiennent, pour des lignes
+    insérées en masse hors ORM (import, génération de données)"""
+    def maintain(conn, rows):
+        counters.add_rows(conn, model, rows)
+        search_index.index_rows(conn, model, rows)
+        if model is Phrase:
+            link_phrase_tags(conn, rows)
+        elif model is CalendarEvent:
+            counters.bump(conn, 'calendar')
+    return maintain
+
+# Types importables en masse, avec leur clé naturelle (même format que l'export)
+IMPORT_TARGETS = [
+    ImportTarget('phrase', Phrase.__table__, (
+        Field('texte', required=True),
+        Field('auteur', required=True, max_length=80),
+        Field('date', parse_datetime, required=True),
+        Field('couleur', max_length=7, default='#ffdde1'),
+        Field('tags', max_length=200),
+        Field('est_favori', parse_bool, default=False),
+        Field('likes', parse_int, default=0),
+        Field('is_special', parse_bool, default=False),
+    ), key=('date', 'auteur', 'texte'), after_insert=after_bulk_insert(Phrase)),
+    ImportTarget('memory', Memory.__table__, (
+        Field('title', required=True, max_length=200),
+        Field('description', required=True),
+        Field('date_memory', parse_date, required=True),
+        Field('author', required=True, max_length=80),
+        Field('is_anniversary', parse_bool, default=False),
+        Field('created_at', parse_datetime, default=datetime.utcnow),
+    ), key=('date_memory', 'title', 'author'), after_insert=after_bulk_insert(Memory)),
+    ImportTarget('calendar_event', CalendarEvent.__table__, (
+        Field('title', required=True, max_length=200),
+        Field('event_date', parse_date, required=True),
+        Field('event_type', max_length=50, default='special'),
+        Field('description'),
+        Field('created_by', required=True, max_length=80),
+        Field('created_at', parse_datetime, default=datetime.utcnow),
+    ), key=('event_date', 'title', 'created_by'), after_insert=after_bulk_insert(CalendarEvent)),
+]
+
+def run_import(stream, fmt='ndjson', kind=None, on_progress=None):
+    """Importe un flux texte NDJSON ou CSV ; retourne un ImportReport"""
+    records = read_csv(stream, kind) if fmt == 'csv' else read_ndjson(stream)
+    importer = Importer(db.session, IMPORT_TARGETS,
+                        batch_size=current_app.config['IMPORT_BATCH_SIZE'], on_progress=on_progress)
+    return importer.run(records)
+
+def fetch_photo(record, chunk_size=64 * 1024):
+    """Octets d'une photo exportée, lus chez l'hébergeur ou sur le disque local"""
+    url = record.get('cloudinary_url') or ''
+    if url.startswith('/static/'):
+        root_path = current_app.root_path
+        static_root = os.path.join(root_path, 'static')
+        path = os.path.normpath(os.path.join(root_path, url.lstrip('/')))
+        if not path.startswith(static_root + os.sep):
+            raise ValueError(f'Chemin invalide : {url}')
+        with open(path, 'rb') as f:
+            while chunk := f.read(chunk_size):
+                yield chunk
+    elif url.startswith('http'):
+        import requests
+
+        with metrics.timed('cloudinary'), requests.get(url, stream=True, timeout=30) as response:
+            response.raise_for_status()
+            yield from response.iter_content(chunk_size)
+    else:
+        raise ValueError(f'Photo sans fichier (statut {record.get("status")})')
+
+def parse_since(value):
+    """Paramètre since : date ou date-heure ISO 8601 (UTC), ou None"""
+    if not value:
+        return None
+    since = datetime.fromisoformat(value)
+    return since.astimezone(timezone.utc).replace(tzinfo=None) if since.tzinfo else since
+
+# Préchauffage d'un worker : ce que sa première requête paierait sinon
+warmup = Warmup()
+
+@warmup.step('db')
+def warm_db_pool():
+    """Ouvre d'avance les connexions du pool"""
+    count = current_app.config['WARMUP_DB_CONNECTIONS']
+    if count is None:
+        count = db.engine.pool.size() if hasattr(db.engine.pool, 'size') else 1
+    connections = [db.engine.connect() for _ in range(count)]
+    for conn in connections:
+        conn.execute(text('SELECT 1'))
+    for conn in connections:
+        conn.close()
+    return f'{count} connexion(s)'
+
+@warmup.step('templates')
+def warm_templates():
+    """Compile tous les templates (gardés en cache par Jinja)"""
+    env = current_app.jinja_env
+    names = env.list_templates(extensions=['html'])
+    for name in names:
+        env.get_template(name)
+    return f'{len(names)} templates'
+
+@warmup.step('verses')
+def warm_verses():
+    """Charge les versets de l'humeur du jour (les citations sont en dur)"""
+    verses = verse_store.verses()
+    return f'{sum(len(items) for items in verses.values())} versets'
+
+@warmup.step('users')
+def warm_users():
+    """Remplit le cache des utilisateurs"""
+    usernames = [username for (username,) in db.session.query(User.username)]
+    for username in usernames:
+        user_cache.get(username)
+    db.session.rollback()
+    return f'{len(usernames)} utilisateurs'
+
+@warmup.step('calendar')
+def warm_calendar():
+    """Grille du mois en cours, la page la plus consultée du calendrier"""
+    from blueprints.love_calendar import month_grids
+
+    today = datetime.now()
+    month_grids.get(today.year, today.month, counters.version(db.session.connection(), 'calendar'))
+    db.session.rollback()
+    return f'{today.month:02d}/{today.year}'
+
+@warmup.step('outbox')
+def warm_outbox():
+    """Reprend les envois et suppressions de photos laissés par un worker arrêté"""
+    upload_worker.notify()
+    deletion_worker.notify()
+    return 'photo-uploads, photo-deletions'
+
+@warmup.step('uploader')
+def warm_uploader():
+    """Client de l'hébergeur des photos (import et configuration du SDK)"""
+    photo_pipeline.uploader.warmup()
+    return type(photo_pipeline.uploader).__name__
+
+def warm_up(app, log=None):
+    """Préchauffe le worker ; retourne la durée de chaque étape"""
+    results = warmup.run(app, log)
+    metrics.record_warmup(results)
+    return results
@@ -0,0 +1,217 @@
+import secrets
+import threading
+from datetime import datetime
+
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+from itsdangerous import BadSignature, Signer
+
+serializer = TaggedJSONSerializer()
+
+
+class Session(SessionMixin):
+    """Session dont les données sont chargées depuis le stockage au premier
+    accès seulement : les requêtes qui n'y touchent pas (fichiers statiques,
+    /health, /metrics) ne coûtent rien."""
+
+    def __init__(self, sid=None, load=None):
+        self.sid = sid
+        self.new = sid is None
+        self.modified = False
+        self.accessed = False
+        self.previous_sid = None
+        self.expires_at = None
+        self._load = load
+        self._data = None if load else {}
+
+    @property
+    def data(self):
+        self.accessed = True
+        if self._data is None:
+            record = self._load(self.sid)
+            if record is None:
+                # Identifiant inconnu ou expiré : repartir d'une session vide
+                self.sid, self.new, self._data = None, True, {}
+            else:
+                self._data, self.expires_at = record
+        return self._data
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __setitem__(self, key, value):
+        self.data[key] = value
+        self.modified = True
+
+    def __delitem__(self, key):
+        del self.data[key]
+        self.modified = True
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def rotate(self):
+        """Nouvel identifiant (après une connexion), l'ancien est supprimé"""
+        self.data  # charger les données avant de changer d'identifiant
+        if self.sid is not None:
+            self.previous_sid = self.sid
+        self.sid, self.new, self.modified = None, True, True
+
+
+class MemorySessionStore:
+    """Sessions en mémoire, propres au processus (un seul worker, développement)"""
+
+    def __init__(self):
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def load(self, sid, now):
+        with self._lock:
+            record = self._sessions.get(sid)
+        if record is None or record[1] <= now:
+            return None
+        return serializer.loads(record[0]), record[1]
+
+    def save(self, sid, data, expires_at):
+        with self._lock:
+            self._sessions[sid] = (serializer.dumps(data), expires_at)
+
+    def delete(self, sid):
+        with self._lock:
+            self._sessions.pop(sid, None)
+
+    def prune(self, now):
+        with self._lock:
+            for sid in [sid for sid, (_, expires) in self._sessions.items() if expires <= now]:
+                del self._sessions[sid]
+
+
+class DatabaseSessionStore:
+    """Sessions dans une table, partagées par les workers.
+
+    Lectures et écritures passent par leur propre connexion, hors de la
+    transaction de la requête.
+    """
+
+    def __init__(self, table, engine):
+        self.table = table
+        self.engine = engine
+
+    def load(self, sid, now):
+        t = self.table
+        with self.engine().connect() as conn:
+            row = conn.execute(
+                t.select().with_only_columns(t.c.data, t.c.expires_at)
+                .where(t.c.id == sid, t.c.expires_at > now)
+            ).first()
+        if row is None:
+            return None
+        return serializer.loads(row[0]), row[1]
+
+    def save(self, sid, data, expires_at):
+        t = self.table
+        values = {'data': serializer.dumps(data), 'expires_at': expires_at}
+        with self.engine().begin() as conn:
+            if not conn.execute(t.update().where(t.c.id == sid).values(**values)).rowcount:
+                conn.execute(t.insert().values(id=sid, **values))
+
+    def delete(self, sid):
+        with self.engine().begin() as conn:
+            conn.execute(self.table.delete().where(self.table.c.id == sid))
+
+    def prune(self, now):
+        with self.engine().begin() as conn:
+            conn.execute(self.table.delete().where(self.table.c.expires_at <= now))
+
+
+class ServerSessionInterface(SessionInterface):
+    """Sessions côté serveur : le cookie ne contient qu'un identifiant
+    aléatoire signé, les données restent dans `store`.
+
+    Une session non modifiée n'est réécrite (pour repousser son expiration)
+    qu'une fois passée la moitié de sa durée de vie. Les sessions expirées
+    sont supprimées toutes les PRUNE_EVERY nouvelles sessions.
+    """
+
+    PRUNE_EVERY = 100
+
+    def __init__(self, store):
+        self.store = store
+        self._created = 0
+
+    def _signer(self, app):
+        return Signer(app.secret_key, salt='server-session')
+
+    def open_session(self, app, request):
+        if not app.secret_key:
+            return None
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        if not cookie:
+            return Session()
+        try:
+            sid = self._signer(app).unsign(cookie).decode('ascii')
+        except BadSignature:
+            return Session()
+        return Session(sid, load=lambda sid: self.store.load(sid, datetime.utcnow()))
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if session.accessed:
+            response.vary.add('Cookie')
+        if session.previous_sid:
+            self.store.delete(session.previous_sid)
+
+        # Session vidée : supprimer les données et le cookie
+        if session.accessed and not session and not session.new:
+            self.store.delete(session.sid)
+            response.delete_cookie(name, domain=domain, path=path,
+                                   secure=self.get_cookie_secure(app),
+                                   samesite=self.get_cookie_samesite(app),
+                                   httponly=self.get_cookie_httponly(app))
+            return
+        if not session.accessed or not session:
+            return
+
+        now = datetime.utcnow()
+        lifetime = app.permanent_session_lifetime
+        refresh = (session.expires_at is not None and app.config['SESSION_REFRESH_EACH_REQUEST']
+                   and session.expires_at - now < lifetime / 2)
+        if not (session.modified or refresh):
+            return
+
+        if session.sid is None:
+            session.sid = secrets.token_urlsafe(32)
+            self._created += 1
+            if self._created % self.PRUNE_EVERY == 0:
+                self.store.prune(now)
+        self.store.save(session.sid, dict(session), now + lifetime)
+
+        response.set_cookie(
+            name,
+            self._signer(app).sign(session.sid.encode('ascii')).decode('ascii'),
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+
+
+def init_app(app):
+    """Remplace la session signée dans un cookie par une session côté serveur"""
+    storage = app.config['SESSION_STORAGE']
+    if storage == 'cookie':
+        return
+    if storage == 'memory':
+        store = MemorySessionStore()
+    else:
+        from models import ServerSession, db
+        store = DatabaseSessionStore(ServerSession.__table__, lambda: db.engine)
+    app.session_interface = ServerSessionInterface(store)
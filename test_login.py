@@ -1,4 +1,7 @@
-from app import app, User
+from app import create_app
+from models import User
+
+app = create_app()
 from werkzeug.security import check_password_hash
 
 with app.app_context():
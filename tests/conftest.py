@@ -0,0 +1,36 @@
+import os
+import sys
+
+import pytest
+
+# Les modules de l'application sont à la racine du dépôt
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture
+def app(tmp_path):
+    """Application de test sur une base SQLite temporaire, comptes créés"""
+    from app import create_app
+    from config import TestingConfig
+    from database import init_db
+
+    class Config(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'database.db'}"
+        UPLOAD_FOLDER = str(tmp_path / 'uploads')
+        PHOTO_UPLOADER = 'local'
+        JINJA_BYTECODE_CACHE_DIR = None
+        SESSION_STORAGE = 'memory'
+
+    app = create_app(Config)
+    with app.app_context():
+        init_db()
+    return app
+
+
+@pytest.fixture
+def client(app):
+    """Client connecté (site déverrouillé pour lui)"""
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user'] = 'panda bg'
+        session['special_access'] = True
+    return client
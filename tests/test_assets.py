@@ -0,0 +1,32 @@
+from werkzeug.test import Client
+from werkzeug.wrappers import Response
+
+from assets import DIST_DIR, AssetManifest, StaticMiddleware, build
+
+
+def make_middleware(tmp_path):
+    static = tmp_path / 'static'
+    (static / 'css').mkdir(parents=True)
+    (static / 'css' / 'style.css').write_text('body {\n  color: red;\n}\n')
+    manifest = build(str(static), log=lambda message: None)
+    fallback = Response('introuvable', status=404)
+    middleware = StaticMiddleware(fallback, str(static / DIST_DIR), f'/static/{DIST_DIR}',
+                                  AssetManifest(str(static)))
+    return middleware, manifest
+
+
+def test_serves_manifest_files(tmp_path):
+    middleware, manifest = make_middleware(tmp_path)
+    response = Client(middleware).get(f'/static/{DIST_DIR}/{manifest["css/style.css"]}')
+    assert response.status_code == 200
+    assert response.get_data() == b'body{color: red}'
+    assert 'immutable' in response.headers['Cache-Control']
+
+
+def test_unknown_paths_are_not_cached(tmp_path):
+    middleware, _ = make_middleware(tmp_path)
+    client = Client(middleware)
+    for i in range(3):
+        response = client.get(f'/static/{DIST_DIR}/css/invente-{i}.css', headers={'Accept-Encoding': 'gzip, br'})
+        assert response.status_code == 404
+    assert middleware._files == {}
@@ -0,0 +1,19 @@
+def post_login(client, username):
+    """Message flash laissé par une tentative de connexion échouée"""
+    client.post('/login', data={'username': username, 'password': 'faux'})
+    with client.session_transaction() as session:
+        return session.pop('_flashes')[-1][1]
+
+
+def test_login_hints_come_from_the_rate_limiter(app):
+    client = app.test_client()
+    messages = [post_login(client, 'panda bg') for _ in range(3)]
+
+    assert messages[0].startswith('Rappelle-toi cette phrase romantique')
+    assert messages[1].startswith('Indice : "La lune est..."')
+    assert messages[2].startswith('Ton mot de passe est')
+
+    # Aucun compteur par nom d'utilisateur dans la session
+    assert post_login(client, 'inconnu') == "Nom d'utilisateur ou mot de passe incorrect"
+    with client.session_transaction() as session:
+        assert 'login_attempts' not in session
@@ -0,0 +1,24 @@
+import services
+from models import User
+
+
+def feed_token(app):
+    with app.app_context():
+        return services.calendar_feed_token(User.query.filter_by(username='panda bg').one())
+
+
+def test_feed_token_is_revoked_by_a_new_key(app, client):
+    old = feed_token(app)
+    assert client.get(f'/calendar.ics?token={old}').status_code == 200
+
+    client.post('/reset_calendar_feed')
+    new = feed_token(app)
+    assert new != old
+    assert client.get(f'/calendar.ics?token={old}').status_code == 403
+    assert client.get(f'/calendar.ics?token={new}').status_code == 200
+
+
+def test_feed_rejects_unkeyed_and_forged_tokens(app, client):
+    with app.app_context():
+        assert client.get(f"/calendar.ics?token={services.calendar_tokens.dumps('panda bg')}").status_code == 403
+    assert client.get('/calendar.ics?token=panda').status_code == 403
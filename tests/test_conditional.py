@@ -0,0 +1,30 @@
+import services
+from models import User, db
+
+
+def test_user_change_invalidates_etag(app, client):
+    etag = client.get('/galerie').headers['ETag']
+    assert client.get('/galerie', headers={'If-None-Match': etag}).status_code == 304
+
+    # Une connexion ailleurs : le compteur de visites affiché change
+    with app.app_context():
+        user = User.query.filter_by(username='panda bg').one()
+        user.visit_count += 1
+        db.session.commit()
+        services.user_cache.invalidate('panda bg')
+
+    assert client.get('/galerie', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_favorite_color_update_invalidates_etag(client):
+    etag = client.get('/galerie').headers['ETag']
+    client.post('/personalize', data={'favorite_color': '#e1f5fe'})
+    client.get('/personalize')  # affiche le message flash
+    assert client.get('/galerie', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_pages_with_undated_extras_have_no_last_modified(client):
+    response = client.get('/')
+    assert response.headers['ETag']
+    assert 'Last-Modified' not in response.headers
+    assert client.get('/galerie').headers['Last-Modified']
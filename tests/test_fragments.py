@@ -0,0 +1,24 @@
+from models import Phrase, db
+
+
+def test_reused_id_does_not_serve_stale_fragment(app, client):
+    """SQLite réattribue l'id d'une ligne supprimée : le fragment mis en
+    cache pour l'ancien message ne doit pas resservir à son successeur"""
+    client.post('/', data={'texte': 'Ancien message', 'couleur': '#ffdde1', 'tags': ''})
+    assert 'Ancien message' in client.get('/').get_data(as_text=True)
+
+    with app.app_context():
+        old = Phrase.query.filter_by(texte='Ancien message').one()
+        old_id, old_date = old.id, old.date
+
+    client.get(f'/supprimer_phrase/{old_id}')
+    with app.app_context():
+        # Même id, même auteur, même date : seul le contenu affiché diffère
+        db.session.add(Phrase(id=old_id, texte='Nouveau message', auteur='panda bg',
+                              date=old_date, couleur='#e1f5fe'))
+        db.session.commit()
+
+    page = client.get('/').get_data(as_text=True)
+    assert 'Nouveau message' in page
+    assert '#e1f5fe' in page
+    assert 'Ancien message' not in page
@@ -0,0 +1,55 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, create_engine, event, select
+
+from importer import insert_with_ids, parse_datetime
+from seeder import bulk_insert
+
+
+def test_parse_datetime_converts_offsets_to_utc():
+    assert parse_datetime('2024-01-01T10:00:00+02:00') == datetime(2024, 1, 1, 8, 0)
+    assert parse_datetime('2024-01-01T10:00:00Z') == datetime(2024, 1, 1, 10, 0)
+
+
+def test_parse_datetime_keeps_naive_values():
+    assert parse_datetime('2024-01-01T10:00:00') == datetime(2024, 1, 1, 10, 0)
+    assert parse_datetime(datetime(2024, 1, 1, 10, 0)) == datetime(2024, 1, 1, 10, 0)
+
+
+def test_same_instant_with_different_offsets_gives_same_key():
+    assert parse_datetime('2024-01-01T10:00:00+02:00') == parse_datetime('2024-01-01T09:00:00+01:00')
+    aware = datetime(2024, 1, 1, 10, 0, tzinfo=timezone.utc)
+    assert parse_datetime(aware) == datetime(2024, 1, 1, 10, 0)
+
+
+def make_table():
+    engine = create_engine('sqlite://')
+    table = Table('phrases', MetaData(), Column('id', Integer, primary_key=True),
+                  Column('auteur', String), Column('date', DateTime))
+    table.metadata.create_all(engine)
+    statements = []
+    event.listen(engine, 'after_cursor_execute', lambda conn, cursor, statement, *args: statements.append(statement))
+    return engine, table, statements
+
+
+def test_insert_with_ids_by_natural_key_uses_one_insert():
+    engine, table, statements = make_table()
+    rows = [{'auteur': f'auteur {i % 3}', 'date': datetime(2024, 1, 1, 0, 0, i)} for i in range(50, 0, -1)]
+    with engine.begin() as conn:
+        conn.execute(table.insert(), [{'auteur': 'déjà là', 'date': datetime(2023, 1, 1)}])
+        statements.clear()
+        insert_with_ids(conn, table, rows, key=('date', 'auteur'))
+        assert len(statements) == 2  # executemany, puis relecture des ids
+        stored = {row_id: (auteur, date) for row_id, auteur, date in conn.execute(select(table))}
+    assert all(stored[row['id']] == (row['auteur'], row['date']) for row in rows)
+
+
+def test_bulk_insert_ids_follow_batch_order():
+    engine, table, statements = make_table()
+    received = []
+    rows = ({'auteur': f'auteur {i}', 'date': datetime(2024, 1, 1)} for i in range(25))
+    with engine.begin() as conn:
+        bulk_insert(conn, table, rows, batch_size=10, after_insert=lambda conn, batch: received.extend(batch))
+        assert len(statements) == 6  # deux requêtes par lot
+        stored = dict(conn.execute(select(table.c.id, table.c.auteur)).all())
+    assert [stored[row['id']] for row in received] == [f'auteur {i}' for i in range(25)]
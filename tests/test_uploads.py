@@ -0,0 +1,62 @@
+import os
+from datetime import datetime
+
+import pytest
+
+import services
+from models import Photo, PhotoUpload, db
+
+# GIF 1x1
+GIF = bytes.fromhex('47494638396101000100800000ffffff00000021f90401000000002c00000000010001000002024401003b')
+
+
+@pytest.fixture
+def queued(app):
+    """Photo déposée et inscrite dans l'outbox, comme laissée par un worker arrêté"""
+    with app.app_context():
+        photo = Photo(filename='photo.gif', auteur='panda bg', status='pending')
+        db.session.add(photo)
+        db.session.flush()
+        path = services.photo_pipeline.staging_path(photo.id, photo.filename)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(GIF)
+        db.session.add(PhotoUpload(photo_id=photo.id, filename=photo.filename))
+        db.session.commit()
+        return photo.id, path
+
+
+def test_queued_upload_is_sent_after_restart(app, queued):
+    photo_id, path = queued
+    assert services.process_photo_uploads() == 1
+    with app.app_context():
+        photo = db.session.get(Photo, photo_id)
+        assert photo.status == 'ready'
+        assert photo.cloudinary_url
+        assert PhotoUpload.query.count() == 0
+    assert not os.path.exists(path)
+
+
+def test_last_failed_attempt_removes_staged_file(app, queued, monkeypatch):
+    photo_id, path = queued
+    app.config['UPLOAD_MAX_ATTEMPTS'] = 2
+    app.config['UPLOAD_RETRY_BACKOFF'] = 0
+
+    def fail(path, filename):
+        raise ConnectionError('hébergeur indisponible')
+    monkeypatch.setattr(services.photo_pipeline.uploader, 'upload', fail)
+
+    assert services.process_photo_uploads() == 1
+    assert os.path.exists(path)
+    assert services.process_photo_uploads() == 1
+    with app.app_context():
+        assert db.session.get(Photo, photo_id).status == 'failed'
+        assert PhotoUpload.query.count() == 0
+    assert not os.path.exists(path)
+
+
+def test_claimed_upload_is_not_claimed_twice(app, queued):
+    with app.app_context():
+        now = datetime.utcnow()
+        assert len(services.claim_photo_uploads(now, 10, lease=300)) == 1
+        assert services.claim_photo_uploads(now, 10, lease=300) == []
@@ -0,0 +1,283 @@
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import NamedTuple
+
+from werkzeug.utils import secure_filename
+
+
+# Largeurs des déclinaisons générées pour chaque photo (miniature, moyenne, grande)
+VARIANT_WIDTHS = (400, 800, 1600)
+
+
+class UploadResult(NamedTuple):
+    url: str
+    public_id: str
+    bytes: int
+    variants: dict = None  # {largeur: url}
+
+
+class Uploader:
+    """Interface des hébergeurs de photos"""
+
+    def __init__(self, widths=VARIANT_WIDTHS):
+        self.widths = tuple(widths)
+
+    def upload(self, path, filename):
+        """Envoie le fichier local `path` ; retourne un UploadResult"""
+        raise NotImplementedError
+
+    def variants_for(self, public_id):
+        """URLs des déclinaisons {largeur: url} d'une photo déjà hébergée"""
+        return {}
+
+    def delete(self, public_ids):
+        """Supprime un lot de photos ; retourne l'ensemble des ids traités
+        (supprimés ou déjà absents), les autres seront retentés"""
+        raise NotImplementedError
+
+    def warmup(self):
+        """Prépare le client avant le premier envoi (rien par défaut)"""
+
+
+class CloudinaryUploader(Uploader):
+    """Hébergement sur Cloudinary (le SDK n'est importé qu'au premier envoi).
+
+    `credentials` (cloud_name, api_key, api_secret) sont passés au SDK à ce
+    moment-là. `timer(service)`, s'il est fourni, retourne un gestionnaire de
+    contexte qui chronomètre chaque appel à l'API.
+    """
+
+    def __init__(self, folder='love_site', widths=VARIANT_WIDTHS, timer=None, credentials=None):
+        super().__init__(widths)
+        self.folder = folder
+        self.timer = timer or (lambda service: nullcontext())
+        self.credentials = credentials or {}
+        self._configured = False
+
+    def _sdk(self):
+        import cloudinary
+
+        if not self._configured:
+            if self.credentials:
+                cloudinary.config(**self.credentials)
+            self._configured = True
+        return cloudinary
+
+    def warmup(self):
+        self._sdk()
+        # Sous-modules sinon importés au premier envoi et à la première suppression
+        import cloudinary.api  # noqa: F401
+        import cloudinary.uploader  # noqa: F401
+
+    def upload(self, path, filename):
+        self._sdk()
+        import cloudinary.uploader
+
+        with self.timer('cloudinary'):
+            result = cloudinary.uploader.upload(path, folder=self.folder, resource_type='image')
+        return UploadResult(result['secure_url'], result['public_id'], result.get('bytes', 0),
+                            self.variants_for(result['public_id']))
+
+    def variants_for(self, public_id):
+        # Transformations à la volée : redimensionnement, format et qualité automatiques
+        image = self._sdk().CloudinaryImage(public_id)
+        return {
+            width: image.build_url(width=width, crop='limit', fetch_format='auto',
+                                   quality='auto', secure=True)
+            for width in self.widths
+        }
+
+    # Limite de l'API Admin de Cloudinary pour delete_resources
+    DELETE_BATCH_SIZE = 100
+
+    def delete(self, public_ids):
+        self._sdk()
+        import cloudinary.api
+
+        done = set()
+        for start in range(0, len(public_ids), self.DELETE_BATCH_SIZE):
+            batch = public_ids[start:start + self.DELETE_BATCH_SIZE]
+            with self.timer('cloudinary'):
+                result = cloudinary.api.delete_resources(batch, resource_type='image')
+            done.update(public_id for public_id, status in result.get('deleted', {}).items()
+                        if status in ('deleted', 'not_found'))
+        return done
+
+
+class LocalUploader(Uploader):
+    """Stockage sur disque, pour le développement, les tests et les benchmarks.
+
+    `latency` (en secondes) simule le temps de transfert vers un hébergeur.
+    """
+
+    def __init__(self, directory, url_prefix, latency=0.0, widths=VARIANT_WIDTHS):
+        super().__init__(widths)
+        self.directory = directory
+        self.url_prefix = url_prefix.rstrip('/')
+        self.latency = latency
+
+    def upload(self, path, filename):
+        if self.latency:
+            time.sleep(self.latency)
+        os.makedirs(self.directory, exist_ok=True)
+        ext = os.path.splitext(filename)[1].lower()
+        public_id = uuid.uuid4().hex
+        shutil.copyfile(path, os.path.join(self.directory, public_id + ext))
+        url = f'{self.url_prefix}/{public_id}{ext}'
+        return UploadResult(url, public_id, os.path.getsize(path), self._resize(path, public_id, url))
+
+    def delete(self, public_ids):
+        wanted = set(public_ids)
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                # Fichier d'origine « <id>.ext » et déclinaisons « <id>_<largeur>.webp »
+                if name.split('.')[0].split('_')[0] in wanted:
+                    os.remove(os.path.join(self.directory, name))
+        return wanted
+
+    def _resize(self, path, public_id, url):
+        """Déclinaisons WebP redimensionnées (nécessite Pillow, sinon aucune) ;
+        une photo plus étroite que la plus grande largeur y figure elle-même,
+        à sa largeur réelle"""
+        try:
+            from PIL import Image
+        except ImportError:
+            return {}
+
+        variants = {}
+        try:
+            with Image.open(path) as image:
+                if getattr(image, 'is_animated', False):
+                    return {}
+                for width in self.widths:
+                    if image.width <= width:
+                        variants[image.width] = url
+                        break
+                    copy = image.copy()
+                    copy.thumbnail((width, image.height))
+                    name = f'{public_id}_{width}.webp'
+                    copy.save(os.path.join(self.directory, name), 'WEBP', quality=80)
+                    variants[width] = f'{self.url_prefix}/{name}'
+        except OSError as e:
+            print(f"Erreur lors du redimensionnement de {path}: {e}")
+        return variants
+
+
+class UploadPipeline:
+    """Envoi des photos déposées chez l'hébergeur, hors du thread de la requête.
+
+    La requête dépose le fichier dans `staging_dir` et inscrit la photo dans
+    une outbox durable (voir services.process_photo_uploads) ; son traitement
+    appelle `send_all()`, qui envoie un lot en parallèle sur un pool de
+    threads. Le fichier déposé est supprimé par `discard()` dès que la photo
+    est envoyée ou définitivement en échec : le dossier ne grossit pas.
+    """
+
+    def __init__(self, uploader, staging_dir, workers=2):
+        self.uploader = uploader
+        self.staging_dir = staging_dir
+        self.workers = workers
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def staging_path(self, photo_id, filename):
+        ext = os.path.splitext(secure_filename(filename))[1].lower()
+        return os.path.join(self.staging_dir, f'{photo_id}{ext}')
+
+    def stage(self, photo_id, file):
+        """Enregistre le fichier reçu sur le disque local ; retourne son chemin"""
+        os.makedirs(self.staging_dir, exist_ok=True)
+        path = self.staging_path(photo_id, file.filename)
+        file.save(path)
+        return path
+
+    def send_all(self, jobs):
+        """Envoie des fichiers déposés [(photo_id, filename)] ; retourne
+        [(résultat, erreur)] dans le même ordre"""
+        return list(self._get_executor().map(lambda job: self._send(*job), jobs))
+
+    def _send(self, photo_id, filename):
+        try:
+            return self.uploader.upload(self.staging_path(photo_id, filename), filename), None
+        except Exception as e:
+            print(f"Erreur d'upload (photo {photo_id}): {e}")
+            return None, e
+
+    def discard(self, photo_id, filename):
+        """Supprime le fichier déposé d'une photo"""
+        try:
+            os.remove(self.staging_path(photo_id, filename))
+        except OSError:
+            pass
+
+    def shutdown(self, wait=True):
+        if self._executor is not None and self._pid == os.getpid():
+            self._executor.shutdown(wait=wait)
+
+    def _get_executor(self):
+        # Un pool par processus : celui du parent ne survit pas au fork
+        if self._executor is None or self._pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix='photo-upload'
+                    )
+                    self._pid = os.getpid()
+        return self._executor
+
+
+class OutboxWorker:
+    """Thread de fond qui traite une table « outbox » durable.
+
+    `process()` traite un lot d'entrées arrivées à échéance et retourne le
+    nombre d'entrées traitées ; le thread le rappelle tant qu'il reste du
+    travail, puis attend `interval` secondes ou un appel à `notify()`.
+    """
+
+    def __init__(self, process, interval=30.0, name='outbox'):
+        self.process = process
+        self.interval = interval
+        self.name = name
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = os.getpid()
+
+    def notify(self):
+        """Signale du nouveau travail ; démarre le thread au besoin"""
+        self._ensure_worker()
+        self._wakeup.set()
+
+    def close(self):
+        self._stopping.set()
+        self._wakeup.set()
+
+    def _ensure_worker(self):
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._wakeup = threading.Event()
+            self._stopping = threading.Event()
+            self._lock = threading.Lock()
+            self._thread = None
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                while self.process() and not self._stopping.is_set():
+                    pass
+            except Exception as e:
+                print(f"Erreur dans {self.name}: {e}")
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
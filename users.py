@@ -0,0 +1,54 @@
+import threading
+import time
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+
+class CachedUser(NamedTuple):
+    """Copie en lecture seule d'un utilisateur (sans lien avec la session ORM)"""
+    id: int
+    username: str
+    favorite_color: str
+    visit_count: int
+    last_login: Optional[datetime]
+    created_at: Optional[datetime]
+    partner: Optional[str]  # nom d'utilisateur du partenaire
+    calendar_key: Optional[str] = None  # clé des liens d'abonnement au calendrier
+
+
+class UserCache:
+    """Cache en mémoire des utilisateurs, avec une durée de vie limitée.
+
+    `load(username)` retourne un CachedUser ou None. Chaque processus garde
+    sa propre copie : `invalidate()` après une écriture rafraîchit le
+    processus courant, la durée de vie `ttl` borne le retard des autres.
+    """
+
+    def __init__(self, load, ttl=60.0, maxsize=64):
+        self.load = load
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, username):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+
+        user = self.load(username)
+        with self._lock:
+            if len(self._entries) >= self.maxsize:
+                # Peu d'utilisateurs : on repart simplement de zéro
+                self._entries.clear()
+            self._entries[username] = (now + self.ttl, user)
+        return user
+
+    def invalidate(self, username=None):
+        with self._lock:
+            if username is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(username, None)
@@ -0,0 +1,141 @@
+import json
+import os
+import random
+import threading
+import time
+from typing import NamedTuple, Optional
+
+
+class Verse(NamedTuple):
+    """Verset immuable et compact (les champs absents valent None)"""
+    arabic: str
+    french: str
+    explanation: str
+    conclusion: str
+    surah: Optional[str] = None
+    verse_number: Optional[str] = None
+    type: Optional[str] = None
+    source: Optional[str] = None
+    reference: Optional[str] = None
+
+    def get(self, key, default=None):
+        """Accès façon dict, utilisé par les templates (verse.get('surah'))"""
+        value = getattr(self, key, None) if key in self._fields else None
+        return default if value is None else value
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{field: data.get(field) for field in cls._fields})
+
+
+# Versets de secours, construits une seule fois
+FALLBACK_VERSES = {
+    "heureux": (Verse(
+        arabic="وَبَشِّرِ الصَّابِرِينَ",
+        french="Et annonce la bonne nouvelle aux patients",
+        explanation="Ce verset nous rappelle que la patience est récompensée par Allah.",
+        conclusion="Continue à être patient(e) et joyeux/joyeuse, Allah te récompensera."
+    ),),
+    "triste": (Verse(
+        arabic="وَلَا تَحْزَنْ إِنَّ اللَّهَ مَعَنَا",
+        french="Ne t'attriste pas, Allah est avec nous",
+        explanation="Allah est toujours avec nous dans les moments difficiles.",
+        conclusion="N'aie pas de tristesse, Allah veille sur toi."
+    ),),
+}
+
+# Verset par défaut pour une humeur inconnue
+DEFAULT_VERSE = Verse(
+    arabic="وَاللَّهُ يُحِبُّ الْمُحْسِنِينَ",
+    french="Et Allah aime les bienfaisants",
+    explanation="Allah aime ceux qui fait le bien.",
+    conclusion="Continue à faire le bien, Allah t'aime."
+)
+
+
+class VerseStore:
+    """Cache des versets par humeur, partagé par tout le processus.
+
+    Le fichier JSON n'est relu que si son mtime change, et le mtime lui-même
+    n'est vérifié qu'au plus une fois toutes les `check_interval` secondes.
+    """
+
+    def __init__(self, path, check_interval=30.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._verses = None
+        self._mtime = None
+        self._checked_at = 0.0
+        self._rotations = {}
+        self._lock = threading.Lock()
+
+    def _load(self):
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            return FALLBACK_VERSES, None
+
+        if self._verses is not None and mtime == self._mtime:
+            return self._verses, mtime
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            raw = json.load(f)
+        verses = {
+            mood: tuple(Verse.from_dict(item) for item in items)
+            for mood, items in raw.items()
+        }
+        return verses, mtime
+
+    def verses(self):
+        """Retourne le dict {humeur: (Verse, ...)} en le rechargeant si besoin"""
+        now = time.monotonic()
+        if self._verses is not None and now - self._checked_at < self.check_interval:
+            return self._verses
+
+        with self._lock:
+            if self._verses is None or now - self._checked_at >= self.check_interval:
+                verses, mtime = self._load()
+                if verses is not self._verses:
+                    # Le contenu a changé : les rotations en cours ne sont plus valides
+                    self._rotations.clear()
+                self._verses, self._mtime = verses, mtime
+                self._checked_at = now
+        return self._verses
+
+    def moods(self):
+        return tuple(self.verses())
+
+    def random_verse(self, mood):
+        """Tirage aléatoire simple, comme random.choice"""
+        choices = self.verses().get(mood)
+        return random.choice(choices) if choices else DEFAULT_VERSE
+
+    def next_verse(self, user, mood):
+        """Rotation mélangée sans répétition, propre à chaque utilisateur.
+
+        Chaque utilisateur parcourt tous les versets d'une humeur avant d'en
+        revoir un, et le premier verset d'un nouveau tour n'est jamais celui
+        qui vient d'être affiché.
+        """
+        choices = self.verses().get(mood)
+        if not choices:
+            return DEFAULT_VERSE
+
+        with self._lock:
+            key = (user, mood)
+            remaining, last = self._rotations.get(key, ([], None))
+            if not remaining:
+                remaining = list(range(len(choices)))
+                random.shuffle(remaining)
+                if len(remaining) > 1 and remaining[-1] == last:
+                    remaining[0], remaining[-1] = remaining[-1], remaining[0]
+            index = remaining.pop()
+            self._rotations[key] = (remaining, index)
+        return choices[index]
+
+    def reset(self):
+        with self._lock:
+            self._verses = None
+            self._mtime = None
+            self._checked_at = 0.0
+            self._rotations.clear()
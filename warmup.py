@@ -0,0 +1,57 @@
+import sys
+import time
+from typing import NamedTuple
+
+
+class WarmupStep(NamedTuple):
+    name: str
+    run: object
+
+
+class StepResult(NamedTuple):
+    name: str
+    seconds: float
+    detail: str = ''
+    error: str = None
+
+
+class Warmup:
+    """Préchauffage d'un worker avant sa première requête.
+
+    Chaque étape est une fonction sans argument, exécutée dans un contexte
+    d'application, qui peut retourner un court texte descriptif ("5
+    connexions"). Une étape en échec est signalée sans interrompre les
+    suivantes : un worker mal préchauffé reste un worker utilisable.
+    """
+
+    def __init__(self):
+        self._steps = []
+
+    def step(self, name):
+        """Décorateur déclarant une étape, exécutée dans l'ordre de déclaration"""
+        def register(fn):
+            self._steps.append(WarmupStep(name, fn))
+            return fn
+        return register
+
+    @property
+    def steps(self):
+        return list(self._steps)
+
+    def run(self, app, log=None):
+        """Exécute toutes les étapes ; retourne la liste des StepResult"""
+        log = log or (lambda message: print(message, file=sys.stderr))
+        results = []
+        with app.app_context():
+            for step in self._steps:
+                started = time.perf_counter()
+                detail, error = '', None
+                try:
+                    detail = step.run() or ''
+                except Exception as e:
+                    error = str(e)
+                result = StepResult(step.name, time.perf_counter() - started, detail, error)
+                results.append(result)
+                suffix = f'erreur : {error}' if error else detail
+                log(f"  Préchauffage {step.name:<10} {result.seconds * 1000:7.1f} ms  {suffix}".rstrip())
+        return results
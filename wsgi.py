@@ -1,6 +1,9 @@
 import os
-from app import app
+from app import create_app
+
+# Le schéma et les comptes sont créés par `flask --app wsgi init-db`, avant le démarrage des workers
+app = application = create_app()
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))
-    app.run(host='0.0.0.0', port=port)
\ No newline at end of file
+    app.run(host='0.0.0.0', port=port)